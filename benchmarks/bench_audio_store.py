@@ -0,0 +1,79 @@
+"""
+Memory benchmark: per-session audio bytes vs the shared AudioStore
+Simulates N browser sessions tapping quick phrases (no network; fake MP3 payloads)
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tts.audio_store import AudioStore
+
+# Typical ElevenLabs MP3 size for a short quick phrase (~2 s at 128 kbps)
+CLIP_BYTES = 32 * 1024
+PHRASES = 20
+SLOTS = ("audio_key", "practice_audio_key", "translate_audio_key")
+
+
+def fake_tts(text: str) -> bytes:
+    """Stand-in for generate_speech: a fresh bytes object per call, like the real API"""
+    return os.urandom(CLIP_BYTES)
+
+
+def simulate(sessions: int, taps: int, shared: bool, seed: int = 0):
+    rng = random.Random(seed)
+    store = AudioStore() if shared else None
+    session_states = []
+    synth_calls = 0
+
+    tracemalloc.start()
+    for s in range(sessions):
+        state = {}
+        owner = f"session-{s}"
+        for _ in range(taps):
+            slot = rng.choice(SLOTS)
+            text = f"phrase-{rng.randrange(PHRASES)}"
+            if shared:
+                key = store.key_for(text, "voice", "model")
+
+                def produce():
+                    nonlocal synth_calls
+                    synth_calls += 1
+                    return fake_tts(text)
+
+                store.get_or_create(key, produce)
+                store.release(state.get(slot), owner)
+                store.acquire(key, owner)
+                state[slot] = key
+            else:
+                synth_calls += 1
+                state[slot] = fake_tts(text)
+        session_states.append(state)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"retained_bytes": current, "peak_bytes": peak, "tts_calls": synth_calls,
+            "store": store.stats() if store else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--taps", type=int, default=10, help="phrase taps per session")
+    args = parser.parse_args()
+
+    before = simulate(args.sessions, args.taps, shared=False)
+    after = simulate(args.sessions, args.taps, shared=True)
+
+    print(f"{args.sessions} sessions x {args.taps} taps, {CLIP_BYTES // 1024} KiB clips, {PHRASES} phrases")
+    print(f"  per-session bytes : {before['retained_bytes'] / 1e6:8.2f} MB retained, {before['tts_calls']} TTS calls")
+    print(f"  shared AudioStore : {after['retained_bytes'] / 1e6:8.2f} MB retained, {after['tts_calls']} TTS calls")
+    print(f"  store stats       : {after['store']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,604 @@
+"""
+Dinner-service load generator
+Simulates N tables following a realistic script (QR scan, language pick, phrase taps and
+searches, staff calls, translations, the bill) with think times between actions, and
+reports per-action latency percentiles, error rates and server CPU / memory over time.
+
+Targets:
+    app  Starts `streamlit run src/app.py` (scratch database, stand-in providers in their
+         own process) and drives every table as a browser would, over Streamlit's
+         websocket protocol: one session per table, widget clicks as rerun requests.
+    api  Drives an already running scripts/run_api.py with one keep-alive client per
+         table (pass --server-pid to sample its CPU / memory).
+
+    python benchmarks/load_generator.py --tables 40 --time-scale 0.05 --out load.json
+    python benchmarks/load_generator.py --target api --url http://127.0.0.1:8600 --server-pid 1234
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+ROOT = Path(__file__).parent.parent
+APP_PATH = ROOT / 'src' / 'app.py'
+STANDIN_SCRIPT = Path(__file__).parent / 'standin_server.py'
+
+# Think time between guest actions (seconds, before --time-scale): lognormal median / sigma
+THINK_MEDIAN = 20.0
+THINK_SIGMA = 0.8
+
+# Guest language mix, and how often the browser language already matches it
+LANGUAGE_WEIGHTS = {"en": 0.35, "zh": 0.25, "ko": 0.1, "vi": 0.1, "ne": 0.05, "th": 0.05, "es": 0.05, "pt": 0.05}
+BROWSER_MATCHES_LANGUAGE = 0.7
+
+# Phrases a guest taps straight from the list (the rest are found through search)
+FAVOURITE_PHRASES = 10
+
+TRANSLATE_TEXTS = (
+    "Is this dish spicy?",
+    "Can I get this without onions?",
+    "We would like to share one dessert",
+    "Do you have a vegetarian option?",
+)
+
+# Sidebar mode radio order in src/app.py
+APP_MODES = ("quick", "call", "practice", "translate")
+
+# Longest a single rerun may take before the action counts as failed (seconds)
+RERUN_TIMEOUT = 60
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from websockets.exceptions import WebSocketException
+    WEBSOCKET_ERRORS = (WebSocketException,)
+except ImportError:
+    WEBSOCKET_ERRORS = ()
+
+
+# ===========================================
+# Resource sampling
+# ===========================================
+class ResourceSampler:
+    """CPU % and RSS of a process, sampled every `interval` seconds (psutil if installed, else /proc)"""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._process = psutil.Process(pid) if psutil else None
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def _cpu_seconds(self) -> float:
+        if self._process:
+            times = self._process.cpu_times()
+            return times.user + times.system
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks
+
+    def _rss_mb(self) -> float:
+        if self._process:
+            return self._process.memory_info().rss / 1e6
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * self._page_size / 1e6
+
+    def _run(self):
+        start = time.monotonic()
+        last_cpu, last_t = self._cpu_seconds(), start
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            try:
+                cpu = self._cpu_seconds()
+                rss = self._rss_mb()
+            except (OSError, IndexError):
+                break
+            self.samples.append({
+                "t": round(now - start, 1),
+                "cpu_percent": round((cpu - last_cpu) / (now - last_t) * 100, 1),
+                "rss_mb": round(rss, 1),
+            })
+            last_cpu, last_t = cpu, now
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval * 2)
+
+
+# ===========================================
+# Results
+# ===========================================
+class Recorder:
+    """Latency samples and failures per action, shared by all table threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.timeline = []  # (seconds since start, action, ms, ok)
+        self.start = time.monotonic()
+
+    def timed(self, action: str, func, *args):
+        start = time.perf_counter()
+        error = None
+        try:
+            func(*args)
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)[:120]}"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[action].append(elapsed)
+            if error:
+                self.errors[action][error] += 1
+            self.timeline.append((round(time.monotonic() - self.start, 2), action, round(elapsed * 1000, 2), not error))
+
+    def summary(self) -> dict:
+        result = {}
+        for action, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            pick = lambda p: ordered[min(int(p / 100 * len(ordered)), len(ordered) - 1)]
+            failures = sum(self.errors[action].values())
+            result[action] = {
+                "n": len(ordered),
+                "error_rate": round(failures / len(ordered), 4),
+                "p50_ms": round(pick(50) * 1000, 1),
+                "p95_ms": round(pick(95) * 1000, 1),
+                "p99_ms": round(pick(99) * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+                "errors": dict(self.errors[action]),
+            }
+        return result
+
+    def windows(self, seconds: float = 10.0) -> list:
+        """Action count, error count and p95 per time window, to see when the service degrades"""
+        buckets = defaultdict(list)
+        for t, action, ms, ok in self.timeline:
+            buckets[int(t // seconds)].append((ms, ok))
+        out = []
+        for bucket in sorted(buckets):
+            ordered = sorted(ms for ms, ok in buckets[bucket])
+            out.append({
+                "t": bucket * seconds,
+                "actions": len(ordered),
+                "errors": sum(1 for ms, ok in buckets[bucket] if not ok),
+                "p95_ms": ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)],
+            })
+        return out
+
+
+# ===========================================
+# Table scripts
+# ===========================================
+class Party:
+    """One table's visit: the sequence of guest actions, independent of the target"""
+
+    def __init__(self, table_id: str, rng: random.Random, time_scale: float):
+        self.table_id = table_id
+        self.rng = rng
+        self.time_scale = time_scale
+        self.lang = rng.choices(list(LANGUAGE_WEIGHTS), weights=list(LANGUAGE_WEIGHTS.values()))[0]
+        self.browser_lang = self.lang if rng.random() < BROWSER_MATCHES_LANGUAGE else "en"
+
+    def think(self, stop: threading.Event):
+        stop.wait(self.rng.lognormvariate(0, THINK_SIGMA) * THINK_MEDIAN * self.time_scale)
+
+    def actions(self, phrases: list):
+        """Yield (action, argument) pairs for a whole visit"""
+        yield "scan", None
+        if self.browser_lang != self.lang:
+            yield "pick_language", self.lang
+        for course in range(self.rng.randint(2, 4)):
+            for _ in range(self.rng.randint(1, 4)):
+                if self.rng.random() < 0.8:
+                    yield "phrase_tap", self.rng.choice(phrases[:FAVOURITE_PHRASES])
+                else:
+                    yield "phrase_search", self.rng.choice(phrases)
+            if self.rng.random() < 0.6:
+                yield "staff_call", self.rng.choice(("call", "call", "water", "menu", "toilet"))
+            if self.rng.random() < 0.3:
+                yield "translate", self.rng.choice(TRANSLATE_TEXTS)
+        yield "staff_call", "bill"
+
+
+class StreamlitSession:
+    """
+    Minimal Streamlit browser client: one websocket session, sending rerun requests with
+    widget states and reading ForwardMsgs until the script (or fragment) run finishes
+    """
+
+    def __init__(self, base_url: str, query: dict, headers: dict = None):
+        from websockets.sync.client import connect
+
+        self.base_url = base_url
+        self.query_string = urlencode(query)
+        self.widgets = {}  # element id -> (kind, proto, fragment id)
+        self.values = {}   # element id -> WidgetState kept across reruns (inputs, selections)
+        self.page_script_hash = ""
+        # Held open across actions, so entered through an ExitStack rather than a with block
+        self._stack = ExitStack()
+        self.ws = self._stack.enter_context(connect(
+            base_url.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"],
+            additional_headers=headers or {}, max_size=None, open_timeout=RERUN_TIMEOUT))
+
+    def close(self):
+        self._stack.close()
+
+    def rerun(self, triggers: list = (), fragment_id: str = None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = self.query_string
+        state.page_script_hash = self.page_script_hash
+        if fragment_id:
+            state.fragment_id = fragment_id
+        state.widget_states.widgets.extend([*self.values.values(), *triggers])
+        self.ws.send(msg.SerializeToString())
+
+        done = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+        exceptions = []
+        full_run = False
+        deadline = time.monotonic() + RERUN_TIMEOUT
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(self.ws.recv(timeout=max(deadline - time.monotonic(), 0.01)))
+            kind = reply.WhichOneof("type")
+            if kind == "new_session":
+                # Sent at the start of every run; a full run (including st.rerun() restarts)
+                # redraws the whole page, a fragment run only its own elements
+                self.page_script_hash = reply.new_session.page_script_hash
+                full_run = not reply.new_session.fragment_ids_this_run
+                if full_run:
+                    self.widgets = {}
+            elif kind == "page_info_changed":
+                self.query_string = reply.page_info_changed.query_string
+            elif kind == "delta" and reply.delta.WhichOneof("type") == "new_element":
+                element = reply.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    exceptions.append(element.exception.message)
+                proto = getattr(element, element_kind)
+                if getattr(proto, "id", ""):
+                    self.widgets[proto.id] = (element_kind, proto, reply.delta.fragment_id)
+            elif kind == "script_finished":
+                if reply.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Script failed to compile")
+                if reply.script_finished in done:
+                    break
+        if full_run:
+            # Like the browser, forget state of widgets that are no longer on the page
+            # (ids change with their arguments; a stale value would re-apply later)
+            self.values = {element_id: value for element_id, value in self.values.items() if element_id in self.widgets}
+        if exceptions:
+            raise RuntimeError(exceptions[0])
+
+    def find(self, kind: str, key: str = None, label: str = None):
+        """First widget of `kind` on the page, by user key or label when given"""
+        for element_id, (element_kind, proto, fragment_id) in self.widgets.items():
+            if element_kind != kind:
+                continue
+            if key is not None and not element_id.endswith(f"-{key}"):
+                continue
+            if label is not None and proto.label != label:
+                continue
+            return element_id, proto, fragment_id
+        raise LookupError(f"No {kind} {key or label!r} on the page")
+
+    def click(self, key: str):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        element_id, proto, fragment_id = self.find("button", key=key)
+        self.rerun([WidgetState(id=element_id, trigger_value=True)], fragment_id)
+
+    def set_value(self, kind: str, key: str = None, label: str = None, rerun: bool = True, **value):
+        """Set a widget's state (e.g. string_value=...); rerun like the browser does on change"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        element_id, proto, fragment_id = self.find(kind, key=key, label=label)
+        self.values[element_id] = WidgetState(id=element_id, **value)
+        if rerun:
+            self.rerun(fragment_id=fragment_id)
+
+    def select_index(self, kind: str, label: str, index: int):
+        """Pick an option of a radio / selectbox by position (options arrive already formatted)"""
+        element_id, proto, fragment_id = self.find(kind, label=label)
+        self.set_value(kind, label=label, string_value=proto.options[index])
+
+    def audio_urls(self) -> list:
+        return [proto.url for kind, proto, fragment_id in self.widgets.values() if kind == "audio"]
+
+
+class AppTable:
+    """One table's browser session against the Streamlit app"""
+
+    def __init__(self, party: Party, url: str, language_codes: list):
+        import httpx
+
+        self.party = party
+        self.url = url
+        self.language_codes = language_codes
+        self.session = None
+        self.query_string = ""
+        self.mode = "quick"
+        self.http = httpx.Client(base_url=url, timeout=RERUN_TIMEOUT)
+
+    def _set_mode(self, mode: str):
+        if self.mode != mode:
+            self.session.select_index("radio", "Mode", APP_MODES.index(mode))
+            self.mode = mode
+
+    def _play_audio(self):
+        # The browser fetches the clip the tap rendered (static file or media endpoint)
+        for url in self.session.audio_urls():
+            self.http.get(url if url.startswith("/") else f"/{url}").raise_for_status()
+
+    def _connect(self, query_string: str):
+        query = dict(parse_qsl(query_string))
+        self.session = StreamlitSession(self.url, query,
+                                        headers={"Accept-Language": f"{self.party.browser_lang},en;q=0.5"})
+        self.mode = query.get("mode", "quick")
+        self.session.rerun()
+
+    def do(self, action: str, arg):
+        if action == "scan":
+            self._connect(urlencode({"table": self.party.table_id}))
+            return
+        if self.session is None:
+            # The previous action broke the connection: reload the page like the browser would
+            self._connect(self.query_string)
+        try:
+            self._do(action, arg)
+        except (TimeoutError, OSError, ConnectionError) + WEBSOCKET_ERRORS:
+            self.query_string = self.session.query_string
+            self.session.close()
+            self.session = None
+            raise
+
+    def _do(self, action: str, arg):
+        if action == "pick_language":
+            self.session.select_index("selectbox", "Language", self.language_codes.index(arg))
+        elif action == "phrase_tap":
+            self._set_mode("quick")
+            self.session.click(f"phrase_{arg['ja']}")
+            self._play_audio()
+        elif action == "phrase_search":
+            self._set_mode("quick")
+            self.session.set_value("text_input", key="phrase_query", string_value=arg[self.party.lang])
+            self.session.click(f"phrase_{arg['ja']}")
+            self._play_audio()
+            # Clearing the box only takes effect on the next rerun
+            self.session.set_value("text_input", key="phrase_query", string_value="", rerun=False)
+        elif action == "staff_call":
+            self._set_mode("call")
+            self.session.click("call_sumimasen" if arg == "call" else f"call_{arg}")
+        elif action == "translate":
+            self._set_mode("translate")
+            self.session.set_value("text_area", string_value=arg, rerun=False)
+            self.session.click("translate_btn")
+
+    def close(self):
+        if self.session:
+            self.session.close()
+        self.http.close()
+
+
+class ApiTable:
+    """One table device against the headless API, over a keep-alive connection"""
+
+    def __init__(self, party: Party, url: str, token: str = None):
+        import httpx
+
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.party = party
+        self.client = httpx.Client(base_url=url, headers=headers, timeout=RERUN_TIMEOUT)
+
+    def do(self, action: str, arg):
+        lang = self.party.lang
+        if action in ("scan", "pick_language"):
+            self.client.get("/v1/phrases", params={"lang": lang}).raise_for_status()
+        elif action == "phrase_tap":
+            self.client.get(f"/v1/phrases/{arg['phrase_id']}/audio").raise_for_status()
+        elif action == "phrase_search":
+            self.client.get("/v1/phrases", params={"lang": lang, "q": arg[lang]}).raise_for_status()
+            self.client.get(f"/v1/phrases/{arg['phrase_id']}/audio").raise_for_status()
+        elif action == "staff_call":
+            self.client.post("/v1/call-staff", json={"table_id": self.party.table_id, "call_type": arg,
+                                                     "language": lang}).raise_for_status()
+        else:
+            self.client.post("/v1/translate", json={"text": arg, "lang": lang,
+                                                    "table_id": self.party.table_id}).raise_for_status()
+
+    def close(self):
+        self.client.close()
+
+
+def run_table(table, party: Party, phrases: list, recorder: Recorder, stop: threading.Event):
+    try:
+        for action, arg in party.actions(phrases):
+            if stop.is_set():
+                return
+            recorder.timed(action, table.do, action, arg)
+            party.think(stop)
+    finally:
+        table.close()
+
+
+# ===========================================
+# Processes under test
+# ===========================================
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1]} exited with {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Nothing listening on port {port}")
+
+
+def start_standins(args) -> subprocess.Popen:
+    """Stand-in APIs in their own process, so their CPU is not counted as the app's"""
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, str(STANDIN_SCRIPT), "--port", str(port),
+        "--chat-latency", args.chat_latency, "--tts-latency", args.tts_latency,
+        "--error-rate", str(args.provider_error_rate), "--seed", str(args.seed),
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port(port, process)
+    base = f"http://127.0.0.1:{port}"
+    os.environ.update({"KIMI_BASE_URL": f"{base}/v1", "OPENAI_BASE_URL": f"{base}/v1", "ELEVENLABS_BASE_URL": base})
+    return process
+
+
+def start_app(log_path: Path) -> tuple:
+    """`streamlit run src/app.py` on a free port; returns (process, base URL)"""
+    port = free_port()
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen([
+            sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+            "--server.headless", "true", "--server.port", str(port),
+            "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false",
+        ], stdout=log, stderr=subprocess.STDOUT, cwd=ROOT)
+    wait_for_port(port, process)
+    return process, f"http://127.0.0.1:{port}"
+
+
+def stop_process(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("app", "api"), default="app")
+    parser.add_argument("--tables", type=int, default=20, help="Tables in the service")
+    parser.add_argument("--ramp", type=float, default=30.0, help="Seconds over which tables arrive")
+    parser.add_argument("--time-scale", type=float, default=0.05,
+                        help="Multiplier on think times (1.0 = real dinner pace, ~20 s median)")
+    parser.add_argument("--duration", type=float, default=600.0, help="Stop after this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default="http://127.0.0.1:8600", help="API base URL (--target api)")
+    parser.add_argument("--token", default=os.getenv("BRIDGE_API_TOKEN"), help="API bearer token (--target api)")
+    parser.add_argument("--server-pid", type=int, help="API process to sample for CPU / memory (--target api)")
+    parser.add_argument("--chat-latency", default="lognormal:800,0.4", help="Stand-in Kimi latency (--target app)")
+    parser.add_argument("--tts-latency", default="lognormal:400,0.4", help="Stand-in ElevenLabs latency (--target app)")
+    parser.add_argument("--provider-error-rate", type=float, default=0.0, help="Stand-in HTTP 500 rate (--target app)")
+    parser.add_argument("--out", help="Write the full report (summary, windows, resources) as JSON")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT / 'src'))
+    sys.path.insert(0, str(Path(__file__).parent))
+    processes = []
+    guard = scratch = None
+    if args.target == "app":
+        # Same scratch database, stand-in keys and clip cleanup as the benchmark suite
+        import run_benchmarks
+
+        scratch = run_benchmarks.SCRATCH_DIR
+        guard = run_benchmarks.PublishedAudioGuard()
+        processes.append(start_standins(args))
+        app, url = start_app(scratch / "streamlit.log")
+        processes.append(app)
+        server_pid = app.pid
+    else:
+        url = args.url
+        server_pid = args.server_pid
+
+    from catalog import get_catalog
+
+    catalog = get_catalog()
+    phrases = list(catalog.phrases)
+    rng = random.Random(args.seed)
+    recorder = Recorder()
+    sampler = ResourceSampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    stop = threading.Event()
+    threads = []
+    try:
+        for i in range(args.tables):
+            party = Party(str(i + 1), random.Random(rng.random()), args.time_scale)
+            if args.target == "app":
+                table = AppTable(party, url, list(catalog.language_codes))
+            else:
+                table = ApiTable(party, url, args.token)
+            thread = threading.Thread(target=run_table, args=(table, party, phrases, recorder, stop), daemon=True)
+            threads.append(thread)
+            thread.start()
+            stop.wait(args.ramp / max(args.tables, 1))
+
+        deadline = recorder.start + args.duration
+        for thread in threads:
+            thread.join(timeout=max(deadline - time.monotonic(), 0))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        if sampler:
+            sampler.stop()
+        for process in processes:
+            stop_process(process)
+        if guard:
+            guard.restore()
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    summary = recorder.summary()
+    print(f"\n{args.tables} tables, target={args.target}, {time.monotonic() - recorder.start:.0f} s")
+    print(f"{'action':16} {'n':>6} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for action, stats in summary.items():
+        print(f"{action:16} {stats['n']:>6} {stats['error_rate'] * 100:>5.1f}% {stats['p50_ms']:>9} "
+              f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['max_ms']:>9}")
+        for error, count in stats["errors"].items():
+            print(f"    {count} x {error}")
+    if sampler and sampler.samples:
+        cpu = [s["cpu_percent"] for s in sampler.samples]
+        rss = [s["rss_mb"] for s in sampler.samples]
+        print(f"server CPU: mean {sum(cpu) / len(cpu):.0f}%  max {max(cpu):.0f}%   "
+              f"RSS: start {rss[0]:.0f} MB  max {max(rss):.0f} MB")
+
+    if args.out:
+        report = {
+            "settings": vars(args),
+            "summary": summary,
+            "windows": recorder.windows(),
+            "resources": sampler.samples if sampler else [],
+        }
+        Path(args.out).write_text(json.dumps(report, indent=1))
+        print(f"Written: {args.out}")
+
+
+if __name__ == '__main__':
+    main()
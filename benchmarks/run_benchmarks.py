@@ -0,0 +1,398 @@
+"""
+Benchmark suite for the tap path
+Drives src/app.py headlessly through Streamlit's AppTest against the local API stand-ins
+(benchmarks/standin_server.py), on a scratch database, and writes machine-readable JSON:
+
+    reruns     per-mode rerun time (quick / call / practice / translate)
+    storage    log_usage / call_staff throughput
+    dashboard  dashboard query latency at each --sizes row count
+    caches     TTS / STT / LLM upstream requests vs app requests (hit rate)
+
+    python benchmarks/run_benchmarks.py                      # writes benchmarks/results/<commit>.json
+    python benchmarks/run_benchmarks.py --sizes 10000 --compare benchmarks/results/<old>.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+APP_PATH = ROOT / 'src' / 'app.py'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+# Scratch database and stand-in providers must be configured before src is imported
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="bridge-bench-"))
+os.environ["BRIDGE_DB_PATH"] = str(SCRATCH_DIR / "bridge.db")
+os.environ.setdefault("KIMI_API_KEY", "standin")
+os.environ.setdefault("OPENAI_API_KEY", "standin")
+os.environ.setdefault("ELEVENLABS_API_KEY", "standin")
+os.environ["ELEVENLABS_VOICE_ID_USER"] = "benchmark-standin"
+
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from standin_server import StandinConfig, create_app as create_standin_app
+
+
+def percentiles(samples: list) -> dict:
+    """p50 / p95 / max (ms) of durations given in seconds"""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    pick = lambda p: ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pick(50) * 1000, 3),
+        "p95_ms": round(pick(95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+# ===========================================
+# Stand-in providers (in-process uvicorn thread)
+# ===========================================
+class Standins:
+    def __init__(self, latency_ms: float):
+        import uvicorn
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        spec = f"fixed:{latency_ms:g}"
+        self.config = StandinConfig(chat_latency=spec, stt_latency=spec, tts_latency=spec, seed=0)
+        self.server = uvicorn.Server(uvicorn.Config(create_standin_app(self.config), host="127.0.0.1",
+                                                    port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+        base = f"http://127.0.0.1:{port}"
+        os.environ["KIMI_BASE_URL"] = f"{base}/v1"
+        os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+        os.environ["ELEVENLABS_BASE_URL"] = base
+
+    def requests(self) -> dict:
+        return dict(self.config.requests)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class PublishedAudioGuard:
+    """Remove phrase clips the benchmark publishes into src/static/audio"""
+
+    def __init__(self):
+        from tts.phrase_assets import AUDIO_DIR, MANIFEST_PATH, STATIC_DIR
+
+        self.audio_dir = AUDIO_DIR
+        self.manifest_path = MANIFEST_PATH
+        self.created_dir = STATIC_DIR if not STATIC_DIR.exists() else AUDIO_DIR if not AUDIO_DIR.exists() else None
+        self.files = set(AUDIO_DIR.glob('*'))
+        self.manifest = MANIFEST_PATH.read_bytes() if MANIFEST_PATH.exists() else None
+
+    def restore(self):
+        if self.created_dir is not None:
+            shutil.rmtree(self.created_dir, ignore_errors=True)
+            return
+        for path in set(self.audio_dir.glob('*')) - self.files:
+            path.unlink()
+        if self.manifest is not None:
+            self.manifest_path.write_bytes(self.manifest)
+
+
+# ===========================================
+# Reruns (AppTest)
+# ===========================================
+def new_app_test(mode: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60)
+    at.query_params["mode"] = mode
+    at.query_params["table"] = "bench"
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{mode}: {at.exception[0].message}")
+    return at
+
+
+def bench_reruns(iterations: int, standins: Standins) -> tuple:
+    from catalog import get_catalog
+
+    phrases = get_catalog().phrases
+    results = {}
+    before = standins.requests()
+    app_requests = {"tts": 0, "llm": 0}
+
+    # Quick phrases: tap phrases in a skewed order (a few phrases dominate, like real service)
+    at = new_app_test("quick")
+    rng = random.Random(0)
+    samples = []
+    for _ in range(iterations):
+        phrase = phrases[min(int(rng.expovariate(0.3)), len(phrases) - 1)]
+        samples.append(timed(at.button(key=f"phrase_{phrase['ja']}").click().run))
+        app_requests["tts"] += 1
+    results["quick.phrase_tap"] = percentiles(samples)
+
+    # Call staff
+    at = new_app_test("call")
+    results["call.sumimasen"] = percentiles([timed(at.button(key="call_sumimasen").click().run)
+                                             for _ in range(iterations)])
+
+    # Practice: switch phrase + listen
+    at = new_app_test("practice")
+    samples = []
+    for i in range(iterations):
+        at.selectbox[0].set_value(phrases[i % len(phrases)]['ja'])
+        samples.append(timed(at.run))
+        samples.append(timed(at.button(key="practice_listen_btn").click().run))
+        app_requests["tts"] += 1
+    results["practice.select_and_listen"] = percentiles(samples)
+
+    # Translate: a handful of distinct sentences, repeated
+    at = new_app_test("translate")
+    samples = []
+    for i in range(iterations):
+        at.text_area[0].input(f"Could I have some water please ({i % 5})")
+        samples.append(timed(at.button(key="translate_btn").click().run))
+        app_requests["llm"] += 1
+        app_requests["tts"] += 1
+    results["translate.translate"] = percentiles(samples)
+
+    # Idle rerun (nothing clicked) per mode
+    for mode in ("quick", "call", "practice", "translate"):
+        at = new_app_test(mode)
+        results[f"{mode}.idle_rerun"] = percentiles([timed(at.run) for _ in range(iterations)])
+
+    after = standins.requests()
+    upstream = {"tts": after["tts"] - before["tts"], "llm": after["chat"] - before["chat"]}
+    caches = {}
+    for name in ("tts", "llm"):
+        requested = app_requests[name]
+        caches[name] = {
+            "app_requests": requested,
+            "upstream_requests": upstream[name],
+            "hit_rate": round(1 - upstream[name] / requested, 3) if requested else None,
+        }
+    return results, caches
+
+
+def bench_stt(iterations: int, standins: Standins) -> dict:
+    """STT has no AppTest driver (st.audio_input); exercise the provider path directly"""
+    from stt import WhisperSTT
+    from standin_server import MP3_FRAME
+
+    stt = WhisperSTT()
+    before = standins.requests()["stt"]
+    audio = MP3_FRAME * 80
+    samples = [timed(stt.transcribe_bytes, audio, "practice.mp3", "ja") for _ in range(iterations)]
+    upstream = standins.requests()["stt"] - before
+    return {
+        "latency": percentiles(samples),
+        "cache": {"app_requests": iterations, "upstream_requests": upstream,
+                  "hit_rate": round(1 - upstream / iterations, 3)},
+    }
+
+
+# ===========================================
+# Storage throughput
+# ===========================================
+def bench_storage(operations: int) -> dict:
+    from storage import call_staff, log_usage
+
+    results = {}
+    start = time.perf_counter()
+    for i in range(operations):
+        log_usage("phrase_tap", f"phrase-{i % 20}", "basic", "en", str(i % 30))
+    elapsed = time.perf_counter() - start
+    results["log_usage"] = {"ops": operations, "ops_per_sec": round(operations / elapsed, 1),
+                            "mean_ms": round(elapsed / operations * 1000, 3)}
+
+    start = time.perf_counter()
+    for i in range(operations):
+        call_staff(str(i % 30), ("call", "water", "bill", "menu")[i % 4], "bench", "en")
+    elapsed = time.perf_counter() - start
+    results["call_staff"] = {"ops": operations, "ops_per_sec": round(operations / elapsed, 1),
+                             "mean_ms": round(elapsed / operations * 1000, 3)}
+    return results
+
+
+# ===========================================
+# Dashboard queries
+# ===========================================
+def populate(rows: int):
+    """Bulk-load `rows` staff calls and usage logs spread over the last 30 days"""
+    from storage import init_db, rebuild_usage_rollups
+    from storage.sqlite_store import get_connection
+
+    init_db()
+    rng = random.Random(rows)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    languages = ("en", "zh", "vi", "ne", "ko")
+    call_types = ("call", "water", "bill", "menu", "toilet", "problem")
+
+    conn = get_connection()
+    conn.execute("DELETE FROM staff_calls")
+    conn.execute("DELETE FROM usage_logs")
+    chunk = 100_000
+    for offset in range(0, rows, chunk):
+        calls, logs = [], []
+        for i in range(offset, min(offset + chunk, rows)):
+            created = now - timedelta(seconds=rng.randrange(30 * 86400))
+            pending = rng.random() < 0.01
+            responded = None if pending else (created + timedelta(seconds=rng.lognormvariate(4, 0.6))).strftime(fmt)
+            calls.append((str(rng.randrange(1, 31)), rng.choice(call_types), "bench",
+                          "pending" if pending else "responded", created.strftime(fmt), responded,
+                          i + 1, rng.choice(languages)))
+            logs.append(("phrase_tap", f"phrase-{rng.randrange(20)}", "basic", rng.choice(languages),
+                         str(rng.randrange(1, 31)), created.strftime(fmt)))
+        conn.executemany('''INSERT INTO staff_calls (table_id, call_type, message, status, created_at,
+                                                     responded_at, change_seq, language)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', calls)
+        conn.executemany('''INSERT INTO usage_logs (action, phrase_ja, phrase_category, language, table_id, created_at)
+                            VALUES (?, ?, ?, ?, ?, ?)''', logs)
+        conn.commit()
+    conn.close()
+    rebuild_usage_rollups()
+
+
+def bench_dashboard(rows: int, repeats: int) -> dict:
+    from storage import get_call_changes, get_hourly_usage, get_recent_calls, get_usage_stats
+    from analytics import compute_response_times, get_stage_latency
+
+    load_start = time.perf_counter()
+    populate(rows)
+    results = {"rows": rows, "load_seconds": round(time.perf_counter() - load_start, 2)}
+
+    queries = {
+        "get_usage_stats": get_usage_stats,
+        "get_hourly_usage": get_hourly_usage,
+        "get_call_changes_snapshot": lambda: get_call_changes(None),
+        "get_recent_calls": get_recent_calls,
+        "get_stage_latency": get_stage_latency,
+        "compute_response_times_24h": lambda: compute_response_times(
+            start=(datetime.utcnow() - timedelta(hours=24)).strftime("%Y-%m-%d %H:%M:%S")),
+        "compute_response_times_all": compute_response_times,
+    }
+    for name, query in queries.items():
+        results[name] = percentiles([timed(query) for _ in range(repeats)])
+    return results
+
+
+# ===========================================
+# Reporting
+# ===========================================
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline_path: Path, report: dict):
+    """Print metrics that moved by more than 10% against a previous result file"""
+    baseline = flatten(json.loads(baseline_path.read_text())["results"])
+    current = flatten(report["results"])
+    print(f"\nvs {baseline_path.name}:")
+    for key in sorted(set(baseline) & set(current)):
+        old, new = baseline[key], current[key]
+        if not (key.endswith("_ms") or key.endswith("ops_per_sec") or key.endswith("hit_rate")) or not old:
+            continue
+        change = (new - old) / old
+        if abs(change) >= 0.10:
+            print(f"  {key:60} {old:>12} -> {new:<12} ({change:+.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="AppTest interactions per mode")
+    parser.add_argument("--operations", type=int, default=1000, help="Writes per storage benchmark")
+    parser.add_argument("--sizes", default="10000,1000000", help="Comma-separated dashboard table sizes")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per dashboard query")
+    parser.add_argument("--provider-latency-ms", type=float, default=0.0,
+                        help="Stand-in API latency (0 isolates the app's own overhead)")
+    parser.add_argument("--skip", default="", help="Comma-separated sections to skip (reruns,stt,storage,dashboard)")
+    parser.add_argument("--out", help="Result file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Previous result file to diff against")
+    args = parser.parse_args()
+    skip = set(filter(None, args.skip.split(",")))
+
+    os.environ.setdefault("BRIDGE_TRACING", "0")
+    standins = Standins(args.provider_latency_ms)
+    guard = PublishedAudioGuard()
+    results = {}
+    try:
+        from storage import init_db
+        init_db()
+
+        if "reruns" not in skip:
+            print("Reruns...")
+            results["reruns"], results["caches"] = bench_reruns(args.iterations, standins)
+        if "stt" not in skip:
+            print("STT...")
+            stt = bench_stt(args.iterations, standins)
+            results.setdefault("caches", {})["stt"] = stt["cache"]
+            results["stt"] = stt["latency"]
+        if "storage" not in skip:
+            print("Storage throughput...")
+            results["storage"] = bench_storage(args.operations)
+        if "dashboard" not in skip:
+            results["dashboard"] = {}
+            for size in [int(s) for s in args.sizes.split(",") if s]:
+                print(f"Dashboard queries at {size} rows...")
+                results["dashboard"][str(size)] = bench_dashboard(size, args.repeats)
+    finally:
+        standins.stop()
+        guard.restore()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{commit}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=1, ensure_ascii=False))
+    print(json.dumps(results, indent=1, ensure_ascii=False))
+    print(f"\nWritten: {out}")
+    if args.compare:
+        compare(Path(args.compare), report)
+
+
+if __name__ == '__main__':
+    main()
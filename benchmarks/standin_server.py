@@ -0,0 +1,254 @@
+"""
+Local stand-ins for the Kimi (OpenAI chat), Whisper (OpenAI audio) and ElevenLabs APIs
+Speaks enough of each wire format for KimiLLM, WhisperSTT and ElevenLabsTTS, with
+configurable latency distributions, error rates and streaming, so load tests and
+benchmarks run offline without spending API quota.
+
+    python benchmarks/standin_server.py --port 8700 --tts-latency lognormal:400,0.4 --error-rate 0.01
+
+then point the app at it:
+
+    KIMI_BASE_URL=http://127.0.0.1:8700/v1
+    OPENAI_BASE_URL=http://127.0.0.1:8700/v1
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8700
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz): 417 bytes, ~26 ms of audio
+MP3_FRAME = bytes.fromhex("fffb9064") + bytes(413)
+FRAME_SECONDS = 1152 / 44100
+
+# Rough speaking rate used to size fake audio and transcripts
+SECONDS_PER_CHAR = 0.12
+
+
+class Latency:
+    """
+    Latency distribution parsed from "<kind>:<args>" (milliseconds):
+        fixed:200   uniform:100,400   normal:300,50   lognormal:300,0.5 (median, sigma)
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(value) for value in args.split(",") if value]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(kind) != len(self.args):
+            raise ValueError(f"Bad latency spec '{spec}'")
+
+    def sample(self, rng: random.Random) -> float:
+        """One latency sample in seconds"""
+        if self.kind == "fixed":
+            ms = self.args[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(*self.args)
+        elif self.kind == "normal":
+            ms = rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            ms = median * rng.lognormvariate(0, sigma)
+        return max(ms, 0) / 1000
+
+
+class StandinConfig:
+    def __init__(self, chat_latency="lognormal:600,0.4", stt_latency="lognormal:500,0.3",
+                 tts_latency="lognormal:400,0.4", error_rate=0.0, rate_limit_rate=0.0,
+                 stream_chunk_ms=40.0, seed=None):
+        self.latency = {
+            "chat": Latency(chat_latency),
+            "stt": Latency(stt_latency),
+            "tts": Latency(tts_latency),
+        }
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunk_seconds = stream_chunk_ms / 1000
+        self.rng = random.Random(seed)
+        self.requests = {"chat": 0, "stt": 0, "tts": 0}
+        self.errors = 0
+
+
+def _failure(config: StandinConfig):
+    """Error response to return instead of a result, or None"""
+    roll = config.rng.random()
+    if roll < config.rate_limit_rate:
+        config.errors += 1
+        return JSONResponse({"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_error"}},
+                            status_code=429, headers={"retry-after": "1"})
+    if roll < config.rate_limit_rate + config.error_rate:
+        config.errors += 1
+        return JSONResponse({"error": {"message": "Internal error (stand-in)", "type": "server_error"}},
+                            status_code=500)
+    return None
+
+
+async def _delay(config: StandinConfig, kind: str):
+    config.requests[kind] += 1
+    await asyncio.sleep(config.latency[kind].sample(config.rng))
+
+
+def _fake_reply(messages: list) -> str:
+    """Deterministic reply; JSON-shaped when the prompt asks for JSON"""
+    prompt = messages[-1].get("content", "") if messages else ""
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt)
+    if '"japanese"' in prompt:
+        match = re.search(r"Input \(([^)]*)\): (.*)", prompt)
+        text = match.group(2).strip() if match else prompt[:40]
+        return json.dumps({"japanese": "少々お待ちください", "romaji": "Shoushou omachi kudasai",
+                           "explanation": f"(stand-in) {text}"}, ensure_ascii=False)
+    if "JSON" in prompt or "json" in prompt:
+        return json.dumps({"stand_in": True, "echo": prompt[:80]}, ensure_ascii=False)
+    return f"(stand-in reply) {prompt[:80]}"
+
+
+# ===========================================
+# OpenAI-compatible: chat completions (Kimi) and transcriptions (Whisper)
+# ===========================================
+async def chat_completions(request: Request):
+    config = request.app.state.config
+    body = await request.json()
+    await _delay(config, "chat")
+    failure = _failure(config)
+    if failure:
+        return failure
+
+    reply = _fake_reply(body.get("messages", []))
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = body.get("model", "stand-in")
+    usage = {"prompt_tokens": sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4,
+             "completion_tokens": len(reply) // 4}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+    if not body.get("stream"):
+        return JSONResponse({
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    async def events():
+        pieces = [reply[i:i + 8] for i in range(0, len(reply), 8)]
+        for i, piece in enumerate(pieces):
+            delta = {"content": piece} if i else {"role": "assistant", "content": piece}
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+            await asyncio.sleep(config.stream_chunk_seconds)
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def transcriptions(request: Request):
+    config = request.app.state.config
+    form = await request.form()
+    upload = form.get("file")
+    size = len(await upload.read()) if upload is not None and hasattr(upload, "read") else 0
+    language = form.get("language") or "ja"
+    await _delay(config, "stt")
+    failure = _failure(config)
+    if failure:
+        return failure
+
+    text = "すみません"
+    duration = round(max(size / 32000, 0.5), 2)
+    if form.get("response_format") == "text":
+        return Response(text, media_type="text/plain")
+    return JSONResponse({
+        "task": "transcribe", "language": language, "duration": duration, "text": text,
+        "segments": [{"id": 0, "seek": 0, "start": 0.0, "end": duration, "text": text, "tokens": [],
+                      "temperature": 0.0, "avg_logprob": -0.1, "compression_ratio": 1.0, "no_speech_prob": 0.01}],
+    })
+
+
+# ===========================================
+# ElevenLabs-compatible: text to speech
+# ===========================================
+async def text_to_speech(request: Request):
+    config = request.app.state.config
+    body = await request.json()
+    text = body.get("text", "")
+    await _delay(config, "tts")
+    failure = _failure(config)
+    if failure:
+        return failure
+
+    frames = max(int(len(text) * SECONDS_PER_CHAR / FRAME_SECONDS), 1)
+    audio = MP3_FRAME * frames
+    if not request.url.path.endswith("/stream"):
+        return Response(audio, media_type="audio/mpeg")
+
+    async def chunks():
+        chunk_size = len(MP3_FRAME) * 8
+        for i in range(0, len(audio), chunk_size):
+            yield audio[i:i + chunk_size]
+            await asyncio.sleep(config.stream_chunk_seconds)
+
+    return StreamingResponse(chunks(), media_type="audio/mpeg")
+
+
+async def voices(request: Request):
+    return JSONResponse({"voices": [{"voice_id": "standin-voice", "name": "Stand-in", "category": "premade"}]})
+
+
+async def root(request: Request):
+    # warm_up() HEADs the base URL
+    return JSONResponse({"ok": True, "stats": {**request.app.state.config.requests, "errors": request.app.state.config.errors}})
+
+
+def create_app(config: StandinConfig) -> Starlette:
+    app = Starlette(routes=[
+        Route("/", root, methods=["GET", "HEAD"]),
+        Route("/v1", root, methods=["GET", "HEAD"]),
+        Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        Route("/v1/audio/transcriptions", transcriptions, methods=["POST"]),
+        Route("/v1/text-to-speech/{voice_id}", text_to_speech, methods=["POST"]),
+        Route("/v1/text-to-speech/{voice_id}/stream", text_to_speech, methods=["POST"]),
+        Route("/v1/voices", voices),
+    ])
+    app.state.config = config
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--chat-latency", default="lognormal:600,0.4", help="Kimi chat completions (ms)")
+    parser.add_argument("--stt-latency", default="lognormal:500,0.3", help="Whisper transcriptions (ms)")
+    parser.add_argument("--tts-latency", default="lognormal:400,0.4", help="ElevenLabs text-to-speech (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with HTTP 429")
+    parser.add_argument("--stream-chunk-ms", type=float, default=40.0, help="Delay between streamed chunks")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency/error sequences")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = StandinConfig(args.chat_latency, args.stt_latency, args.tts_latency, args.error_rate,
+                           args.rate_limit_rate, args.stream_chunk_ms, args.seed)
+    print(f"Stand-in APIs on http://{args.host}:{args.port}")
+    print(f"  KIMI_BASE_URL=http://{args.host}:{args.port}/v1")
+    print(f"  OPENAI_BASE_URL=http://{args.host}:{args.port}/v1")
+    print(f"  ELEVENLABS_BASE_URL=http://{args.host}:{args.port}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, access_log=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Archive old usage logs and staff calls into monthly databases and compact bridge.db
+(run nightly, e.g. from cron, outside service hours: VACUUM briefly locks the database)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+
+# Before importing storage: BRIDGE_DB_PATH / BRIDGE_RETENTION_DAYS / BRIDGE_STORES may come from .env
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from storage import RETENTION_DAYS, archive_old_rows, init_db, list_stores, resolve_store, store_scope
+from storage.archive import get_archive_dir
+from storage.sqlite_store import get_db_path
+
+
+def archive_store(days: int, vacuum: bool):
+    print(f"Database: {get_db_path()}")
+    print(f"Archives: {get_archive_dir()}")
+    init_db()
+    result = archive_old_rows(days, vacuum=vacuum)
+    print(f"Cutoff: {result['cutoff']} UTC")
+    for table, rows in result["archived"].items():
+        print(f"  {table}: {rows} rows archived")
+    if result["months"]:
+        print(f"Months written: {', '.join(result['months'])}")
+    print(f"Size: {result['size_before'] / 1e6:.1f} MB -> {result['size_after'] / 1e6:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS,
+                        help=f"Keep this many days in the live database (default: BRIDGE_RETENTION_DAYS, {RETENTION_DAYS})")
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip compacting the live database")
+    parser.add_argument("--store", help="Store id from BRIDGE_STORES (default: the default database)")
+    parser.add_argument("--all-stores", action="store_true", help="The default database and every registered store")
+    args = parser.parse_args()
+
+    store_ids = [None, *list_stores()] if args.all_stores else [resolve_store(args.store)]
+    for store_id in store_ids:
+        with store_scope(store_id):
+            archive_store(args.days, not args.no_vacuum)
+
+
+if __name__ == '__main__':
+    main()
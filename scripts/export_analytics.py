@@ -0,0 +1,50 @@
+"""
+Export raw usage_logs / staff_calls to CSV or Parquet for BI tools
+(streams in chunks, archived months included; --incremental exports only what changed
+since the previous run under the same name)
+
+Examples:
+    python scripts/export_analytics.py --format parquet --start 2026-01-01 --end 2026-02-01
+    python scripts/export_analytics.py --incremental bi --out /srv/bi/bridge
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+
+# Before importing storage: BRIDGE_DB_PATH / BRIDGE_STORES may come from .env
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from analytics.export import EXPORT_TABLES, FORMATS, export_filename, export_table, get_export_dir
+from storage import ensure_schema, resolve_store, store_scope
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", choices=sorted(EXPORT_TABLES), action="append",
+                        help="Table to export (repeatable; default: all)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--start", help="created_at >= START (UTC, e.g. 2026-01-01 or '2026-01-01 09:00:00')")
+    parser.add_argument("--end", help="created_at < END (UTC)")
+    parser.add_argument("--incremental", metavar="NAME",
+                        help="Only rows added / changed since the last export under NAME, then save the new watermark")
+    parser.add_argument("--out", help="Output directory (default: exports/ next to the store's database)")
+    parser.add_argument("--store", help="Store id from BRIDGE_STORES (default: the default database)")
+    args = parser.parse_args()
+
+    with store_scope(resolve_store(args.store)):
+        ensure_schema()
+        out_dir = Path(args.out) if args.out else get_export_dir()
+        for table in args.table or list(EXPORT_TABLES):
+            path = out_dir / export_filename(table, args.format)
+            result = export_table(table, path, args.format, args.start, args.end, args.incremental)
+            watermark = f" (watermark {result['watermark']})" if args.incremental else ""
+            print(f"{table}: {result['rows']} rows -> {result['path']}{watermark}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Export the phrase catalog as a self-contained offline package
+(index.html + phrases.js + fingerprinted audio + manifest.json + service worker).
+
+Open index.html directly from disk, or serve the folder once over HTTP so the
+service worker caches it and staff devices keep working with no network.
+Re-running only re-renders phrases whose text, voice or model changed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from catalog import get_catalog
+from tts import AudioPostProcessor, AudioStore, PhraseAssets
+from tts.elevenlabs_tts import DEFAULT_MODEL
+
+DIST_DIR = Path(__file__).parent.parent / 'dist' / 'offline'
+MANIFEST_VERSION = 1
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Bridge for Restaurants (offline)</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 0 auto; max-width: 640px; padding: 12px; }
+  header { display: flex; gap: 8px; align-items: center; justify-content: space-between; }
+  select, input { font-size: 1rem; padding: 6px; }
+  input { width: 100%; box-sizing: border-box; margin: 8px 0; }
+  button.phrase { display: block; width: 100%; margin: 6px 0; padding: 14px; font-size: 1.1rem;
+                  text-align: left; border: 1px solid #ccc; border-radius: 8px; background: #fff; }
+  button.phrase:active { background: #eef; }
+  #card { position: sticky; bottom: 0; background: #fffbe6; border: 1px solid #e6d88a;
+          border-radius: 8px; padding: 12px; display: none; }
+  #card .ja { font-size: 1.6rem; }
+  #card .romaji { color: #666; }
+</style>
+</head>
+<body>
+<header><h2 id="title">Bridge</h2><select id="lang"></select></header>
+<div id="tagline"></div>
+<input id="search" type="search" placeholder="&#128269;">
+<div id="phrases"></div>
+<div id="card"><div class="ja"></div><div class="romaji"></div><div class="text"></div></div>
+<script src="phrases.js"></script>
+<script>
+(function () {
+  var data = window.BRIDGE_CATALOG;
+  var langSelect = document.getElementById("lang");
+  var list = document.getElementById("phrases");
+  var search = document.getElementById("search");
+  var card = document.getElementById("card");
+  var audio = new Audio();
+  var stored = localStorage.getItem("bridge_lang");
+  var browser = (navigator.language || "en").toLowerCase();
+  var lang = data.languages[stored] ? stored : "en";
+  if (!stored) {
+    Object.keys(data.languages).forEach(function (code) {
+      (data.languages[code].accept || []).forEach(function (tag) {
+        if (tag.toLowerCase() === browser || tag.toLowerCase() === browser.split("-")[0]) { lang = code; }
+      });
+    });
+  }
+
+  Object.keys(data.languages).forEach(function (code) {
+    var option = document.createElement("option");
+    option.value = code;
+    option.textContent = data.languages[code].flag + " " + data.languages[code].name;
+    langSelect.appendChild(option);
+  });
+
+  function ui(key) { return (data.ui_text[lang] || data.ui_text.en || {})[key] || key; }
+
+  function render() {
+    langSelect.value = lang;
+    document.getElementById("title").textContent = ui("app_title");
+    document.getElementById("tagline").textContent = ui("tagline");
+    search.placeholder = "\\uD83D\\uDD0D " + ui("search_phrases");
+    var query = search.value.trim().toLowerCase();
+    list.innerHTML = "";
+    data.phrases.forEach(function (phrase) {
+      var text = phrase.text[lang];
+      var haystack = [phrase.ja, phrase.romaji].concat(Object.values(phrase.text)).join(" ").toLowerCase();
+      if (query && haystack.indexOf(query) < 0) { return; }
+      var button = document.createElement("button");
+      button.className = "phrase";
+      button.textContent = phrase.icon + " " + text;
+      button.onclick = function () { show(phrase); };
+      list.appendChild(button);
+    });
+  }
+
+  function show(phrase) {
+    card.style.display = "block";
+    card.querySelector(".ja").textContent = "\\uD83C\\uDDEF\\uD83C\\uDDF5 " + phrase.ja;
+    card.querySelector(".romaji").textContent = phrase.romaji;
+    card.querySelector(".text").textContent = data.languages[lang].flag + " " + phrase.text[lang];
+    if (phrase.audio) {
+      audio.src = phrase.audio;
+      audio.play();
+    }
+  }
+
+  langSelect.onchange = function () { lang = langSelect.value; localStorage.setItem("bridge_lang", lang); render(); };
+  search.oninput = render;
+  render();
+
+  if ("serviceWorker" in navigator && location.protocol.indexOf("http") === 0) {
+    navigator.serviceWorker.register("sw.js");
+  }
+})();
+</script>
+</body>
+</html>
+"""
+
+SERVICE_WORKER_JS = """// Precache every file in manifest.json; the cache name changes with the build
+const CACHE = "bridge-offline-__BUILD_ID__";
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    fetch("manifest.json", { cache: "no-store" })
+      .then((response) => response.json())
+      .then((manifest) => caches.open(CACHE).then((cache) =>
+        cache.addAll(["./", "manifest.json", ...Object.keys(manifest.files)]))));
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(caches.keys().then((names) =>
+    Promise.all(names.filter((name) => name !== CACHE).map((name) => caches.delete(name)))));
+});
+
+self.addEventListener("fetch", (event) => {
+  event.respondWith(caches.match(event.request).then((hit) => hit || fetch(event.request)));
+});
+"""
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Write only when content differs, so unchanged files keep their mtime"""
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def load_previous_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / 'manifest.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+class AudioSource:
+    """Phrase audio from the app's published clips, falling back to live TTS"""
+
+    def __init__(self, allow_tts: bool):
+        self.assets = PhraseAssets()
+        self.allow_tts = allow_tts
+        self._tts = None
+        self.postprocessor = AudioPostProcessor() if AudioPostProcessor.enabled() else None
+
+    def fetch(self, key: str, text: str, voice_id):
+        filename = self.assets.filename_for(key)
+        if filename:
+            return (self.assets.audio_dir / filename).read_bytes()
+        if not self.allow_tts:
+            return None
+        if self._tts is None:
+            from tts import ElevenLabsTTS
+            self._tts = ElevenLabsTTS()
+        audio_data = self._tts.generate_speech(text, voice_id=voice_id)
+        if audio_data and self.postprocessor is not None:
+            audio_data = self.postprocessor.process(audio_data)
+        if audio_data:
+            # Share the clip with the app as well
+            self.assets.publish(key, audio_data)
+        return audio_data
+
+
+def export_offline_pack(pack=None, out_dir=None, allow_tts=True) -> dict:
+    # Resolve BRIDGE_PHRASE_PACK once: the bundle's name, manifest and content must agree
+    pack = pack or os.getenv('BRIDGE_PHRASE_PACK') or None
+    catalog = get_catalog(pack)
+    out_dir = Path(out_dir or DIST_DIR / (pack or 'default'))
+    audio_dir = out_dir / 'audio'
+    audio_dir.mkdir(parents=True, exist_ok=True)
+
+    old_manifest = load_previous_manifest(out_dir)
+    previous = old_manifest.get('phrases', {})
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID_USER")
+    model = os.getenv("ELEVENLABS_MODEL", DEFAULT_MODEL)
+    source = AudioSource(allow_tts)
+
+    phrases = []
+    phrase_entries = {}
+    rendered = reused = missing = 0
+    for phrase in catalog.phrases:
+        phrase_id = phrase["phrase_id"]
+        key = AudioStore.key_for(phrase["ja"], voice_id, model)
+        audio_file = None
+
+        old = previous.get(phrase_id, {})
+        if old.get('key') == key and old.get('audio') and (out_dir / old['audio']).exists():
+            audio_file = old['audio']
+            reused += 1
+        else:
+            try:
+                audio_data = source.fetch(key, phrase["ja"], voice_id)
+            except Exception as e:
+                print(f"  -> Error ({phrase_id}): {e}")
+                audio_data = None
+            if audio_data:
+                audio_file = f"audio/{sha256(audio_data)[:16]}.mp3"
+                write_if_changed(out_dir / audio_file, audio_data)
+                rendered += 1
+                print(f"Rendered: {phrase['ja']}")
+            else:
+                missing += 1
+                print(f"No audio (text only): {phrase['ja']}")
+
+        phrase_entries[phrase_id] = {"key": key, "audio": audio_file}
+        phrases.append({
+            "id": phrase_id,
+            "ja": phrase["ja"],
+            "romaji": phrase["romaji"],
+            "icon": phrase["icon"],
+            "category": phrase["category"],
+            "text": {code: phrase[code] for code in catalog.language_codes},
+            "audio": audio_file,
+        })
+
+    # Drop clips no phrase refers to any more
+    referenced = {entry["audio"] for entry in phrase_entries.values() if entry["audio"]}
+    for path in audio_dir.glob('*.mp3'):
+        if f"audio/{path.name}" not in referenced:
+            path.unlink()
+
+    data = {"languages": catalog.languages, "ui_text": catalog.ui_text, "phrases": phrases}
+    phrases_js = ("window.BRIDGE_CATALOG = " + json.dumps(data, ensure_ascii=False, sort_keys=True) + ";\n").encode('utf-8')
+    write_if_changed(out_dir / 'phrases.js', phrases_js)
+    write_if_changed(out_dir / 'index.html', INDEX_HTML.encode('utf-8'))
+
+    files = {name: sha256((out_dir / name).read_bytes()) for name in ['index.html', 'phrases.js', *sorted(referenced)]}
+    build_id = sha256(json.dumps(files, sort_keys=True).encode('utf-8'))[:16]
+    write_if_changed(out_dir / 'sw.js', SERVICE_WORKER_JS.replace('__BUILD_ID__', build_id).encode('utf-8'))
+    files['sw.js'] = sha256((out_dir / 'sw.js').read_bytes())
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "build_id": build_id,
+        "pack": pack,
+        "generated_at": old_manifest.get("generated_at") if old_manifest.get("build_id") == build_id else None,
+        "files": files,
+        "phrases": phrase_entries,
+    }
+    manifest["generated_at"] = manifest["generated_at"] or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    write_if_changed(out_dir / 'manifest.json',
+                     json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True).encode('utf-8'))
+
+    postprocess = source.postprocessor.stats() if source.postprocessor else None
+    return {"out_dir": out_dir, "build_id": build_id, "rendered": rendered, "reused": reused, "missing": missing,
+            "postprocess": postprocess}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pack", help="Phrase pack name in src/catalog/packs (default: BRIDGE_PHRASE_PACK)")
+    parser.add_argument("--out", help=f"Output directory (default: {DIST_DIR}/<pack>)")
+    parser.add_argument("--no-tts", action="store_true",
+                        help="Only use already published clips (scripts/generate_phrase_audio.py); never call ElevenLabs")
+    parser.add_argument("--zip", action="store_true", help="Also write <out>.zip for copying to devices")
+    args = parser.parse_args()
+
+    result = export_offline_pack(args.pack, args.out, allow_tts=not args.no_tts)
+    print()
+    print(f"Output: {result['out_dir']}  (build {result['build_id']})")
+    print(f"Audio: {result['rendered']} rendered, {result['reused']} unchanged, {result['missing']} missing")
+    postprocess = result['postprocess']
+    if postprocess and postprocess['clips']:
+        print(f"Post-processed {postprocess['clips']} new clip(s): {postprocess['bytes_saved']:,} bytes saved, "
+              f"{postprocess['trimmed_seconds']:.1f} s of silence trimmed")
+    if args.zip:
+        archive = shutil.make_archive(str(result['out_dir']), 'zip', result['out_dir'])
+        print(f"Archive: {archive}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
 """
-Generate audio files for all quick phrases (offline cache)
+Generate audio files for all catalog phrases (offline cache)
+Clips are published as fingerprinted static assets (src/static/audio) that the app
+plays straight from the browser cache.
 """
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -11,60 +14,39 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / '.env')
 
-from tts import ElevenLabsTTS
-
-# 20 Quick Phrases
-QUICK_PHRASES = [
-    "すみません！",
-    "お会計お願いします",
-    "トイレはどこですか？",
-    "カードは使えますか？",
-    "おすすめは何ですか？",
-    "これをください",
-    "水をください",
-    "メニューをください",
-    "アレルギーがあります",
-    "辛くしないでください",
-    "いらっしゃいませ",
-    "少々お待ちください",
-    "お待たせいたしました",
-    "かしこまりました",
-    "申し訳ございません",
-    "ありがとうございました",
-    "またのお越しをお待ちしております",
-    "こちらへどうぞ",
-    "ご注文はお決まりですか？",
-    "以上でよろしいですか？",
-]
-
-def generate_all_audio():
-    audio_dir = Path(__file__).parent.parent / 'audio'
-    audio_dir.mkdir(exist_ok=True)
+from tts import ElevenLabsTTS, AudioStore, PhraseAssets, AudioPostProcessor
+from catalog import get_catalog
 
+def generate_all_audio(pack=None):
+    # Same phrase list the app shows (default catalog + optional restaurant pack)
+    phrases = [phrase["ja"] for phrase in get_catalog(pack).phrases]
+    assets = PhraseAssets()
     tts = ElevenLabsTTS()
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID_USER")
+    # Same trimming / loudness / encoding as clips the app synthesizes on demand
+    postprocessor = AudioPostProcessor() if AudioPostProcessor.enabled() else None
 
-    print(f"Generating audio for {len(QUICK_PHRASES)} phrases...")
-    print(f"Output directory: {audio_dir}")
+    print(f"Generating audio for {len(phrases)} phrases...")
+    print(f"Output directory: {assets.audio_dir}")
     print()
 
-    for i, phrase in enumerate(QUICK_PHRASES, 1):
-        # Create safe filename from phrase
-        safe_name = phrase.replace('！', '').replace('？', '').replace('、', '_')
-        filename = f"{safe_name}.mp3"
-        filepath = audio_dir / filename
+    for i, phrase in enumerate(phrases, 1):
+        # Same key the app uses, so its phrase buttons find these files
+        key = AudioStore.key_for(phrase, voice_id, tts.model)
 
-        if filepath.exists():
-            print(f"[{i}/{len(QUICK_PHRASES)}] Skip (exists): {phrase}")
+        if assets.url_for(key):
+            print(f"[{i}/{len(phrases)}] Skip (exists): {phrase}")
             continue
 
-        print(f"[{i}/{len(QUICK_PHRASES)}] Generating: {phrase}")
+        print(f"[{i}/{len(phrases)}] Generating: {phrase}")
 
         try:
-            audio_data = tts.generate_speech(phrase, sister="User")
+            audio_data = tts.generate_speech(phrase, voice_id=voice_id)
+            if audio_data and postprocessor is not None:
+                audio_data = postprocessor.process(audio_data)
             if audio_data:
-                with open(filepath, 'wb') as f:
-                    f.write(audio_data)
-                print(f"  -> Saved: {filename}")
+                url = assets.publish(key, audio_data)
+                print(f"  -> Published: {url}")
             else:
                 print(f"  -> Error: No audio data returned")
         except Exception as e:
@@ -72,7 +54,14 @@ def generate_all_audio():
 
     print()
     print("Done!")
-    print(f"Audio files: {len(list(audio_dir.glob('*.mp3')))}")
+    print(f"Audio files: {len(list(assets.audio_dir.glob('*.mp3')))}")
+    if postprocessor is not None and postprocessor.clips:
+        stats = postprocessor.stats()
+        print(f"Post-processed: {stats['bytes_in']:,} -> {stats['bytes_out']:,} bytes "
+              f"({stats['bytes_saved']:,} saved), {stats['trimmed_seconds']:.1f} s of silence trimmed")
 
 if __name__ == '__main__':
-    generate_all_audio()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pack", help="Phrase pack name in src/catalog/packs (default: BRIDGE_PHRASE_PACK)")
+    args = parser.parse_args()
+    generate_all_audio(args.pack)
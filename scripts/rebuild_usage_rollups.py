@@ -0,0 +1,34 @@
+"""
+Rebuild the usage rollup tables from usage_logs
+(run after restoring a backup or editing usage_logs by hand)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+
+# Before importing storage: BRIDGE_DB_PATH / BRIDGE_RETENTION_DAYS / BRIDGE_STORES may come from .env
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from storage import init_db, rebuild_usage_rollups, resolve_store, store_scope
+from storage.sqlite_store import get_db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--store", help="Store id from BRIDGE_STORES (default: the default database)")
+    args = parser.parse_args()
+
+    with store_scope(resolve_store(args.store)):
+        print(f"Database: {get_db_path()}")
+        init_db()
+        aggregated = rebuild_usage_rollups()
+        print(f"Rollups rebuilt from {aggregated} usage log rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Run the headless HTTP API for table devices (see src/api/server.py)
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+import uvicorn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bridge table-device API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--keep-alive", type=int, default=75,
+                        help="Seconds an idle keep-alive connection stays open (devices reuse it between taps)")
+    args = parser.parse_args()
+
+    uvicorn.run("api.server:app", host=args.host, port=args.port,
+                timeout_keep_alive=args.keep_alive, access_log=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Fill missing phrase and UI translations in the phrase catalog (build time, via Kimi)
+
+Finds every phrase text and UI string a catalog language lacks (it would otherwise
+fall back to English at runtime), translates them in concurrent per-language batches,
+validates each result, and writes the accepted ones back into the catalog JSON.
+Results are cached under data/cache/catalog-translations, so an interrupted or
+partly rejected run only re-asks for what is still missing.
+
+    python scripts/translate_catalog.py --check          # list gaps, exit 1 if any
+    python scripts/translate_catalog.py                  # default catalog
+    python scripts/translate_catalog.py --pack example-izakaya --languages ko,th
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from catalog.phrase_catalog import DEFAULT_CATALOG, FALLBACK_LANGUAGE, format_catalog_json, format_pack_json, pack_path
+from storage import ensure_schema
+from storage.shared_cache import DiskCache
+
+# Strings per LLM request, concurrent requests, and extra rounds for rejected strings
+BATCH_SIZE = 20
+WORKERS = 4
+RETRIES = 2
+
+CACHE_NAMESPACE = "catalog-translations"
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# A translation into these languages must contain at least one character of their script
+LANGUAGE_SCRIPTS = {
+    "zh": re.compile(r"[\u4e00-\u9fff]"),
+    "ko": re.compile(r"[\uac00-\ud7af]"),
+    "th": re.compile(r"[\u0e00-\u0e7f]"),
+    "ne": re.compile(r"[\u0900-\u097f]"),
+}
+PLACEHOLDER = re.compile(r"\{[^{}]*\}")
+
+# Longest accepted translation relative to its English / Japanese reference
+MAX_LENGTH_RATIO = 4
+MAX_LENGTH_SLACK = 20
+
+
+def load_json(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_missing(source: dict, languages: list) -> list:
+    """
+    Strings the catalog (or pack) lacks in the given languages.
+
+    Returns:
+        [{"kind": "phrase" | "ui", "id", "lang", "ja", "en"}]; UI strings have no Japanese,
+        and only UI keys present in English can be filled
+    """
+    missing = []
+    for phrase in source.get("phrases", []):
+        texts = phrase.get("text", {})
+        for lang in languages:
+            if not texts.get(lang):
+                missing.append({"kind": "phrase", "id": phrase["id"], "lang": lang,
+                                "ja": phrase["ja"], "en": texts.get(FALLBACK_LANGUAGE)})
+    ui_text = source.get("ui_text", {})
+    for key, en in ui_text.get(FALLBACK_LANGUAGE, {}).items():
+        for lang in languages:
+            if lang != FALLBACK_LANGUAGE and not ui_text.get(lang, {}).get(key):
+                missing.append({"kind": "ui", "id": key, "lang": lang, "ja": None, "en": en})
+    return missing
+
+
+def cache_key(model: str, item: dict) -> str:
+    return hashlib.sha1(json.dumps([model, item["kind"], item["lang"], item["ja"], item["en"]],
+                                   ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def validate(item: dict, text) -> str:
+    """Reason a translation is rejected ("" if it is acceptable)"""
+    if not isinstance(text, str) or not text.strip():
+        return "empty"
+    if "\n" in text.strip():
+        return "multi-line"
+    reference = item["en"] or item["ja"]
+    if len(text) > MAX_LENGTH_RATIO * len(reference) + MAX_LENGTH_SLACK:
+        return "too long"
+    if sorted(PLACEHOLDER.findall(text)) != sorted(PLACEHOLDER.findall(reference)):
+        return "placeholders changed"
+    script = LANGUAGE_SCRIPTS.get(item["lang"])
+    if script and not script.search(text):
+        return "wrong script"
+    return ""
+
+
+def batches(items: list, size: int):
+    """Chunks of at most size items sharing one language and kind (one prompt each)"""
+    groups = {}
+    for item in items:
+        groups.setdefault((item["lang"], item["kind"]), []).append(item)
+    for (lang, kind), group in groups.items():
+        for i in range(0, len(group), size):
+            yield lang, kind, group[i:i + size]
+
+
+def translate_batch(kimi, lang_name: str, kind: str, items: list) -> dict:
+    """{id: text} for one batch ({} if the request failed)"""
+    payload = {item["id"]: {"ja": item["ja"], "en": item["en"]} for item in items}
+    try:
+        return kimi.translate_catalog(payload, lang_name, kind)
+    except Exception as e:
+        print(f"  ! {kind} batch ({len(items)}) to {lang_name} failed: {e}")
+        return {}
+
+
+def apply_translations(source: dict, accepted: list, order: list):
+    """Write accepted translations into the catalog dict, keeping texts in catalog language order"""
+    phrases = {phrase["id"]: phrase for phrase in source.get("phrases", [])}
+    ui_text = dict(source.get("ui_text", {}))
+    for item, text in accepted:
+        if item["kind"] == "phrase":
+            phrases[item["id"]].setdefault("text", {})[item["lang"]] = text
+        else:
+            ui_text.setdefault(item["lang"], {})[item["id"]] = text
+
+    def ordered(texts: dict, keys: list) -> dict:
+        return {key: texts[key] for key in keys if key in texts} | texts
+
+    if ui_text or "ui_text" in source:  # Packs without UI overrides stay without the key
+        source["ui_text"] = ordered(ui_text, order)
+        en_keys = list(ui_text.get(FALLBACK_LANGUAGE, {}))
+        for lang, texts in source["ui_text"].items():
+            source["ui_text"][lang] = ordered(texts, en_keys)
+    for phrase in phrases.values():
+        if "text" in phrase:
+            phrase["text"] = ordered(phrase["text"], order)
+
+
+def fill_catalog(path: Path, languages: dict, batch_size: int = BATCH_SIZE, workers: int = WORKERS,
+                 retries: int = RETRIES, dry_run: bool = False) -> dict:
+    """
+    Translate everything the catalog file lacks and write it back.
+
+    Args:
+        path: default.json or a pack file
+        languages: {code: name} to fill
+        batch_size: Strings per request
+        workers: Concurrent requests
+        retries: Extra rounds for strings that failed validation (sent in smaller batches)
+        dry_run: Translate and report, but leave the file untouched
+
+    Returns:
+        dict with "missing", "cached", "translated" and "rejected" ([(item, reason)])
+    """
+    from llm import KimiLLM
+
+    ensure_schema()  # Build-time tokens are metered like any other LLM call
+    source = load_json(path)
+    missing = find_missing(source, list(languages))
+    cache = DiskCache(CACHE_NAMESPACE, CACHE_MAX_BYTES)
+    kimi = KimiLLM() if missing else None
+    model = kimi.model if kimi else ""
+
+    accepted, pending, cached = [], [], 0
+    for item in missing:
+        text = cache.get(cache_key(model, item))
+        if text is not None:
+            accepted.append((item, text.decode("utf-8")))
+            cached += 1
+        else:
+            pending.append(item)
+
+    rejected = []
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        size = batch_size if attempt == 0 else max(1, batch_size // (4 * attempt))
+        jobs = list(batches(pending, size))
+        print(f"Round {attempt + 1}: {len(pending)} strings in {len(jobs)} requests")
+        pending, rejected = [], []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(translate_batch, kimi, languages[lang], kind, items): items
+                       for lang, kind, items in jobs}
+            for future in as_completed(futures):
+                result = future.result()
+                for item in futures[future]:
+                    text = result.get(item["id"])
+                    reason = validate(item, text)
+                    if reason:
+                        pending.append(item)
+                        rejected.append((item, reason))
+                        continue
+                    text = text.strip()
+                    cache.put(cache_key(model, item), text.encode("utf-8"))
+                    accepted.append((item, text))
+
+    if accepted and not dry_run:
+        apply_translations(source, accepted, list(load_json(DEFAULT_CATALOG)["languages"]))
+        # Each file keeps its own hand-edited layout; an unchanged catalog is not rewritten
+        text = (format_catalog_json if path == DEFAULT_CATALOG else format_pack_json)(source)
+        if text != path.read_text(encoding="utf-8"):
+            path.write_text(text, encoding="utf-8")
+    return {"missing": len(missing), "cached": cached, "translated": len(accepted) - cached, "rejected": rejected}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pack", help="Phrase pack name in src/catalog/packs (default: the default catalog)")
+    parser.add_argument("--languages", help="Comma-separated language codes (default: every catalog language)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"Strings per request (default: {BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Concurrent requests (default: {WORKERS})")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help=f"Extra rounds for rejected strings (default: {RETRIES})")
+    parser.add_argument("--check", action="store_true", help="Only list missing translations; exit 1 if there are any")
+    parser.add_argument("--dry-run", action="store_true", help="Translate and report without writing the catalog")
+    args = parser.parse_args()
+
+    path = pack_path(args.pack) if args.pack else DEFAULT_CATALOG
+    catalog_languages = load_json(DEFAULT_CATALOG)["languages"]
+    codes = args.languages.split(",") if args.languages else list(catalog_languages)
+    unknown = [code for code in codes if code not in catalog_languages]
+    if unknown:
+        parser.error(f"Unknown language(s): {', '.join(unknown)}")
+    languages = {code: catalog_languages[code]["name"] for code in codes}
+
+    if args.check:
+        missing = find_missing(load_json(path), list(languages))
+        counts = {}
+        for item in missing:
+            counts[(item["lang"], item["kind"])] = counts.get((item["lang"], item["kind"]), 0) + 1
+        for (lang, kind), count in sorted(counts.items()):
+            print(f"{lang}: {count} {kind} string(s) missing")
+        print(f"{path.name}: {len(missing)} missing translation(s)")
+        sys.exit(1 if missing else 0)
+
+    report = fill_catalog(path, languages, args.batch_size, args.workers, args.retries, args.dry_run)
+    print(f"{path.name}: {report['missing']} missing, {report['cached']} from cache, "
+          f"{report['translated']} translated, {len(report['rejected'])} rejected")
+    for item, reason in report["rejected"]:
+        print(f"  - {item['lang']} {item['kind']} '{item['id']}': {reason}")
+    if report["rejected"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
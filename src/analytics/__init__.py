@@ -0,0 +1,14 @@
+from .export import EXPORT_TABLES, export_table, parquet_available
+from .latency import get_stage_latency
+from .response_times import compute_response_times, get_response_times
+from .usage_history import get_monthly_usage
+
+__all__ = [
+    "EXPORT_TABLES",
+    "compute_response_times",
+    "export_table",
+    "get_monthly_usage",
+    "get_response_times",
+    "get_stage_latency",
+    "parquet_available",
+]
@@ -0,0 +1,249 @@
+"""
+Raw data export for BI tools
+Streams usage_logs / staff_calls (archived months first, then the live table) in bounded
+chunks into CSV or Parquet files, so memory stays flat however large the tables get.
+Incremental exports resume from a watermark saved in the store's database.
+"""
+
+import csv
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from storage.archive import connect_archive, list_archives
+from storage.sqlite_store import get_connection, get_db_path, get_export_watermark, set_export_watermark
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Exportable tables and the column their watermark follows: usage_logs rows are
+# insert-only, staff_calls rows are updated on response and change_seq moves on every write
+EXPORT_TABLES = {
+    "usage_logs": "id",
+    "staff_calls": "change_seq",
+}
+
+FORMATS = ("csv", "parquet")
+
+# Rows per chunk read from SQLite and written to the file (bounds peak memory)
+CHUNK_ROWS = 50_000
+
+# SQLite timestamps are UTC text; Parquet gets real timestamp columns
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parquet_available() -> bool:
+    """Parquet export needs the optional pyarrow package"""
+    return pa is not None
+
+
+def get_export_dir() -> Path:
+    """Default output directory of the store in effect (exports/ next to its database)"""
+    return get_db_path().parent / "exports"
+
+
+def _table_columns(conn, table: str) -> list:
+    """(name, declared type) of a table, [] if the database doesn't have it"""
+    return [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _where(table: str, start: Optional[str], end: Optional[str], after: Optional[int]):
+    """WHERE clause and parameters selecting an export's rows"""
+    conditions, params = [], []
+    if start:
+        conditions.append("created_at >= ?")
+        params.append(start)
+    if end:
+        conditions.append("created_at < ?")
+        params.append(end)
+    if after is not None:
+        conditions.append(f"{EXPORT_TABLES[table]} > ?")
+        params.append(after)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def _connections(start: Optional[str], end: Optional[str]) -> list:
+    """Connection factories for the archived months in range, then the live database"""
+    connections = [lambda path=path: connect_archive(path) for path in list_archives(start, end)]
+    connections.append(get_connection)
+    return connections
+
+
+def count_rows(table: str, start: Optional[str] = None, end: Optional[str] = None,
+               after: Optional[int] = None) -> int:
+    """Rows iter_chunks() would yield for the same arguments (archived months included)"""
+    where, params = _where(table, start, end, after)
+    total = 0
+    for connect in _connections(start, end):
+        conn = connect()
+        try:
+            if _table_columns(conn, table):
+                total += conn.execute(f"SELECT COUNT(*) FROM {table} {where}", params).fetchone()[0]
+        finally:
+            conn.close()
+    return total
+
+
+def iter_chunks(table: str, start: Optional[str] = None, end: Optional[str] = None,
+                after: Optional[int] = None, chunk_rows: int = CHUNK_ROWS):
+    """
+    Stream a table's rows in chunks, archived months first.
+
+    Args:
+        table: "usage_logs" or "staff_calls"
+        start: Inclusive lower bound on created_at (SQLite UTC timestamp), None for no bound
+        end: Exclusive upper bound on created_at, None for no bound
+        after: Only rows whose watermark column is greater than this (incremental export)
+        chunk_rows: Rows per chunk
+
+    Yields:
+        Lists of row tuples in the live table's column order (see export_columns())
+    """
+    conn = get_connection()
+    try:
+        columns = [name for name, kind in _table_columns(conn, table)]
+    finally:
+        conn.close()
+
+    where, params = _where(table, start, end, after)
+    for connect in _connections(start, end):
+        conn = connect()
+        try:
+            present = {name for name, kind in _table_columns(conn, table)}
+            if not present:
+                continue
+            # Archives written before a schema upgrade lack the newer columns
+            select = ", ".join(name if name in present else f"NULL AS {name}" for name in columns)
+            c = conn.cursor()
+            c.execute(f"SELECT {select} FROM {table} {where} ORDER BY id", params)
+            while True:
+                rows = c.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+
+def export_columns(table: str) -> list:
+    """(name, declared type) of the live table, in export order"""
+    conn = get_connection()
+    try:
+        return _table_columns(conn, table)
+    finally:
+        conn.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: list):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, kind in columns])
+
+    def write(self, rows: list):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """One row group per chunk, typed from the SQLite declared column types"""
+
+    def __init__(self, path: Path, columns: list):
+        self._columns = columns
+        self._schema = pa.schema([(name, self._arrow_type(kind)) for name, kind in columns])
+        self._writer = pq.ParquetWriter(str(path), self._schema, compression="zstd")
+
+    @staticmethod
+    def _arrow_type(kind: str):
+        if kind.startswith("INT"):
+            return pa.int64()
+        if kind in ("REAL", "FLOAT", "DOUBLE"):
+            return pa.float64()
+        if kind == "TIMESTAMP":
+            return pa.timestamp("s", tz="UTC")
+        return pa.string()
+
+    def write(self, rows: list):
+        arrays = []
+        for index, (name, kind) in enumerate(self._columns):
+            values = [row[index] for row in rows]
+            if kind == "TIMESTAMP":
+                text = pa.array(values, type=pa.string())
+                arrays.append(pc.assume_timezone(pc.strptime(text, format=TIMESTAMP_FORMAT, unit="s"), "UTC"))
+            else:
+                arrays.append(pa.array(values, type=self._schema.field(name).type))
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def export_table(table: str, path: Path, fmt: str = "csv", start: Optional[str] = None,
+                 end: Optional[str] = None, incremental: Optional[str] = None,
+                 chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Export one table to a CSV or Parquet file, streaming chunk by chunk.
+
+    The file appears under its final name only once complete, and an incremental
+    export's watermark moves only after that, so a failed run is simply repeated.
+
+    Args:
+        table: "usage_logs" or "staff_calls"
+        path: Output file
+        fmt: "csv" or "parquet" (needs pyarrow)
+        start: Inclusive lower bound on created_at (SQLite UTC timestamp)
+        end: Exclusive upper bound on created_at
+        incremental: Watermark name: export only rows added / changed since the last
+            export under this name, then advance it (None = full export)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        dict with "table", "path", "rows" and "watermark" (None for a full export)
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table '{table}' (expected one of {sorted(EXPORT_TABLES)})")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (expected one of {FORMATS})")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    after = get_export_watermark(incremental, table) if incremental else None
+    columns = export_columns(table)
+    watermark_index = [name for name, kind in columns].index(EXPORT_TABLES[table])
+
+    tmp_path = path.with_name(path.name + ".part")
+    writer = (_ParquetWriter if fmt == "parquet" else _CsvWriter)(tmp_path, columns)
+    rows_written = 0
+    watermark = after
+    try:
+        for rows in iter_chunks(table, start, end, after, chunk_rows):
+            writer.write(rows)
+            rows_written += len(rows)
+            chunk_max = max((row[watermark_index] for row in rows if row[watermark_index] is not None), default=None)
+            if chunk_max is not None and (watermark is None or chunk_max > watermark):
+                watermark = chunk_max
+    except BaseException:
+        writer.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    writer.close()
+    os.replace(tmp_path, path)
+
+    if incremental and watermark is not None:
+        set_export_watermark(incremental, table, watermark, rows_written)
+    return {"table": table, "path": path, "rows": rows_written, "watermark": watermark if incremental else None}
+
+
+def export_filename(table: str, fmt: str, now: Optional[datetime] = None) -> str:
+    """<table>-<UTC timestamp>.<format>, sortable by export time"""
+    now = now or datetime.utcnow()
+    return f"{table}-{now.strftime('%Y%m%d-%H%M%S')}.{fmt}"
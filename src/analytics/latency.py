@@ -0,0 +1,43 @@
+"""
+Stage latency analytics
+Percentiles of the persisted trace spans (see tracing/) per stage and UI mode.
+"""
+
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from storage.sqlite_store import get_span_durations
+
+
+def get_stage_latency(hours: float = 24) -> list:
+    """
+    Latency summary of traced stages over the last `hours`.
+
+    Returns:
+        One dict per (stage, mode): count, errors, p50_ms, p95_ms, max_ms;
+        slowest p95 first
+    """
+    groups = defaultdict(list)
+    errors = defaultdict(int)
+    for stage, mode, duration_ms, ok in get_span_durations(time.time() - hours * 3600):
+        groups[(stage, mode)].append(duration_ms)
+        if not ok:
+            errors[(stage, mode)] += 1
+
+    rows = []
+    for (stage, mode), durations in groups.items():
+        values = np.asarray(durations, dtype=np.float64)
+        p50, p95 = np.percentile(values, [50, 95])
+        rows.append({
+            "stage": stage,
+            "mode": mode,
+            "count": len(values),
+            "errors": errors[(stage, mode)],
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "max_ms": round(float(values.max()), 1),
+        })
+    rows.sort(key=lambda row: -row["p95_ms"])
+    return rows
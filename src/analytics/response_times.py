@@ -0,0 +1,192 @@
+"""
+Staff response-time analytics
+Streams responded staff_calls in chunks into fixed-size NumPy histograms, so percentiles
+over millions of calls need O(groups × bins) memory instead of O(rows).
+Monthly archives overlapping the window are streamed the same way as the live table.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from storage.archive import archive_fingerprint, connect_archive, list_archives
+from storage.sqlite_store import get_connection, get_calls_fingerprint
+from storage.stores import current_store
+
+# Histogram resolution: percentiles are exact to within BIN_SECONDS.
+# Responses slower than MAX_SECONDS land in a single overflow bin.
+BIN_SECONDS = 5
+MAX_SECONDS = 3600
+N_BINS = MAX_SECONDS // BIN_SECONDS + 1  # last bin = overflow
+
+# Rows fetched per chunk while streaming staff_calls
+CHUNK_ROWS = 50_000
+
+# Hour-of-day is reported in restaurant local time (default JST)
+UTC_OFFSET_ENV = "BRIDGE_UTC_OFFSET_HOURS"
+DEFAULT_UTC_OFFSET_HOURS = 9
+
+PERCENTILES = (50, 95, 99)
+DIMENSIONS = ("table_id", "call_type", "hour", "language")
+
+# Cached reports keyed by (store, start, end, change cursor, archive state)
+CACHE_SIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class _Accumulator:
+    """Per-group histograms plus exact count / sum / max"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.totals = {}
+
+    def add(self, labels: np.ndarray, bins: np.ndarray, seconds: np.ndarray):
+        keys, inverse = np.unique(labels, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        counts = np.bincount(inverse * N_BINS + bins, minlength=len(keys) * N_BINS).reshape(len(keys), N_BINS)
+        sums = np.bincount(inverse, weights=seconds, minlength=len(keys))
+        maxes = np.full(len(keys), -np.inf)
+        np.maximum.at(maxes, inverse, seconds)
+
+        for i, key in enumerate(keys.tolist()):
+            if key in self.histograms:
+                self.histograms[key] += counts[i]
+                total_sum, total_max = self.totals[key]
+                self.totals[key] = (total_sum + sums[i], max(total_max, maxes[i]))
+            else:
+                self.histograms[key] = counts[i].astype(np.int64)
+                self.totals[key] = (sums[i], maxes[i])
+
+    def summarize(self) -> dict:
+        return {key: _summarize(hist, *self.totals[key]) for key, hist in sorted(self.histograms.items())}
+
+
+def _percentiles_from_histogram(hist: np.ndarray, percentiles=PERCENTILES) -> dict:
+    """Percentiles (seconds) by linear interpolation inside the matching histogram bin"""
+    total = hist.sum()
+    cumulative = np.cumsum(hist)
+    result = {}
+    for p in percentiles:
+        rank = p / 100 * total
+        index = int(np.searchsorted(cumulative, rank, side="left"))
+        index = min(index, len(hist) - 1)
+        below = cumulative[index - 1] if index > 0 else 0
+        fraction = (rank - below) / hist[index] if hist[index] else 0.0
+        result[f"p{p}"] = round(float((index + fraction) * BIN_SECONDS), 1)
+    return result
+
+
+def _summarize(hist: np.ndarray, total_seconds: float, max_seconds: float) -> dict:
+    count = int(hist.sum())
+    stats = {"count": count}
+    stats.update(_percentiles_from_histogram(hist))
+    stats["mean"] = round(float(total_seconds / count), 1) if count else 0.0
+    stats["max"] = round(float(max_seconds), 1) if count else 0.0
+    return stats
+
+
+def _stream_response_times(start: Optional[str], end: Optional[str], chunk_rows: int):
+    """Yield chunks of (table_id, call_type, hour, language, seconds) as NumPy arrays"""
+    conditions = ["status = 'responded'", "responded_at IS NOT NULL"]
+    # Read at call time: .env is loaded after this module is imported
+    offset = int(os.getenv(UTC_OFFSET_ENV) or DEFAULT_UTC_OFFSET_HOURS)
+    params = [f"{offset:+d} hours"]
+    if start:
+        conditions.append("created_at >= ?")
+        params.append(start)
+    if end:
+        conditions.append("created_at < ?")
+        params.append(end)
+
+    # Archived months first (read-only), then the live table
+    connections = [lambda path=path: connect_archive(path) for path in list_archives(start, end)]
+    connections.append(get_connection)
+    for connect in connections:
+        conn = connect()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'staff_calls'")
+            if c.fetchone() is None:
+                continue
+            c.execute(f'''SELECT table_id, call_type,
+                                 CAST(strftime('%H', created_at, ?) AS INTEGER),
+                                 COALESCE(language, 'unknown'),
+                                 (julianday(responded_at) - julianday(created_at)) * 86400.0
+                          FROM staff_calls
+                          WHERE {" AND ".join(conditions)}''', params)
+            while True:
+                rows = c.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                table_ids, call_types, hours, languages, seconds = zip(*rows)
+                yield {
+                    "table_id": np.array(table_ids, dtype=str),
+                    "call_type": np.array(call_types, dtype=str),
+                    "hour": np.array(hours, dtype=np.int64),
+                    "language": np.array(languages, dtype=str),
+                    "seconds": np.clip(np.array(seconds, dtype=np.float64), 0, None),
+                }
+        finally:
+            conn.close()
+
+
+def compute_response_times(start: Optional[str] = None, end: Optional[str] = None, chunk_rows: int = CHUNK_ROWS) -> dict:
+    """
+    Compute time-to-respond statistics (responded_at - created_at) over a time window.
+
+    Args:
+        start: Inclusive lower bound on created_at (SQLite UTC timestamp), None for no bound
+        end: Exclusive upper bound on created_at, None for no bound
+        chunk_rows: Rows per streamed chunk (bounds peak memory)
+
+    Returns:
+        dict with "overall" stats, "by_<dimension>" stats for table_id / call_type /
+        hour / language, and the overall "histogram" (bin_seconds + counts)
+    """
+    overall = np.zeros(N_BINS, dtype=np.int64)
+    overall_sum = 0.0
+    overall_max = 0.0
+    accumulators = {dimension: _Accumulator() for dimension in DIMENSIONS}
+
+    for chunk in _stream_response_times(start, end, chunk_rows):
+        seconds = chunk["seconds"]
+        bins = np.minimum((seconds // BIN_SECONDS).astype(np.int64), N_BINS - 1)
+        overall += np.bincount(bins, minlength=N_BINS)
+        overall_sum += float(seconds.sum())
+        overall_max = max(overall_max, float(seconds.max()))
+        for dimension in DIMENSIONS:
+            accumulators[dimension].add(chunk[dimension], bins, seconds)
+
+    report = {"overall": _summarize(overall, overall_sum, overall_max)}
+    for dimension in DIMENSIONS:
+        report[f"by_{dimension}"] = accumulators[dimension].summarize()
+    report["histogram"] = {"bin_seconds": BIN_SECONDS, "counts": overall.tolist()}
+    return report
+
+
+def get_response_times(start: Optional[str] = None, end: Optional[str] = None) -> dict:
+    """Cached compute_response_times: recomputed only when staff_calls or the archives changed"""
+    conn = get_connection()
+    try:
+        cursor = get_calls_fingerprint(conn)
+    finally:
+        conn.close()
+
+    key = (current_store(), start, end, cursor, archive_fingerprint())
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    report = compute_response_times(start, end)
+
+    with _cache_lock:
+        _cache[key] = report
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return report
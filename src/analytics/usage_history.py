@@ -0,0 +1,74 @@
+"""
+Long-range usage analytics
+Monthly usage_logs counts: live months from the hourly rollup (which covers exactly the
+rows still in the live database), archived months from the monthly archives, counted
+once per archive file version.
+"""
+
+import threading
+from collections import defaultdict
+
+from storage.archive import connect_archive, list_archives
+from storage.sqlite_store import get_connection
+
+# Archive path -> (mtime_ns, [(month, action, count)]); an archive changes only when
+# archive_old_rows() appends to it
+_archive_counts = {}
+_archive_lock = threading.Lock()
+
+
+def _archived_monthly_counts(path) -> list:
+    """[(month, action, count)] of one archive, cached until the file changes"""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return []
+    with _archive_lock:
+        entry = _archive_counts.get(str(path))
+    if entry and entry[0] == mtime:
+        return entry[1]
+
+    rows = []
+    try:
+        conn = connect_archive(path)
+        try:
+            c = conn.cursor()
+            c.execute('''SELECT substr(created_at, 1, 7), action, COUNT(*)
+                         FROM usage_logs
+                         GROUP BY 1, action''')
+            rows = c.fetchall()
+        finally:
+            conn.close()
+    except Exception as e:
+        pass  # Archive without usage_logs (calls only) or unreadable
+    with _archive_lock:
+        _archive_counts[str(path)] = (mtime, rows)
+    return rows
+
+
+def get_monthly_usage() -> list:
+    """
+    Usage counts per month and action, archived months included.
+
+    Returns:
+        [(month "YYYY-MM", action, count)] ordered by month
+    """
+    totals = defaultdict(int)
+    for path in list_archives():
+        for month, action, count in _archived_monthly_counts(path):
+            totals[(month, action)] += count
+
+    try:
+        conn = get_connection()
+        try:
+            c = conn.cursor()
+            c.execute('''SELECT substr(hour_bucket, 1, 7), action, SUM(count)
+                         FROM usage_rollup_hourly
+                         GROUP BY 1, action''')
+            for month, action, count in c.fetchall():
+                totals[(month, action)] += count
+        finally:
+            conn.close()
+    except Exception as e:
+        pass
+    return [(month, action, count) for (month, action), count in sorted(totals.items())]
@@ -0,0 +1,3 @@
+from .server import app, create_app
+
+__all__ = ["app", "create_app"]
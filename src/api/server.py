@@ -0,0 +1,379 @@
+"""
+Headless HTTP API for table devices
+A small async (Starlette/ASGI) front end over the same storage, catalog and provider
+layers as the Streamlit app, for tablets and call buttons that only need one action.
+
+Endpoints (JSON; POST bodies may be a single object or a list for batching):
+    GET  /health
+    POST /v1/call-staff          {"table_id", "call_type", "message"?, "language"?}
+    GET  /v1/calls?cursor=&wait= pending snapshot, or changes after cursor (long-poll up to wait s)
+    GET  /v1/phrases?lang=&q=&limit=  catalog phrases (ranked search when q is given)
+    GET  /v1/phrases/{id}/audio?table=  phrase clip (mp3; ETag = content key, revalidated)
+    POST /v1/translate           {"text", "lang"?, "table_id"?}
+
+Every endpoint but /health takes ?store=<id> (multi-restaurant): the request then reads
+and writes that store's database shard and defaults to its phrase pack.
+
+Provider calls are metered per table; a throttle or daily quota answers 429, except
+translations, which fall back to a cached answer or the closest catalog phrase.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.routing import Route
+
+from catalog import get_catalog
+from metering import LimitExceeded, metering_scope, translate_with_fallback
+from storage import (
+    CALL_PRIORITY,
+    UnknownStore,
+    call_staff,
+    current_store,
+    ensure_schema,
+    ensure_store_schema,
+    get_call_changes,
+    get_call_notifier,
+    log_usage,
+    resolve_store,
+    store_pack,
+    store_scope,
+)
+from storage.sqlite_store import CALL_COLUMNS
+from tracing import trace_mode
+
+# Longest long-poll a client may ask for (seconds) and how often it re-checks
+MAX_WAIT_SECONDS = 30
+WAIT_POLL_SECONDS = 0.05
+
+# Most items accepted in one batched POST
+MAX_BATCH = 50
+
+# Most results one phrase search returns
+MAX_SEARCH_LIMIT = 50
+
+CALL_FIELDS = [name.strip() for name in CALL_COLUMNS.split(",")]
+
+# Optional shared secret for the API (Authorization: Bearer <token>)
+API_TOKEN_ENV = "BRIDGE_API_TOKEN"
+
+
+class APIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ===========================================
+# Providers (one per process, created on first use)
+# ===========================================
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _provider(name: str):
+    if name not in _providers:
+        with _providers_lock:
+            if name not in _providers:
+                if name == "kimi":
+                    from llm import KimiLLM
+                    _providers[name] = KimiLLM()
+                elif name == "tts":
+                    from tts import ElevenLabsTTS
+                    _providers[name] = ElevenLabsTTS()
+                elif name == "audio_store":
+                    from tts import shared_audio_store
+                    _providers[name] = shared_audio_store()
+                elif name == "phrase_assets":
+                    from tts import PhraseAssets
+                    _providers[name] = PhraseAssets()
+    return _providers[name]
+
+
+def _require_provider(name: str):
+    try:
+        return _provider(name)
+    except ValueError as e:
+        # Missing API key
+        raise APIError(503, str(e))
+
+
+# ===========================================
+# Helpers
+# ===========================================
+def _check_auth(request: Request):
+    token = os.getenv(API_TOKEN_ENV)
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise APIError(401, "Unauthorized")
+
+
+async def _json_items(request: Request):
+    """Parse a JSON body into (items, is_batch)"""
+    try:
+        body = json.loads(await request.body() or b"null")
+    except ValueError:
+        raise APIError(400, "Body is not valid JSON")
+    if isinstance(body, dict):
+        return [body], False
+    if isinstance(body, list) and body and all(isinstance(item, dict) for item in body):
+        if len(body) > MAX_BATCH:
+            raise APIError(413, f"At most {MAX_BATCH} items per batch")
+        return body, True
+    raise APIError(400, "Body must be a JSON object or a non-empty list of objects")
+
+
+def _batch_response(results: list, is_batch: bool) -> JSONResponse:
+    if is_batch:
+        return JSONResponse(results)
+    result = results[0]
+    return JSONResponse(result, status_code=200 if result.get("ok") else result.get("status", 400))
+
+
+def _store(request: Request) -> Optional[str]:
+    try:
+        store_id = resolve_store(request.query_params.get("store"))
+    except UnknownStore:
+        raise APIError(404, "Unknown store")
+    ensure_store_schema(store_id)
+    return store_id
+
+
+def _endpoint(handler):
+    """Auth check + ?store= routing + APIError -> JSON error response; spans inside count as mode api"""
+    async def wrapped(request: Request):
+        try:
+            _check_auth(request)
+            # Worker threads (run_in_threadpool) inherit the store from this context
+            with store_scope(_store(request)), trace_mode("api"):
+                return await handler(request)
+        except APIError as e:
+            return JSONResponse({"ok": False, "error": e.message}, status_code=e.status)
+    return wrapped
+
+
+def _catalog(request: Request):
+    """The store's phrase catalog (the pack is configuration, never a request parameter)"""
+    try:
+        return get_catalog(store_pack(current_store()))
+    except OSError:
+        raise APIError(404, "Unknown phrase pack")
+
+
+def _int_param(request: Request, name: str, default: Optional[int] = None) -> Optional[int]:
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise APIError(400, f"'{name}' must be an integer")
+
+
+# ===========================================
+# Staff calls
+# ===========================================
+def _call_staff_items(items: list) -> list:
+    results = []
+    for item in items:
+        table_id = str(item.get("table_id") or "").strip()
+        call_type = item.get("call_type")
+        if not table_id:
+            results.append({"ok": False, "status": 400, "error": "'table_id' is required"})
+            continue
+        if call_type not in CALL_PRIORITY:
+            results.append({"ok": False, "status": 400, "error": f"'call_type' must be one of {sorted(CALL_PRIORITY)}"})
+            continue
+        message = item.get("message")
+        language = item.get("language")
+        if call_staff(table_id, call_type, message, language):
+            log_usage("staff_call", message, call_type, language, table_id)
+            results.append({"ok": True})
+        else:
+            results.append({"ok": False, "status": 500, "error": "Could not record the call"})
+    return results
+
+
+async def post_call_staff(request: Request):
+    items, is_batch = await _json_items(request)
+    results = await run_in_threadpool(_call_staff_items, items)
+    return _batch_response(results, is_batch)
+
+
+async def get_calls(request: Request):
+    cursor = _int_param(request, "cursor")
+    wait = min(max(_int_param(request, "wait", 0), 0), MAX_WAIT_SECONDS)
+
+    # Read the version before querying so a change landing in between still wakes us
+    notifier = get_call_notifier()
+    version = notifier.version
+    calls, new_cursor, is_snapshot = await run_in_threadpool(get_call_changes, cursor)
+    if not calls and cursor is not None and wait:
+        # Long-poll: sleep on the event loop (no thread held) until the notifier sees a change
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while notifier.version == version and loop.time() < deadline:
+            await asyncio.sleep(WAIT_POLL_SECONDS)
+        if notifier.version != version:
+            calls, new_cursor, is_snapshot = await run_in_threadpool(get_call_changes, cursor)
+
+    return JSONResponse({
+        "cursor": new_cursor,
+        "snapshot": is_snapshot,
+        "calls": [dict(zip(CALL_FIELDS, call)) for call in calls],
+    })
+
+
+# ===========================================
+# Phrases
+# ===========================================
+def _phrase_json(phrase: dict, lang: str, catalog) -> dict:
+    return {
+        "id": phrase["phrase_id"],
+        "ja": phrase["ja"],
+        "romaji": phrase["romaji"],
+        "icon": phrase["icon"],
+        "category": phrase["category"],
+        "text": catalog.translation(phrase["phrase_id"], lang),
+    }
+
+
+async def get_phrases(request: Request):
+    catalog = _catalog(request)
+    lang = request.query_params.get("lang", "en")
+    query = request.query_params.get("q", "").strip()
+    limit = min(max(_int_param(request, "limit", 8), 1), MAX_SEARCH_LIMIT)
+    phrases = catalog.search(query, lang, limit=limit) if query else catalog.phrases
+    return JSONResponse({"lang": lang, "phrases": [_phrase_json(p, lang, catalog) for p in phrases]})
+
+
+def _phrase_audio_key(text: str) -> str:
+    """Content key of a phrase clip (same as the app's): changes with the text, voice and model"""
+    from tts import AudioStore
+    from tts.elevenlabs_tts import DEFAULT_MODEL
+
+    return AudioStore.key_for(text, os.getenv("ELEVENLABS_VOICE_ID_USER"), os.getenv("ELEVENLABS_MODEL", DEFAULT_MODEL))
+
+
+def _phrase_audio(key: str, text: str, table_id: Optional[str] = None, lang: Optional[str] = None):
+    """Published clip path or freshly synthesized bytes for a phrase"""
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID_USER")
+    assets = _provider("phrase_assets")
+    filename = assets.filename_for(key)
+    if filename:
+        return assets.audio_dir / filename, None
+
+    tts = _require_provider("tts")
+    try:
+        with metering_scope(table_id, lang):
+            audio_data = _provider("audio_store").get_or_create(key, lambda: tts.generate_speech(text, voice_id=voice_id))
+    except LimitExceeded as e:
+        raise APIError(429, f"Speech synthesis limit reached ({e.reason})")
+    if not audio_data:
+        raise APIError(502, "Speech synthesis failed")
+    assets.publish(key, audio_data)
+    return None, audio_data
+
+
+async def get_phrase_audio(request: Request):
+    catalog = _catalog(request)
+    phrase = catalog.phrase(request.path_params["phrase_id"])
+    if phrase is None:
+        raise APIError(404, "Unknown phrase")
+
+    # The URL names a phrase id, not its content: a catalog edit may change the clip, so
+    # clients revalidate every time and the ETag (content key) answers 304 before any synthesis
+    key = _phrase_audio_key(phrase["ja"])
+    headers = {"Cache-Control": "no-cache", "ETag": f'"{key}"'}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    path, audio_data = await run_in_threadpool(
+        _phrase_audio, key, phrase["ja"], request.query_params.get("table"), request.query_params.get("lang"))
+    if path is not None:
+        return FileResponse(path, media_type="audio/mpeg", headers=headers)
+    return Response(audio_data, media_type="audio/mpeg", headers=headers)
+
+
+# ===========================================
+# Translation
+# ===========================================
+def _translate_items(items: list) -> list:
+    try:
+        kimi = _provider("kimi")
+    except ValueError as e:
+        # No API key: items can still be answered from the cache or the catalog phrases
+        print(f"[API] Translation provider unavailable, using cache / phrases only: {e}")
+        kimi = None
+    catalog = get_catalog(store_pack(current_store()))
+    languages = catalog.languages
+    results = []
+    for item in items:
+        text = str(item.get("text") or "").strip()
+        lang = item.get("lang", "en")
+        if not text:
+            results.append({"ok": False, "status": 400, "error": "'text' is required"})
+            continue
+        lang_name = languages.get(lang, languages.get("en", {})).get("name", "English")
+        try:
+            with metering_scope(item.get("table_id"), lang):
+                result, source = translate_with_fallback(kimi, text, lang, lang_name, catalog)
+        except LimitExceeded as e:
+            results.append({"ok": False, "status": 429, "error": f"Translation limit reached ({e.reason})"})
+            continue
+        except Exception as e:
+            results.append({"ok": False, "status": 503 if kimi is None else 502, "error": f"Translation failed: {e}"})
+            continue
+        if result:
+            log_usage("translate", result.get("japanese"), "translate", lang, item.get("table_id"))
+            results.append({"ok": True, "source": source, **result})
+        else:
+            results.append({"ok": False, "status": 502, "error": "Unparseable translation"})
+    return results
+
+
+async def post_translate(request: Request):
+    items, is_batch = await _json_items(request)
+    results = await run_in_threadpool(_translate_items, items)
+    return _batch_response(results, is_batch)
+
+
+async def health(request: Request):
+    return JSONResponse({"ok": True})
+
+
+# ===========================================
+# App
+# ===========================================
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    ensure_schema()
+    # Start the change watcher now so the first long-poll doesn't pay for it
+    get_call_notifier()
+    yield
+
+
+def create_app() -> Starlette:
+    """Build the ASGI app (run with scripts/run_api.py or any ASGI server)"""
+    return Starlette(
+        routes=[
+            Route("/health", health),
+            Route("/v1/call-staff", _endpoint(post_call_staff), methods=["POST"]),
+            Route("/v1/calls", _endpoint(get_calls)),
+            Route("/v1/phrases", _endpoint(get_phrases)),
+            Route("/v1/phrases/{phrase_id}/audio", _endpoint(get_phrase_audio)),
+            Route("/v1/translate", _endpoint(post_translate), methods=["POST"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+app = create_app()
@@ -4,19 +4,34 @@ Bridge for Restaurants - 外国人対応AIアプリ
 """
 
 import streamlit as st
+import functools
+import inspect
 import os
 import json
-import sqlite3
+import threading
+import uuid
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Database path
-DB_PATH = Path(__file__).parent.parent / "data" / "bridge.db"
-DB_PATH.parent.mkdir(exist_ok=True)
+# Before the package imports: storage, analytics and metering read BRIDGE_* paths and
+# settings at import time, and must see the same .env as scripts/*.py
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from storage import (
+    UnknownStore,
+    call_staff,
+    ensure_schema,
+    ensure_store_schema,
+    log_usage,
+    resolve_store,
+    store_pack,
+    store_scope,
+    use_store,
+)
+from catalog import get_catalog
+from metering import LimitExceeded, metering_scope, translate_with_fallback
+from tracing import traced_mode
 
 # Page config
 st.set_page_config(
@@ -25,67 +40,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# ===========================================
-# Database Functions
-# ===========================================
-def init_db():
-    """Initialize SQLite database"""
-    conn = sqlite3.connect(str(DB_PATH))
-    c = conn.cursor()
-
-    # Staff calls table
-    c.execute('''CREATE TABLE IF NOT EXISTS staff_calls (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        table_id TEXT NOT NULL,
-        call_type TEXT NOT NULL,
-        message TEXT,
-        status TEXT DEFAULT 'pending',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        responded_at TIMESTAMP
-    )''')
-
-    # Usage logs table
-    c.execute('''CREATE TABLE IF NOT EXISTS usage_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        action TEXT NOT NULL,
-        phrase_ja TEXT,
-        phrase_category TEXT,
-        language TEXT,
-        table_id TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-
-    conn.commit()
-    conn.close()
-
-def log_usage(action: str, phrase_ja: str = None, phrase_category: str = None, language: str = None, table_id: str = None):
-    """Log usage data"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-        c.execute('''INSERT INTO usage_logs (action, phrase_ja, phrase_category, language, table_id)
-                     VALUES (?, ?, ?, ?, ?)''', (action, phrase_ja, phrase_category, language, table_id))
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        pass  # Silent fail for logging
-
-def call_staff(table_id: str, call_type: str, message: str = None):
-    """Create a staff call notification"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-        c.execute('''INSERT INTO staff_calls (table_id, call_type, message)
-                     VALUES (?, ?, ?)''', (table_id, call_type, message))
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        return False
-
-# Initialize database
-init_db()
-
 # ===========================================
 # Initialize providers (cached)
 # ===========================================
@@ -105,147 +59,103 @@ def get_stt():
     return WhisperSTT()
 
 # ===========================================
-# 20 Essential Restaurant Phrases (基本フレーズ)
+# Process bootstrap (once per process, not per rerun)
+# ===========================================
+@st.cache_resource
+def bootstrap():
+    """Check the DB schema and warm provider connections"""
+    ensure_schema()
+
+    # Open pooled HTTP clients now and warm their TLS connections in the background,
+    # so the first customer tap after a deploy doesn't pay for the handshakes
+    for factory in (get_kimi, get_tts, get_stt):
+        try:
+            provider = factory()
+        except Exception as e:
+            print(f"[BOOT] Provider unavailable: {e}")
+            continue
+        threading.Thread(target=provider.warm_up, daemon=True).start()
+    return True
+
+bootstrap()
+
+# ===========================================
+# Store (?store=<id> next to table / lang: its own database shard and phrase pack)
+# ===========================================
+if "store" in st.query_params:
+    st.session_state.store_id = st.query_params["store"]
+try:
+    st.session_state.store_id = resolve_store(st.session_state.get("store_id"))
+except UnknownStore:
+    st.error("Unknown store - please scan the QR code on your table again")
+    st.stop()
+ensure_store_schema(st.session_state.store_id)
+use_store(st.session_state.store_id)
+
+# ===========================================
+# Phrase catalog (compiled JSON, hot-reloaded; see catalog/)
+# ===========================================
+def current_catalog():
+    """This session's catalog; fragment reruns call this too, so a hot reload reaches them"""
+    return get_catalog(store_pack(st.session_state.store_id))
+
+catalog = current_catalog()
+QUICK_PHRASES = catalog.phrases
+LANGUAGES = catalog.languages
+
 # ===========================================
-QUICK_PHRASES = [
-    # Customer Call (お客様用)
-    {"ja": "すみません！", "romaji": "Sumimasen!", "icon": "🙋", "category": "call",
-     "en": "Excuse me!", "zh": "不好意思！", "vi": "Xin lỗi!", "ne": "माफ गर्नुहोस्!"},
-    {"ja": "お会計お願いします", "romaji": "Okaikei onegaishimasu", "icon": "💰", "category": "payment",
-     "en": "Check please", "zh": "结账", "vi": "Tính tiền", "ne": "बिल दिनुहोस्"},
-    {"ja": "トイレはどこですか？", "romaji": "Toire wa doko desu ka?", "icon": "🚻", "category": "question",
-     "en": "Where is the restroom?", "zh": "厕所在哪里？", "vi": "Nhà vệ sinh ở đâu?", "ne": "शौचालय कहाँ छ?"},
-    {"ja": "カードは使えますか？", "romaji": "Kaado wa tsukaemasu ka?", "icon": "💳", "category": "payment",
-     "en": "Can I use a card?", "zh": "可以刷卡吗？", "vi": "Có thể dùng thẻ không?", "ne": "कार्ड चल्छ?"},
-    {"ja": "おすすめは何ですか？", "romaji": "Osusume wa nan desu ka?", "icon": "⭐", "category": "order",
-     "en": "What do you recommend?", "zh": "推荐什么？", "vi": "Món nào ngon?", "ne": "के सिफारिस गर्नुहुन्छ?"},
-    {"ja": "これをください", "romaji": "Kore wo kudasai", "icon": "👆", "category": "order",
-     "en": "I'll have this", "zh": "我要这个", "vi": "Cho tôi cái này", "ne": "यो दिनुहोस्"},
-    {"ja": "水をください", "romaji": "Mizu wo kudasai", "icon": "💧", "category": "order",
-     "en": "Water please", "zh": "请给我水", "vi": "Cho tôi nước", "ne": "पानी दिनुहोस्"},
-    {"ja": "メニューをください", "romaji": "Menyuu wo kudasai", "icon": "📋", "category": "order",
-     "en": "Menu please", "zh": "请给我菜单", "vi": "Cho tôi menu", "ne": "मेनु दिनुहोस्"},
-    {"ja": "アレルギーがあります", "romaji": "Arerugii ga arimasu", "icon": "⚠️", "category": "allergy",
-     "en": "I have allergies", "zh": "我有过敏", "vi": "Tôi bị dị ứng", "ne": "मलाई एलर्जी छ"},
-    {"ja": "からくしないでください", "romaji": "Karaku shinaide kudasai", "icon": "🌶️", "category": "order",
-     "en": "Not spicy please", "zh": "请不要辣", "vi": "Đừng cay", "ne": "पिरो नबनाउनुहोस्"},
-    # Staff Phrases (スタッフ用)
-    {"ja": "いらっしゃいませ", "romaji": "Irasshaimase", "icon": "🙇", "category": "greeting",
-     "en": "Welcome!", "zh": "欢迎光临", "vi": "Xin chào", "ne": "स्वागत छ"},
-    {"ja": "少々お待ちください", "romaji": "Shoushou omachi kudasai", "icon": "⏳", "category": "service",
-     "en": "Please wait a moment", "zh": "请稍等", "vi": "Xin đợi một chút", "ne": "कृपया पर्खनुहोस्"},
-    {"ja": "お待たせいたしました", "romaji": "Omatase itashimashita", "icon": "🍽️", "category": "service",
-     "en": "Sorry for the wait", "zh": "让您久等了", "vi": "Xin lỗi đã để chờ", "ne": "पर्खाएकोमा माफी"},
-    {"ja": "かしこまりました", "romaji": "Kashikomarimashita", "icon": "✅", "category": "service",
-     "en": "Understood", "zh": "好的，明白了", "vi": "Vâng, tôi hiểu", "ne": "बुझें"},
-    {"ja": "申し訳ございません", "romaji": "Moushiwake gozaimasen", "icon": "🙏", "category": "apology",
-     "en": "I'm very sorry", "zh": "非常抱歉", "vi": "Tôi rất xin lỗi", "ne": "माफी चाहन्छु"},
-    {"ja": "ありがとうございました", "romaji": "Arigatou gozaimashita", "icon": "🎉", "category": "farewell",
-     "en": "Thank you very much", "zh": "非常感谢", "vi": "Cảm ơn rất nhiều", "ne": "धेरै धन्यवाद"},
-    {"ja": "またのお越しをお待ちしております", "romaji": "Mata no okoshi wo omachi shite orimasu", "icon": "👋", "category": "farewell",
-     "en": "Please come again", "zh": "欢迎下次光临", "vi": "Hẹn gặp lại", "ne": "फेरि आउनुहोस्"},
-    {"ja": "こちらへどうぞ", "romaji": "Kochira e douzo", "icon": "➡️", "category": "service",
-     "en": "This way please", "zh": "这边请", "vi": "Mời đi lối này", "ne": "यता आउनुहोस्"},
-    {"ja": "ご注文はお決まりですか？", "romaji": "Go-chuumon wa okimari desu ka?", "icon": "📝", "category": "order",
-     "en": "Ready to order?", "zh": "您要点什么？", "vi": "Quý khách gọi món?", "ne": "अर्डर तयार?"},
-    {"ja": "以上でよろしいですか？", "romaji": "Ijou de yoroshii desu ka?", "icon": "✔️", "category": "order",
-     "en": "Will that be all?", "zh": "就这些吗？", "vi": "Còn gì khác không?", "ne": "यति मात्र?"},
-]
-
-# Supported languages with auto-detection mapping
-LANGUAGES = {
-    "en": {"name": "English", "flag": "🇺🇸", "accept": ["en", "en-US", "en-GB"]},
-    "zh": {"name": "中文", "flag": "🇨🇳", "accept": ["zh", "zh-CN", "zh-TW", "zh-Hans", "zh-Hant"]},
-    "vi": {"name": "Tiếng Việt", "flag": "🇻🇳", "accept": ["vi", "vi-VN"]},
-    "ne": {"name": "नेपाली", "flag": "🇳🇵", "accept": ["ne", "ne-NP"]},
-    "ko": {"name": "한국어", "flag": "🇰🇷", "accept": ["ko", "ko-KR"]},
-    "tl": {"name": "Tagalog", "flag": "🇵🇭", "accept": ["tl", "fil", "fil-PH"]},
-    "id": {"name": "Bahasa", "flag": "🇮🇩", "accept": ["id", "id-ID"]},
-    "th": {"name": "ไทย", "flag": "🇹🇭", "accept": ["th", "th-TH"]},
-    "pt": {"name": "Português", "flag": "🇧🇷", "accept": ["pt", "pt-BR", "pt-PT"]},
-    "es": {"name": "Español", "flag": "🇪🇸", "accept": ["es", "es-ES", "es-MX"]},
-}
-
-# UI Text translations
-UI_TEXT = {
-    "en": {
-        "app_title": "Bridge for Restaurants",
-        "tagline": "Break the language barrier in 0 seconds",
-        "select_language": "Your Language",
-        "table_number": "Table Number",
-        "mode_quick": "Quick Phrases",
-        "mode_call": "Call Staff",
-        "mode_practice": "Practice",
-        "mode_translate": "Translate",
-        "call_staff": "Call Staff",
-        "call_sent": "Staff has been notified!",
-        "speak": "Speak",
-        "listen": "Listen",
-        "translate": "Translate",
-        "your_try": "Now you try!",
-        "good_job": "Great job!",
-        "try_again": "Try again",
-    },
-    "zh": {
-        "app_title": "Bridge 餐厅助手",
-        "tagline": "0秒打破语言障碍",
-        "select_language": "您的语言",
-        "table_number": "桌号",
-        "mode_quick": "快捷短语",
-        "mode_call": "呼叫服务员",
-        "mode_practice": "练习",
-        "mode_translate": "翻译",
-        "call_staff": "呼叫服务员",
-        "call_sent": "已通知服务员！",
-        "speak": "说",
-        "listen": "听",
-        "translate": "翻译",
-        "your_try": "你来试试！",
-        "good_job": "做得好！",
-        "try_again": "再试一次",
-    },
-    "vi": {
-        "app_title": "Bridge Nhà Hàng",
-        "tagline": "Phá vỡ rào cản ngôn ngữ trong 0 giây",
-        "select_language": "Ngôn ngữ của bạn",
-        "table_number": "Số bàn",
-        "mode_quick": "Cụm từ nhanh",
-        "mode_call": "Gọi nhân viên",
-        "mode_practice": "Luyện tập",
-        "mode_translate": "Dịch",
-        "call_staff": "Gọi nhân viên",
-        "call_sent": "Đã thông báo nhân viên!",
-        "speak": "Nói",
-        "listen": "Nghe",
-        "translate": "Dịch",
-        "your_try": "Bạn thử đi!",
-        "good_job": "Tốt lắm!",
-        "try_again": "Thử lại",
-    },
-    "ne": {
-        "app_title": "Bridge रेस्टुरेन्ट",
-        "tagline": "भाषाको बाधा ० सेकेन्डमा तोड्नुहोस्",
-        "select_language": "तपाईंको भाषा",
-        "table_number": "टेबल नम्बर",
-        "mode_quick": "द्रुत वाक्यांश",
-        "mode_call": "कर्मचारी बोलाउनुहोस्",
-        "mode_practice": "अभ्यास",
-        "mode_translate": "अनुवाद",
-        "call_staff": "कर्मचारी बोलाउनुहोस्",
-        "call_sent": "कर्मचारीलाई सूचित गरियो!",
-        "speak": "बोल्नुहोस्",
-        "listen": "सुन्नुहोस्",
-        "translate": "अनुवाद",
-        "your_try": "अब तपाईं प्रयास गर्नुहोस्!",
-        "good_job": "राम्रो!",
-        "try_again": "फेरि प्रयास",
-    },
-}
-
-# Add fallback for missing languages
-for lang_code in LANGUAGES:
-    if lang_code not in UI_TEXT:
-        UI_TEXT[lang_code] = UI_TEXT["en"]
+# Shared audio (sessions hold keys, not bytes)
+# ===========================================
+@st.cache_resource
+def get_audio_store():
+    from tts import shared_audio_store
+    return shared_audio_store()
+
+def synthesize(text: str):
+    """Generate speech through the shared audio store; returns its key (None on failure)"""
+    tts = get_tts()
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID_USER")
+    store = get_audio_store()
+    key = store.key_for(text, voice_id, tts.model)
+    audio_data = store.get_or_create(key, lambda: tts.generate_speech(text, voice_id=voice_id))
+    return key if audio_data else None
+
+def set_session_audio(slot: str, key):
+    """Point a session audio slot at a store key, moving this session's reference"""
+    store = get_audio_store()
+    owner = st.session_state.session_token
+    store.release(st.session_state.get(slot), owner)
+    store.acquire(key, owner)
+    st.session_state[slot] = key
+
+@st.cache_resource
+def get_phrase_assets():
+    from tts import PhraseAssets
+    return PhraseAssets()
+
+def phrase_audio_url(text: str):
+    """Static, browser-cacheable URL for a phrase clip (published on first use)"""
+    from tts import AudioStore
+    from tts.elevenlabs_tts import DEFAULT_MODEL
+
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID_USER")
+    key = AudioStore.key_for(text, voice_id, os.getenv("ELEVENLABS_MODEL", DEFAULT_MODEL))
+    assets = get_phrase_assets()
+    url = assets.url_for(key)
+    if url is None:
+        audio_data = get_audio_store().get(synthesize(text))
+        if audio_data:
+            url = assets.publish(key, audio_data)
+    return url
+
+def get_session_audio(slot: str):
+    """Audio bytes for a session audio slot (None if empty or evicted)"""
+    key = st.session_state.get(slot)
+    if key is None:
+        return None
+    store = get_audio_store()
+    store.acquire(key, st.session_state.session_token)
+    return store.get(key)
 
 # ===========================================
 # Session State Initialization
@@ -255,19 +165,28 @@ def init_session_state():
         "lang": "en",
         "table_id": "1",
         "mode": "quick",  # quick, call, practice, translate
-        "audio_data": None,
+        "audio_url": None,
         "selected_phrase": None,
-        "practice_audio": None,
+        "practice_audio_key": None,
+        "translate_audio_key": None,
         "translation_result": None,
+        "translation_source": None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
+    if "session_token" not in st.session_state:
+        st.session_state.session_token = uuid.uuid4().hex
 
-    # Auto-detect language from URL params
+    # Language: URL param wins, else the browser's Accept-Language on first load
     params = st.query_params
     if "lang" in params and params["lang"] in LANGUAGES:
         st.session_state.lang = params["lang"]
+    elif "lang_detected" not in st.session_state:
+        detected = catalog.resolve_language(st.context.headers.get("Accept-Language"))
+        if detected:
+            st.session_state.lang = detected
+    st.session_state.lang_detected = True
     if "table" in params:
         st.session_state.table_id = params["table"]
     if "mode" in params and params["mode"] in ["quick", "call", "practice", "translate"]:
@@ -277,37 +196,21 @@ init_session_state()
 
 def get_ui(key: str) -> str:
     """Get UI text in user's language"""
-    lang = st.session_state.lang
-    return UI_TEXT.get(lang, UI_TEXT["en"]).get(key, key)
+    return current_catalog().ui(st.session_state.lang, key)
 
 def get_phrase_translation(phrase: dict, lang: str) -> str:
     """Get phrase in specified language"""
-    return phrase.get(lang, phrase.get("en", phrase["ja"]))
-
-# ===========================================
-# Auto Language Detection (JavaScript)
-# ===========================================
-def inject_language_detection():
-    """Inject JavaScript to detect browser language"""
-    st.components.v1.html("""
-    <script>
-        const browserLang = navigator.language || navigator.userLanguage;
-        const urlParams = new URLSearchParams(window.location.search);
-        if (!urlParams.has('lang')) {
-            const langCode = browserLang.split('-')[0];
-            const supportedLangs = ['en', 'zh', 'vi', 'ne', 'ko', 'tl', 'id', 'th', 'pt', 'es'];
-            if (supportedLangs.includes(langCode)) {
-                urlParams.set('lang', langCode);
-                window.location.search = urlParams.toString();
-            }
-        }
-    </script>
-    """, height=0)
-
-# Inject language detection on first load
-if "lang_detected" not in st.session_state:
-    inject_language_detection()
-    st.session_state.lang_detected = True
+    return current_catalog().translation(phrase["phrase_id"], lang)
+
+def session_scoped(func):
+    """Run a panel against this session's store shard, billing provider calls to its table and language"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Fragment reruns skip the top of the script, so the store is set here too
+        with store_scope(st.session_state.store_id):
+            with metering_scope(st.session_state.table_id, st.session_state.lang):
+                return func(*args, **kwargs)
+    return wrapper
 
 # ===========================================
 # Main UI
@@ -364,31 +267,61 @@ with st.sidebar:
         st.query_params["mode"] = selected_mode
         # Clear mode-specific state
         st.session_state.selected_phrase = None
-        st.session_state.audio_data = None
-        st.session_state.practice_audio = None
+        st.session_state.audio_url = None
+        set_session_audio("practice_audio_key", None)
+        set_session_audio("translate_audio_key", None)
         st.rerun()
 
-# Main content
-st.title(get_ui("app_title"))
+# ===========================================
+# Quick Phrases Mode (20基本フレーズ)
+# ===========================================
+# Buttons shown with an empty search box / per search
+QUICK_PHRASE_LIMIT = 20
+PHRASE_RESULTS_LIMIT = 8
+
+# Search as the guest types where this Streamlit supports it (otherwise on Enter)
+SEARCH_INPUT_OPTIONS = (
+    {"type": "search", "live": "200ms"}
+    if "live" in inspect.signature(st.text_input).parameters else {}
+)
 
-if st.session_state.mode == "quick":
-    # ===========================================
-    # Quick Phrases Mode (20基本フレーズ)
-    # ===========================================
+@st.fragment
+@traced_mode("quick")
+@session_scoped
+def quick_phrases_panel():
+    """Quick phrase buttons and the selected phrase card"""
+    catalog = current_catalog()
     st.info(f"⚡ {get_ui('mode_quick')} - Tap to speak instantly!")
 
-    # Display all phrases as uniform buttons (1 column, 20 rows)
-    for phrase in QUICK_PHRASES:
+    # Type-ahead search: only the top matches are rendered as buttons
+    query = st.text_input(
+        get_ui("search_phrases"),
+        key="phrase_query",
+        placeholder="🔍",
+        label_visibility="collapsed",
+        **SEARCH_INPUT_OPTIONS,
+    )
+    if query.strip():
+        phrases = catalog.search(query, st.session_state.lang, limit=PHRASE_RESULTS_LIMIT)
+        if not phrases:
+            st.caption(get_ui("no_results"))
+    else:
+        phrases = catalog.phrases[:QUICK_PHRASE_LIMIT]
+
+    # Display phrases as uniform buttons (1 column)
+    for phrase in phrases:
         btn_label = f"{phrase['icon']} {get_phrase_translation(phrase, st.session_state.lang)}"
         if st.button(btn_label, key=f"phrase_{phrase['ja']}", use_container_width=True):
             st.session_state.selected_phrase = phrase
             log_usage("phrase_tap", phrase["ja"], phrase["category"], st.session_state.lang, st.session_state.table_id)
             # Generate TTS
+            # Play from the static asset: after the first tap the browser has it cached
             try:
-                tts = get_tts()
-                audio_data = tts.generate_speech(phrase['ja'], voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-                if audio_data:
-                    st.session_state.audio_data = audio_data
+                st.session_state.audio_url = phrase_audio_url(phrase['ja'])
+            except LimitExceeded:
+                # Over the table's / today's TTS budget: the card below still shows the text
+                st.session_state.audio_url = None
+                st.caption(f"🔇 {get_ui('limit_audio')}")
             except Exception as e:
                 st.error(f"TTS Error: {e}")
 
@@ -403,17 +336,21 @@ if st.session_state.mode == "quick":
             ### 🇯🇵 {phrase['ja']}
             **Romaji:** {phrase['romaji']}
 
-            **{LANGUAGES[st.session_state.lang]['flag']} {get_phrase_translation(phrase, st.session_state.lang)}**
+            **{catalog.languages[st.session_state.lang]['flag']} {get_phrase_translation(phrase, st.session_state.lang)}**
             """)
 
         with col2:
-            if st.session_state.audio_data:
-                st.audio(st.session_state.audio_data, format="audio/mp3", autoplay=True)
+            if st.session_state.audio_url:
+                st.audio(st.session_state.audio_url, format="audio/mp3", autoplay=True)
 
-elif st.session_state.mode == "call":
-    # ===========================================
-    # Call Staff Mode (店員呼び出し)
-    # ===========================================
+# ===========================================
+# Call Staff Mode (店員呼び出し)
+# ===========================================
+@st.fragment
+@traced_mode("call")
+@session_scoped
+def call_staff_panel():
+    """Call Staff buttons"""
     st.info(f"🔔 {get_ui('mode_call')} - One tap to notify staff!")
 
     col1, col2 = st.columns(2)
@@ -421,22 +358,21 @@ elif st.session_state.mode == "call":
     with col1:
         # Big "Sumimasen" button
         if st.button("🙋 すみません！\nExcuse me!", key="call_sumimasen", use_container_width=True):
-            if call_staff(st.session_state.table_id, "call", "すみません"):
+            if call_staff(st.session_state.table_id, "call", "すみません", st.session_state.lang):
                 st.success(f"✅ {get_ui('call_sent')} (Table {st.session_state.table_id})")
                 log_usage("staff_call", "すみません", "call", st.session_state.lang, st.session_state.table_id)
                 # Play TTS
                 try:
-                    tts = get_tts()
-                    audio_data = tts.generate_speech("すみません！", voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-                    if audio_data:
-                        st.audio(audio_data, format="audio/mp3", autoplay=True)
+                    audio_url = phrase_audio_url("すみません！")
+                    if audio_url:
+                        st.audio(audio_url, format="audio/mp3", autoplay=True)
                 except:
                     pass
 
     with col2:
         # Bill request button
         if st.button("💰 お会計\nCheck please", key="call_bill", use_container_width=True):
-            if call_staff(st.session_state.table_id, "bill", "お会計お願いします"):
+            if call_staff(st.session_state.table_id, "bill", "お会計お願いします", st.session_state.lang):
                 st.success(f"✅ {get_ui('call_sent')} (Table {st.session_state.table_id})")
                 log_usage("staff_call", "お会計", "payment", st.session_state.lang, st.session_state.table_id)
 
@@ -455,22 +391,27 @@ elif st.session_state.mode == "call":
     for i, (label, call_type, message) in enumerate(call_options):
         with cols[i]:
             if st.button(label, key=f"call_{call_type}", use_container_width=True):
-                if call_staff(st.session_state.table_id, call_type, message):
+                if call_staff(st.session_state.table_id, call_type, message, st.session_state.lang):
                     st.success("✅")
                     log_usage("staff_call", message, call_type, st.session_state.lang, st.session_state.table_id)
 
-elif st.session_state.mode == "practice":
-    # ===========================================
-    # Practice Mode (学習モード)
-    # ===========================================
+# ===========================================
+# Practice Mode (学習モード)
+# ===========================================
+@st.fragment
+@traced_mode("practice")
+@session_scoped
+def practice_panel():
+    """Phrase practice with listen + speech check"""
+    catalog = current_catalog()
     st.info(f"📚 {get_ui('mode_practice')} - Learn & practice Japanese!")
 
     # Select phrase to practice
-    phrase_options = {p['ja']: f"{p['icon']} {p['ja']} ({p['romaji']})" for p in QUICK_PHRASES}
+    phrase_options = {p['ja']: f"{p['icon']} {p['ja']} ({p['romaji']})" for p in catalog.phrases}
     selected_ja = st.selectbox("Select phrase to practice", options=list(phrase_options.keys()),
                                format_func=lambda x: phrase_options[x])
 
-    selected_phrase = next((p for p in QUICK_PHRASES if p['ja'] == selected_ja), None)
+    selected_phrase = next((p for p in catalog.phrases if p['ja'] == selected_ja), None)
 
     # Auto-generate audio when phrase changes
     if "last_practice_phrase" not in st.session_state:
@@ -479,12 +420,9 @@ elif st.session_state.mode == "practice":
         st.session_state.last_practice_phrase = selected_ja
         # Generate new audio automatically
         try:
-            tts = get_tts()
-            audio_data = tts.generate_speech(selected_ja, voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-            if audio_data:
-                st.session_state.practice_audio = audio_data
+            set_session_audio("practice_audio_key", synthesize(selected_ja))
         except:
-            st.session_state.practice_audio = None
+            set_session_audio("practice_audio_key", None)
 
     if selected_phrase:
         # Phrase card
@@ -492,22 +430,22 @@ elif st.session_state.mode == "practice":
         ### 🇯🇵 {selected_phrase['ja']}
         **Romaji:** {selected_phrase['romaji']}
 
-        **{LANGUAGES[st.session_state.lang]['flag']} {get_phrase_translation(selected_phrase, st.session_state.lang)}**
+        **{catalog.languages[st.session_state.lang]['flag']} {get_phrase_translation(selected_phrase, st.session_state.lang)}**
         """)
 
         # Listen button and audio player
         if st.button(f"🔊 {get_ui('listen')}", key="practice_listen_btn", use_container_width=True):
             try:
-                tts = get_tts()
-                audio_data = tts.generate_speech(selected_phrase['ja'], voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-                if audio_data:
-                    st.session_state.practice_audio = audio_data
+                audio_key = synthesize(selected_phrase['ja'])
+                if audio_key:
+                    set_session_audio("practice_audio_key", audio_key)
                     log_usage("listen", selected_phrase['ja'], selected_phrase['category'], st.session_state.lang)
             except Exception as e:
                 st.error(f"TTS Error: {e}")
 
-        if st.session_state.get("practice_audio"):
-            st.audio(st.session_state.practice_audio, format="audio/mp3")
+        practice_audio = get_session_audio("practice_audio_key")
+        if practice_audio:
+            st.audio(practice_audio, format="audio/mp3")
 
         st.divider()
 
@@ -533,14 +471,19 @@ elif st.session_state.mode == "practice":
             except Exception as e:
                 st.error(f"STT Error: {e}")
 
-elif st.session_state.mode == "translate":
-    # ===========================================
-    # Translate Mode (リアルタイム翻訳)
-    # ===========================================
+# ===========================================
+# Translate Mode (リアルタイム翻訳)
+# ===========================================
+@st.fragment
+@traced_mode("translate")
+@session_scoped
+def translate_panel():
+    """Free-text translation to keigo Japanese"""
+    catalog = current_catalog()
     st.info(f"🌐 {get_ui('mode_translate')} - Translate anything to Japanese!")
 
     user_input = st.text_area(
-        f"Enter text in {LANGUAGES[st.session_state.lang]['name']}",
+        f"Enter text in {catalog.languages[st.session_state.lang]['name']}",
         placeholder="What do you want to say?",
         height=100
     )
@@ -548,36 +491,32 @@ elif st.session_state.mode == "translate":
     if st.button(f"🔄 {get_ui('translate')}", key="translate_btn", use_container_width=True, type="primary"):
         if user_input:
             try:
-                kimi = get_kimi()
-                lang_name = LANGUAGES[st.session_state.lang]["name"]
-
-                prompt = f"""Translate to polite Japanese (keigo) for restaurant use:
-Input ({lang_name}): {user_input}
-
-Respond in JSON: {{"japanese": "...", "romaji": "...", "explanation": "brief {lang_name} explanation"}}"""
-
-                response = kimi.generate(prompt, system_prompt="You are a Japanese restaurant language expert. Respond only in valid JSON.")
-
-                import re
-                json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
+                try:
+                    kimi = get_kimi()
+                except Exception as e:
+                    kimi = None  # Cached answers and catalog phrases still work without the provider
+                lang_name = catalog.languages[st.session_state.lang]["name"]
+                # Identical input reuses the cached answer; over the limit, the closest phrase stands in
+                result, source = translate_with_fallback(kimi, user_input, st.session_state.lang, lang_name, catalog)
+                if result:
                     st.session_state.translation_result = result
+                    st.session_state.translation_source = source
                     log_usage("translate", result.get("japanese"), "translate", st.session_state.lang, st.session_state.table_id)
                     # Auto-generate audio after translation
                     try:
-                        tts = get_tts()
-                        audio_data = tts.generate_speech(result.get('japanese', ''), voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-                        if audio_data:
-                            st.session_state.translate_audio = audio_data
+                        set_session_audio("translate_audio_key", synthesize(result.get('japanese', '')))
                     except:
-                        st.session_state.translate_audio = None
+                        set_session_audio("translate_audio_key", None)
+            except LimitExceeded:
+                st.warning(f"⏳ {get_ui('limit_retry')}")
             except Exception as e:
                 st.error(f"Translation Error: {e}")
 
     if st.session_state.get("translation_result"):
         result = st.session_state.translation_result
         st.divider()
+        if st.session_state.get("translation_source") == "phrase":
+            st.caption(f"⏳ {get_ui('limit_phrase')}")
 
         st.markdown(f"""
         ### 🇯🇵 {result.get('japanese', '')}
@@ -588,15 +527,29 @@ Respond in JSON: {{"japanese": "...", "romaji": "...", "explanation": "brief {la
 
         if st.button(f"🔊 Speak", key="translate_speak_btn", use_container_width=True):
             try:
-                tts = get_tts()
-                audio_data = tts.generate_speech(result.get('japanese', ''), voice_id=os.getenv("ELEVENLABS_VOICE_ID_USER"))
-                if audio_data:
-                    st.session_state.translate_audio = audio_data
+                audio_key = synthesize(result.get('japanese', ''))
+                if audio_key:
+                    set_session_audio("translate_audio_key", audio_key)
             except Exception as e:
                 st.error(f"TTS Error: {e}")
 
-        if st.session_state.get("translate_audio"):
-            st.audio(st.session_state.translate_audio, format="audio/mp3")
+        translate_audio = get_session_audio("translate_audio_key")
+        if translate_audio:
+            st.audio(translate_audio, format="audio/mp3")
+
+# Main content
+st.title(get_ui("app_title"))
+
+# Each mode panel is an st.fragment: a tap inside it reruns only that panel,
+# not the sidebar, the language selector or the rest of the page
+if st.session_state.mode == "quick":
+    quick_phrases_panel()
+elif st.session_state.mode == "call":
+    call_staff_panel()
+elif st.session_state.mode == "practice":
+    practice_panel()
+elif st.session_state.mode == "translate":
+    translate_panel()
 
 # Footer
 st.markdown("---")
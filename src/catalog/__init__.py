@@ -0,0 +1,5 @@
+from .accept_language import parse_accept_language
+from .phrase_catalog import CompiledCatalog, compile_catalog, get_catalog
+from .phrase_search import PhraseSearchIndex
+
+__all__ = ["CompiledCatalog", "compile_catalog", "get_catalog", "PhraseSearchIndex", "parse_accept_language"]
@@ -0,0 +1,63 @@
+"""
+Accept-Language negotiation
+Resolves the guest's language on the server from the request header, so the first
+render is already localized (no client-side redirect).
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+# Browsers send a handful of distinct headers; parsing each once is enough
+PARSE_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_accept_language(header: Optional[str]) -> tuple:
+    """
+    Parse an Accept-Language header into language tags by preference.
+
+    Args:
+        header: Raw header value, e.g. "vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7"
+
+    Returns:
+        Lower-cased tags ordered by descending q (header order on ties),
+        without wildcards and q=0 entries
+    """
+    if not header:
+        return ()
+    weighted = []
+    for position, item in enumerate(header.split(",")):
+        tag, _, params = item.strip().partition(";")
+        tag = tag.strip().lower()
+        if not tag or tag == "*":
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            weighted.append((-q, position, tag))
+    return tuple(tag for _, _, tag in sorted(weighted))
+
+
+def build_accept_index(languages: dict) -> dict:
+    """Map every accepted tag (lower-cased) to its catalog language code"""
+    index = {}
+    for code, info in languages.items():
+        for tag in (code, *info.get("accept", ())):
+            index.setdefault(tag.lower(), code)
+    return index
+
+
+def match_language(header: Optional[str], accept_index: dict) -> Optional[str]:
+    """Best catalog language for an Accept-Language header (None if nothing matches)"""
+    for tag in parse_accept_language(header):
+        # Exact tag first (zh-tw), then its primary subtag (pt-ao -> pt)
+        code = accept_index.get(tag) or accept_index.get(tag.split("-")[0])
+        if code:
+            return code
+    return None
@@ -0,0 +1,274 @@
+"""
+Phrase catalog for Bridge
+Quick phrases, UI text and supported languages live in JSON files (catalog/data/default.json
+plus optional per-restaurant packs in catalog/packs/). They are compiled once into flat
+lookup tables indexed by phrase × language and hot-reloaded when a file changes.
+
+Pack format (catalog/packs/<name>.json), every key optional:
+    {
+        "phrases": [{"id": ..., "ja": ..., "romaji": ..., "icon": ..., "category": ..., "text": {...}}],
+        "remove": ["phrase-id", ...],
+        "ui_text": {"en": {"app_title": "..."}}
+    }
+Pack phrases with an existing id replace the default phrase; new ids are appended.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+
+from .accept_language import build_accept_index, match_language
+from .phrase_search import PhraseSearchIndex
+
+CATALOG_DIR = Path(__file__).parent
+DEFAULT_CATALOG = CATALOG_DIR / "data" / "default.json"
+PACKS_DIR = CATALOG_DIR / "packs"
+
+# Minimum seconds between file mtime checks (hot reload without a stat per rerun)
+RELOAD_CHECK_SECONDS = 2.0
+
+FALLBACK_LANGUAGE = "en"
+
+# Pack names become file names under PACKS_DIR
+PACK_NAME_PATTERN = re.compile(r"^[a-z0-9-]+$")
+
+
+class CompiledCatalog:
+    """Immutable, pre-resolved lookup tables for one catalog (+ pack)"""
+
+    def __init__(self, source: dict, pack: Optional[str] = None):
+        self.pack = pack
+        self.languages = dict(source["languages"])
+        self.language_codes = tuple(self.languages)
+        self.language_index = {code: i for i, code in enumerate(self.language_codes)}
+        self.accept_index = build_accept_index(self.languages)
+
+        phrases = source["phrases"]
+        self.phrase_ids = tuple(p["id"] for p in phrases)
+        self.phrase_index = {phrase_id: i for i, phrase_id in enumerate(self.phrase_ids)}
+        self.ja = tuple(p["ja"] for p in phrases)
+        self.romaji = tuple(p.get("romaji", "") for p in phrases)
+        self.icon = tuple(p.get("icon", "💬") for p in phrases)
+        self.category = tuple(p.get("category", "other") for p in phrases)
+
+        # text[lang_index][phrase_index], with the fallback chain (lang -> en -> ja) resolved now
+        self.text = tuple(
+            tuple(
+                p.get("text", {}).get(code) or p.get("text", {}).get(FALLBACK_LANGUAGE) or p["ja"]
+                for p in phrases
+            )
+            for code in self.language_codes
+        )
+
+        # ui[lang] -> complete dict (missing keys fall back to English)
+        ui_source = source.get("ui_text", {})
+        fallback_ui = ui_source.get(FALLBACK_LANGUAGE, {})
+        self.ui_text = {code: {**fallback_ui, **ui_source.get(code, {})} for code in self.language_codes}
+
+        # Flat dict shape used by the UI code ({"phrase_id", "ja", "romaji", "icon", "category", <lang>: text});
+        # "phrase_id" rather than "id" because "id" is also a language code (Indonesian)
+        self.phrases = tuple(
+            {
+                "phrase_id": phrase_id,
+                "ja": self.ja[i],
+                "romaji": self.romaji[i],
+                "icon": self.icon[i],
+                "category": self.category[i],
+                **{code: self.text[li][i] for li, code in enumerate(self.language_codes)},
+            }
+            for i, phrase_id in enumerate(self.phrase_ids)
+        )
+
+    def translation(self, phrase_id: str, lang: str) -> str:
+        """Phrase text in lang (falls back to English, then Japanese)"""
+        i = self.phrase_index[phrase_id]
+        li = self.language_index.get(lang, self.language_index.get(FALLBACK_LANGUAGE, 0))
+        return self.text[li][i]
+
+    def ui(self, lang: str, key: str) -> str:
+        """UI string in lang (falls back to English, then the key itself)"""
+        return self.ui_text.get(lang, self.ui_text.get(FALLBACK_LANGUAGE, {})).get(key, key)
+
+    def resolve_language(self, accept_language: Optional[str]) -> Optional[str]:
+        """Catalog language code for an Accept-Language header (None if unsupported)"""
+        return match_language(accept_language, self.accept_index)
+
+    def phrase(self, phrase_id: str) -> Optional[dict]:
+        """Phrase dict by id"""
+        i = self.phrase_index.get(phrase_id)
+        return self.phrases[i] if i is not None else None
+
+    @cached_property
+    def search_index(self) -> PhraseSearchIndex:
+        """N-gram search index, built on first search"""
+        return PhraseSearchIndex(self)
+
+    def search(self, query: str, lang: str = FALLBACK_LANGUAGE, limit: int = 8) -> list:
+        """Top phrase dicts matching free text in any catalog language or romaji"""
+        return self.search_index.search(query, lang, limit)
+
+    def find_by_ja(self, ja: str) -> Optional[dict]:
+        """Phrase dict by its Japanese text"""
+        for phrase in self.phrases:
+            if phrase["ja"] == ja:
+                return phrase
+        return None
+
+
+def pack_path(pack: str) -> Path:
+    """File path for a phrase pack name (ValueError for anything but [a-z0-9-]+)"""
+    if not PACK_NAME_PATTERN.match(pack):
+        raise ValueError(f"Invalid phrase pack name: {pack!r}")
+    return PACKS_DIR / f"{pack}.json"
+
+
+def _load_json(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def format_catalog_json(source: dict) -> str:
+    """Serialize a catalog or pack in the hand-edited layout of default.json (one phrase per block)"""
+    def inline(value) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    def block(key: str, items: list, opener: str, closer: str) -> str:
+        return f'  {inline(key)}: {opener}\n' + ",\n".join(items) + f'\n  {closer}'
+
+    parts = []
+    for key, value in source.items():
+        if key == "languages":
+            parts.append(block(key, [f"    {inline(code)}: {inline(info)}" for code, info in value.items()], "{", "}"))
+        elif key == "ui_text" and value:
+            parts.append(block(key, [
+                f"    {inline(lang)}: {{\n"
+                + ",\n".join(f"      {inline(name)}: {inline(text)}" for name, text in texts.items())
+                + "\n    }"
+                for lang, texts in value.items()
+            ], "{", "}"))
+        elif key == "phrases" and value:
+            items = []
+            for phrase in value:
+                fields = ", ".join(f"{inline(name)}: {inline(v)}" for name, v in phrase.items() if name != "text")
+                lines = [f"      {fields}"]
+                if "text" in phrase:
+                    lines.append(f'      "text": {inline(phrase["text"])}')
+                items.append("    {\n" + ",\n".join(lines) + "\n    }")
+            parts.append(block(key, items, "[", "]"))
+        else:
+            parts.append(f"  {inline(key)}: {inline(value)}")
+    return "{\n" + ",\n".join(parts) + "\n}\n"
+
+
+def format_pack_json(pack: dict) -> str:
+    """Serialize a phrase pack in the layout of packs/*.json (one line per phrase, its texts below)"""
+    def inline(value) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    parts = []
+    for key, value in pack.items():
+        if key == "phrases" and value:
+            items = []
+            for phrase in value:
+                item = "  {" + ", ".join(f"{inline(name)}: {inline(v)}" for name, v in phrase.items() if name != "text")
+                if "text" in phrase:
+                    item += f',\n   "text": {inline(phrase["text"])}'
+                items.append(item + "}")
+            parts.append(f" {inline(key)}: [\n" + ",\n".join(items) + "\n ]")
+        elif key == "ui_text" and value:
+            parts.append(f" {inline(key)}: {{\n"
+                         + ",\n".join(f"  {inline(lang)}: {inline(texts)}" for lang, texts in value.items())
+                         + "\n }")
+        else:
+            parts.append(f" {inline(key)}: {inline(value)}")
+    return "{\n" + ",\n".join(parts) + "\n}\n"
+
+
+def _merge_pack(source: dict, pack: dict) -> dict:
+    """Apply a phrase pack on top of the default catalog"""
+    removed = set(pack.get("remove", []))
+    phrases = [p for p in source["phrases"] if p["id"] not in removed]
+    index = {p["id"]: i for i, p in enumerate(phrases)}
+    for phrase in pack.get("phrases", []):
+        if phrase["id"] in index:
+            phrases[index[phrase["id"]]] = phrase
+        else:
+            index[phrase["id"]] = len(phrases)
+            phrases.append(phrase)
+
+    ui_text = {lang: dict(texts) for lang, texts in source.get("ui_text", {}).items()}
+    for lang, texts in pack.get("ui_text", {}).items():
+        ui_text.setdefault(lang, {}).update(texts)
+
+    return {**source, "phrases": phrases, "ui_text": ui_text}
+
+
+def _validate(source: dict, origin: str):
+    seen = set()
+    for phrase in source["phrases"]:
+        for field in ("id", "ja"):
+            if not phrase.get(field):
+                raise ValueError(f"{origin}: phrase missing '{field}': {phrase}")
+        if phrase["id"] in seen:
+            raise ValueError(f"{origin}: duplicate phrase id '{phrase['id']}'")
+        seen.add(phrase["id"])
+
+
+def compile_catalog(pack: Optional[str] = None, catalog_path: Path = DEFAULT_CATALOG) -> CompiledCatalog:
+    """Load and compile the default catalog, optionally merged with a phrase pack"""
+    source = _load_json(catalog_path)
+    if pack:
+        source = _merge_pack(source, _load_json(pack_path(pack)))
+    _validate(source, pack or catalog_path.name)
+    return CompiledCatalog(source, pack)
+
+
+class _CatalogCache:
+    """Compiled catalogs per pack, recompiled when a source file's mtime changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # pack -> (catalog, mtimes, last_check)
+
+    @staticmethod
+    def _mtimes(pack: Optional[str]):
+        paths = [DEFAULT_CATALOG] + ([pack_path(pack)] if pack else [])
+        return tuple(p.stat().st_mtime_ns if p.exists() else None for p in paths)
+
+    def get(self, pack: Optional[str]) -> CompiledCatalog:
+        now = time.monotonic()
+        entry = self._entries.get(pack)
+        if entry and now - entry[2] < RELOAD_CHECK_SECONDS:
+            return entry[0]
+
+        with self._lock:
+            entry = self._entries.get(pack)
+            mtimes = self._mtimes(pack)
+            if entry and entry[1] == mtimes:
+                self._entries[pack] = (entry[0], mtimes, now)
+                return entry[0]
+            try:
+                catalog = compile_catalog(pack)
+            except (OSError, ValueError, KeyError) as e:
+                if entry:
+                    # Keep serving the last good catalog if an edit is broken
+                    print(f"[CATALOG] Reload failed, keeping previous version: {e}")
+                    self._entries[pack] = (entry[0], mtimes, now)
+                    return entry[0]
+                raise
+            self._entries[pack] = (catalog, mtimes, now)
+            return catalog
+
+
+_cache = _CatalogCache()
+
+
+def get_catalog(pack: Optional[str] = None) -> CompiledCatalog:
+    """Current compiled catalog for a phrase pack (default: BRIDGE_PHRASE_PACK), hot-reloaded"""
+    # Read at call time: .env is loaded after this module is imported
+    return _cache.get(pack or os.getenv("BRIDGE_PHRASE_PACK") or None)
@@ -0,0 +1,132 @@
+"""
+Type-ahead phrase search
+Every phrase is indexed in all catalog languages plus Japanese and romaji through a
+character bigram index (unigrams for one-character queries), so a guest can type in
+their own script and get ranked matches without scanning every phrase.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+# Fraction of the query's bigrams a field must contain to count as a match
+# (below 1.0 so a typo still finds the phrase); short queries must match fully
+MIN_COVERAGE = 0.75
+EXACT_GRAMS = 3
+
+# Score bonuses on top of bigram coverage (0..1)
+SUBSTRING_BONUS = 1.0
+PREFIX_BONUS = 0.5
+GUEST_LANGUAGE_BONUS = 0.25
+
+_SEPARATORS = re.compile(r"\s+")
+
+
+def _fold_latin(text: str) -> str:
+    """Drop diacritics on Latin letters (tiếng -> tieng) but keep marks that carry meaning elsewhere"""
+    out = []
+    for ch in unicodedata.normalize("NFKD", text):
+        if unicodedata.combining(ch) and out and out[-1] < "ɐ":
+            continue
+        out.append(ch)
+    return unicodedata.normalize("NFC", "".join(out)).replace("đ", "d")
+
+
+def _katakana_to_hiragana(text: str) -> str:
+    return "".join(chr(ord(ch) - 0x60) if "ァ" <= ch <= "ヶ" else ch for ch in text)
+
+
+def normalize(text: str) -> str:
+    """Search form of a string: width/case/diacritic folded, kana unified, punctuation removed"""
+    text = _katakana_to_hiragana(_fold_latin(unicodedata.normalize("NFKC", text).casefold()))
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+    return _SEPARATORS.sub(" ", text).strip()
+
+
+def _grams(text: str) -> set:
+    """Character bigrams of a normalized string (word boundaries padded with spaces)"""
+    padded = f" {text} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class PhraseSearchIndex:
+    """N-gram index over the catalog text of every phrase"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        # One indexed field per (phrase, language); "ja" and "romaji" are pseudo-languages
+        self.field_phrase = []
+        self.field_lang = []
+        self.field_text = []
+        self.bigrams = defaultdict(list)
+        self.unigrams = defaultdict(list)
+
+        columns = [("ja", catalog.ja), ("romaji", catalog.romaji)]
+        columns += [(code, catalog.text[li]) for li, code in enumerate(catalog.language_codes)]
+        for i in range(len(catalog.phrase_ids)):
+            seen = set()
+            for lang, texts in columns:
+                text = normalize(texts[i])
+                if not text or text in seen:
+                    # Untranslated languages fall back to the same text; index it once
+                    continue
+                seen.add(text)
+                field = len(self.field_text)
+                self.field_phrase.append(i)
+                self.field_lang.append(lang)
+                self.field_text.append(text)
+                for gram in _grams(text):
+                    self.bigrams[gram].append(field)
+                for ch in set(text.replace(" ", "")):
+                    self.unigrams[ch].append(field)
+
+    def _score(self, field: int, query: str, coverage: float, lang: str) -> float:
+        text = self.field_text[field]
+        score = coverage
+        position = text.find(query)
+        if position >= 0:
+            score += SUBSTRING_BONUS
+            if position == 0 or text[position - 1] == " ":
+                score += PREFIX_BONUS
+        if self.field_lang[field] == lang:
+            score += GUEST_LANGUAGE_BONUS
+        return score
+
+    def search(self, query: str, lang: str = "en", limit: int = 8) -> list:
+        """
+        Rank phrases against free text typed in any catalog language.
+
+        Args:
+            query: Guest input (any script; romaji for Japanese)
+            lang: Guest language, whose matches rank slightly higher
+            limit: Maximum number of phrases returned
+
+        Returns:
+            Phrase dicts (catalog.phrases entries), best match first
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        if len(query) == 1:
+            candidates = {field: 1.0 for field in self.unigrams.get(query, ())}
+        else:
+            # Interior bigrams only: the query may start and stop mid-word (type-ahead), and
+            # scripts without word spaces (ja, zh, th) have no boundary to anchor on
+            grams = _grams(query) - {f" {query[0]}", f"{query[-1]} "}
+            counts = defaultdict(int)
+            for gram in grams:
+                for field in self.bigrams.get(gram, ()):
+                    counts[field] += 1
+            needed = len(grams) if len(grams) <= EXACT_GRAMS else MIN_COVERAGE * len(grams)
+            candidates = {field: n / len(grams) for field, n in counts.items() if n >= needed}
+
+        best = {}
+        for field, coverage in candidates.items():
+            score = self._score(field, query, coverage, lang)
+            phrase = self.field_phrase[field]
+            if score > best.get(phrase, 0):
+                best[phrase] = score
+
+        ranked = sorted(best, key=lambda phrase: (-best[phrase], phrase))[:limit]
+        return [self.catalog.phrases[phrase] for phrase in ranked]
@@ -4,13 +4,37 @@ Bridge Staff Dashboard - 店員用ダッシュボード
 """
 
 import streamlit as st
-import sqlite3
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta
 from pathlib import Path
-import time
-
-# Database path
-DB_PATH = Path(__file__).parent.parent / "data" / "bridge.db"
+from dotenv import load_dotenv
+
+# Before the package imports: storage, analytics and metering read BRIDGE_* paths and
+# settings at import time, and must see the same .env as scripts/*.py
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+from storage import (
+    UnknownStore,
+    ensure_schema,
+    ensure_store_schema,
+    resolve_store,
+    store_scope,
+    use_store,
+    get_call_notifier,
+    get_call_cursor,
+    get_call_changes,
+    get_recent_calls,
+    respond_to_call,
+    resolve_table_calls,
+    prioritize_calls,
+    get_usage_stats,
+    get_hourly_usage,
+)
+from analytics import EXPORT_TABLES, export_table, get_monthly_usage, get_response_times, get_stage_latency, parquet_available
+from analytics.export import count_rows, export_filename
+from storage.archive import archive_fingerprint
+from storage.sqlite_store import get_export_watermark, get_export_watermarks
+from metering import get_meter
 
 # Page config
 st.set_page_config(
@@ -19,128 +43,148 @@ st.set_page_config(
     layout="wide"
 )
 
-# ===========================================
-# Database Functions
-# ===========================================
-def get_pending_calls():
-    """Get all pending staff calls"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-        c.execute('''SELECT id, table_id, call_type, message, created_at
-                     FROM staff_calls
-                     WHERE status = 'pending'
-                     ORDER BY created_at DESC''')
-        calls = c.fetchall()
-        conn.close()
-        return calls
-    except Exception as e:
-        return []
-
-def get_recent_calls(limit=20):
-    """Get recent staff calls (all statuses)"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-        c.execute('''SELECT id, table_id, call_type, message, status, created_at, responded_at
-                     FROM staff_calls
-                     ORDER BY created_at DESC
-                     LIMIT ?''', (limit,))
-        calls = c.fetchall()
-        conn.close()
-        return calls
-    except Exception as e:
-        return []
-
-def respond_to_call(call_id):
-    """Mark a call as responded"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-        c.execute('''UPDATE staff_calls
-                     SET status = 'responded', responded_at = CURRENT_TIMESTAMP
-                     WHERE id = ?''', (call_id,))
-        conn.commit()
-        conn.close()
-        return True
-    except Exception as e:
-        return False
-
-def get_usage_stats():
-    """Get usage statistics"""
-    try:
-        conn = sqlite3.connect(str(DB_PATH))
-        c = conn.cursor()
-
-        # Total phrase taps
-        c.execute("SELECT COUNT(*) FROM usage_logs WHERE action = 'phrase_tap'")
-        phrase_taps = c.fetchone()[0]
-
-        # Total translations
-        c.execute("SELECT COUNT(*) FROM usage_logs WHERE action = 'translate'")
-        translations = c.fetchone()[0]
-
-        # Language distribution
-        c.execute('''SELECT language, COUNT(*) as count
-                     FROM usage_logs
-                     WHERE language IS NOT NULL
-                     GROUP BY language
-                     ORDER BY count DESC''')
-        languages = c.fetchall()
-
-        # Popular phrases
-        c.execute('''SELECT phrase_ja, COUNT(*) as count
-                     FROM usage_logs
-                     WHERE action = 'phrase_tap' AND phrase_ja IS NOT NULL
-                     GROUP BY phrase_ja
-                     ORDER BY count DESC
-                     LIMIT 10''')
-        popular_phrases = c.fetchall()
-
-        conn.close()
-        return {
-            "phrase_taps": phrase_taps,
-            "translations": translations,
-            "languages": languages,
-            "popular_phrases": popular_phrases
-        }
-    except Exception as e:
-        return {"phrase_taps": 0, "translations": 0, "languages": [], "popular_phrases": []}
+@st.cache_resource
+def bootstrap():
+    """Check the DB schema once per process (creates / backfills the usage rollups if needed)"""
+    ensure_schema()
+    return True
+
+bootstrap()
+
+# Store (?store=<id>): every query and write below goes to that store's shard only
+if "store" in st.query_params:
+    st.session_state.store_id = st.query_params["store"]
+try:
+    st.session_state.store_id = resolve_store(st.session_state.get("store_id"))
+except UnknownStore:
+    st.error(f"不明な店舗です: {st.session_state.store_id}")
+    st.stop()
+ensure_store_schema(st.session_state.store_id)
+use_store(st.session_state.store_id)
 
 # ===========================================
 # UI
 # ===========================================
 
 st.title("📊 Bridge Staff Dashboard")
-st.caption("店員用管理画面 - リアルタイム呼び出し通知")
+st.caption("店員用管理画面 - リアルタイム呼び出し通知"
+           + (f" ・ 店舗: {st.session_state.store_id}" if st.session_state.store_id else ""))
 
 # Auto-refresh toggle
-auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (10秒)", value=True)
+auto_refresh = st.sidebar.checkbox("🔄 Live updates (呼び出し通知)", value=True)
+
+# Dashboard downloads: period choices (days) and the watermark name of the "差分" option
+EXPORT_WINDOWS = {
+    "全期間": None,
+    "30日間": 30,
+    "7日間": 7,
+}
+DASHBOARD_EXPORT_NAME = "dashboard"
+
+# A download button holds the whole file in memory (Streamlit serves it from RAM);
+# larger exports go through scripts/export_analytics.py, which streams to disk
+DASHBOARD_EXPORT_MAX_ROWS = 200_000
+
+
+def export_start(days):
+    """created_at lower bound of a download period (None = everything)"""
+    return (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S") if days else None
+
+
+# The row count only decides whether the download is offered: counted again when the
+# archives change or after this many seconds, not on every rerun of the page
+EXPORT_COUNT_TTL = 300
+
+
+@st.cache_data(ttl=EXPORT_COUNT_TTL, show_spinner=False)
+def cached_export_rows(store_id, table_name: str, days, after, archives) -> int:
+    """count_rows() for the export panel (archives = archive_fingerprint(), only part of the key)"""
+    with store_scope(store_id):
+        return count_rows(table_name, export_start(days), after=after)
+
+
+def build_export(store_id, table_name: str, fmt: str, days, incremental: bool):
+    """Download callable: streams the export to a temp file when the button is clicked"""
+    def export():
+        start = export_start(days)
+        # Runs on Streamlit's download thread, outside this script run's store context
+        with store_scope(store_id), tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / export_filename(table_name, fmt)
+            export_table(table_name, path, fmt, start=start,
+                         incremental=DASHBOARD_EXPORT_NAME if incremental else None)
+            return path.read_bytes()
+    return export
+
 
 # Tabs
-tab1, tab2, tab3 = st.tabs(["🔔 呼び出し通知", "📈 利用統計", "📋 履歴"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["🔔 呼び出し通知", "📈 利用統計", "📋 履歴", "⏱️ 対応時間", "🛰️ レイテンシ"])
+
+# Pending-calls panel tick (seconds). Each tick only compares an in-process version
+# counter; staff_calls is re-queried only after the notifier saw a new call or response.
+PENDING_PANEL_TICK = 0.5
+
+# Call type icons
+TYPE_ICONS = {
+    "call": "🙋",
+    "bill": "💰",
+    "toilet": "🚻",
+    "water": "💧",
+    "menu": "📋",
+    "problem": "⚠️",
+}
+
+
+def sync_pending_calls():
+    """Apply staff_calls changes since the session's cursor to its pending-calls map"""
+    if "pending_calls" not in st.session_state:
+        calls, cursor, _ = get_call_changes()
+        st.session_state.pending_calls = {call[0]: call for call in calls}
+        st.session_state.pending_calls_cursor = cursor
+        return
+
+    pending = st.session_state.pending_calls
+    while True:
+        calls, cursor, _ = get_call_changes(st.session_state.pending_calls_cursor)
+        for call in calls:
+            call_id, table_id, call_type, message, status = call[:5]
+            if status == "pending":
+                if call_id not in pending:
+                    st.toast(f"🔔 テーブル {table_id}: {message}")
+                pending[call_id] = call
+            else:
+                pending.pop(call_id, None)
+        st.session_state.pending_calls_cursor = cursor
+        if not calls:
+            break
+
+
+def pending_calls_panel():
+    """Pending calls list (reruns on its own, independent of the other tabs)"""
+    # Fragment reruns skip the top of the script, so route to the store here too
+    use_store(st.session_state.store_id)
+    notifier = get_call_notifier()
+    version = notifier.version
+    if st.session_state.get("pending_calls_version") != version:
+        sync_pending_calls()
+        st.session_state.pending_calls_version = version
 
-with tab1:
     st.subheader("🔔 現在の呼び出し")
 
-    pending_calls = get_pending_calls()
+    # Dispatch order: problem > bill > call > water/menu, with aging
+    pending_calls = prioritize_calls(list(st.session_state.pending_calls.values()))
 
     if pending_calls:
         st.warning(f"⚠️ {len(pending_calls)}件の未対応呼び出しがあります")
 
+        calls_per_table = {}
+        for call in pending_calls:
+            calls_per_table[call[1]] = calls_per_table.get(call[1], 0) + 1
+        bulk_button_shown = set()
+
         for call in pending_calls:
-            call_id, table_id, call_type, message, created_at = call
-
-            # Call type icons
-            type_icons = {
-                "call": "🙋",
-                "bill": "💰",
-                "toilet": "🚻",
-                "water": "💧",
-                "menu": "📋",
-                "problem": "⚠️",
-            }
-            icon = type_icons.get(call_type, "🔔")
+            call_id, table_id, call_type, message, status, created_at, responded_at, call_count = call
+
+            icon = TYPE_ICONS.get(call_type, "🔔")
 
             col1, col2, col3 = st.columns([2, 3, 1])
 
@@ -148,20 +192,32 @@ with tab1:
                 st.markdown(f"### テーブル {table_id}")
 
             with col2:
-                st.markdown(f"{icon} **{call_type.upper()}**")
+                repeat = f" ×{call_count}" if call_count > 1 else ""
+                st.markdown(f"{icon} **{call_type.upper()}**{repeat}")
                 st.caption(f"📝 {message}")
                 st.caption(f"🕐 {created_at}")
 
             with col3:
                 if st.button("✅ 対応済み", key=f"respond_{call_id}"):
                     respond_to_call(call_id)
-                    st.rerun()
+                    notifier.wait_for_change(version, timeout=1.0)
+                    st.rerun(scope="fragment")
+                if calls_per_table[table_id] > 1 and table_id not in bulk_button_shown:
+                    bulk_button_shown.add(table_id)
+                    if st.button("✅ テーブル全て対応", key=f"resolve_table_{call_id}"):
+                        resolve_table_calls(table_id)
+                        notifier.wait_for_change(version, timeout=1.0)
+                        st.rerun(scope="fragment")
 
             st.divider()
     else:
         st.success("✅ 現在、未対応の呼び出しはありません")
         st.info("💡 お客様が「すみません」ボタンを押すと、ここに通知が表示されます")
 
+
+with tab1:
+    st.fragment(pending_calls_panel, run_every=PENDING_PANEL_TICK if auto_refresh else None)()
+
 with tab2:
     st.subheader("📈 利用統計")
 
@@ -207,14 +263,115 @@ with tab2:
         else:
             st.caption("データがありません")
 
+    st.markdown("### 🕐 時間帯別利用（24時間）")
+    hourly = {}
+    for hour_bucket, action, count in get_hourly_usage(24):
+        hourly[hour_bucket] = hourly.get(hour_bucket, 0) + count
+    if hourly:
+        st.bar_chart(hourly)
+    else:
+        st.caption("データがありません")
+
+    st.markdown("### 📅 月別利用（アーカイブ含む）")
+    monthly = {}
+    for month, action, count in get_monthly_usage():
+        monthly.setdefault(action, {})[month] = count
+    if monthly:
+        st.bar_chart(monthly)
+    else:
+        st.caption("データがありません")
+
+    st.markdown("### 💳 外部API使用量（本日）")
+    report = get_meter().report()
+    provider_labels = {"tts": "ElevenLabs TTS", "stt": "Whisper STT", "llm": "Kimi LLM"}
+    unit_labels = {"characters": "文字", "audio_seconds": "秒", "tokens": "トークン"}
+    cols = st.columns(len(report["providers"]))
+    for col, (provider, usage) in zip(cols, report["providers"].items()):
+        with col:
+            unit = unit_labels.get(usage["unit"], usage["unit"])
+            st.metric(provider_labels.get(provider, provider), f"{usage['units']:,.0f} {unit}",
+                      f"{usage['requests']}件", delta_color="off")
+            if usage["quota"]:
+                st.progress(min(usage["units"] / usage["quota"], 1.0),
+                            text=f"上限 {usage['quota']:,.0f} {unit} の {usage['units'] / usage['quota']:.0%}")
+            else:
+                st.caption("上限なし")
+    st.caption(f"{report['day']} ・ 制限による代替応答: テーブル制限 {report['limited']['throttled']}件 / 日次上限 {report['limited']['quota']}件（このプロセス）")
+    if report["tables"]:
+        st.dataframe(
+            [{"テーブル": table_id, "API": provider_labels.get(provider, provider), "使用量": units, "リクエスト": requests}
+             for provider, table_id, units, requests in report["tables"]],
+            use_container_width=True, hide_index=True,
+        )
+
+    st.markdown("### 📤 データエクスポート（BIツール用）")
+    export_labels = {"usage_logs": "利用ログ", "staff_calls": "呼び出し"}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        export_table_name = st.selectbox("データ", options=list(EXPORT_TABLES), format_func=export_labels.get, key="export_table")
+    with col2:
+        export_formats = ["parquet", "csv"] if parquet_available() else ["csv"]
+        export_format = st.radio("形式", options=export_formats, horizontal=True, key="export_format")
+    with col3:
+        export_window = st.selectbox("期間", options=list(EXPORT_WINDOWS), key="export_window")
+    export_incremental = st.checkbox("前回のエクスポート以降の差分のみ", key="export_incremental")
+    for name, table_name, watermark, rows, exported_at in get_export_watermarks():
+        if name == DASHBOARD_EXPORT_NAME and table_name == export_table_name:
+            st.caption(f"前回の差分エクスポート: {exported_at} UTC（{rows}件）")
+
+    export_after = get_export_watermark(DASHBOARD_EXPORT_NAME, export_table_name) if export_incremental else None
+    export_rows = cached_export_rows(st.session_state.store_id, export_table_name, EXPORT_WINDOWS[export_window],
+                                     export_after, archive_fingerprint())
+    if export_rows > DASHBOARD_EXPORT_MAX_ROWS:
+        store_option = f" --store {st.session_state.store_id}" if st.session_state.store_id else ""
+        start_option = f" --start {export_start(EXPORT_WINDOWS[export_window])[:10]}" if EXPORT_WINDOWS[export_window] else ""
+        incremental_option = f" --incremental {DASHBOARD_EXPORT_NAME}" if export_incremental else ""
+        st.warning(f"{export_rows:,}件はダッシュボードからのダウンロード上限（{DASHBOARD_EXPORT_MAX_ROWS:,}件）を超えています。"
+                   "コマンドでエクスポートしてください:")
+        st.code(f"python scripts/export_analytics.py --table {export_table_name} --format {export_format}"
+                f"{start_option}{store_option}{incremental_option}", language="bash")
+    else:
+        st.download_button(
+            "⬇️ ダウンロード",
+            data=build_export(st.session_state.store_id, export_table_name, export_format,
+                              EXPORT_WINDOWS[export_window], export_incremental),
+            file_name=export_filename(export_table_name, export_format),
+            mime="text/csv" if export_format == "csv" else "application/vnd.apache.parquet",
+            key="export_download",
+        )
+        st.caption(f"約{export_rows:,}件")
+
+HISTORY_PAGE_SIZE = 20
+
+
+def sync_history():
+    """Keep the session's loaded history pages current by applying staff_calls deltas"""
+    if "history_calls" not in st.session_state:
+        st.session_state.history_cursor = get_call_cursor()
+        st.session_state.history_calls = {call[0]: call for call in get_recent_calls(HISTORY_PAGE_SIZE)}
+        return
+
+    history = st.session_state.history_calls
+    newest_id = max(history, default=0)
+    while True:
+        calls, cursor, _ = get_call_changes(st.session_state.history_cursor)
+        for call in calls:
+            if call[0] in history or call[0] > newest_id:
+                history[call[0]] = call
+        st.session_state.history_cursor = cursor
+        if not calls:
+            break
+
+
 with tab3:
     st.subheader("📋 呼び出し履歴")
 
-    recent_calls = get_recent_calls(20)
+    sync_history()
+    recent_calls = sorted(st.session_state.history_calls.values(), key=lambda call: call[0], reverse=True)
 
     if recent_calls:
         for call in recent_calls:
-            call_id, table_id, call_type, message, status, created_at, responded_at = call
+            call_id, table_id, call_type, message, status, created_at, responded_at, call_count = call
 
             # Status styling
             if status == "pending":
@@ -228,7 +385,8 @@ with tab3:
                 st.markdown(f"**テーブル {table_id}**")
 
             with col2:
-                st.markdown(f"**{call_type}**: {message}")
+                repeat = f" (×{call_count})" if call_count > 1 else ""
+                st.markdown(f"**{call_type}**: {message}{repeat}")
                 st.caption(f"📅 {created_at}")
 
             with col3:
@@ -237,9 +395,91 @@ with tab3:
                     st.caption(f"✓ {responded_at}")
 
             st.divider()
+
+        if st.button("⬇️ さらに表示", key="history_more"):
+            older_calls = get_recent_calls(HISTORY_PAGE_SIZE, before_id=recent_calls[-1][0])
+            st.session_state.history_calls.update({call[0]: call for call in older_calls})
+            st.rerun()
     else:
         st.info("呼び出し履歴がありません")
 
+RESPONSE_TIME_WINDOWS = {
+    "24時間": timedelta(hours=24),
+    "7日間": timedelta(days=7),
+    "30日間": timedelta(days=30),
+    "全期間": None,
+}
+
+RESPONSE_TIME_DIMENSIONS = {
+    "by_call_type": "呼び出し種別",
+    "by_table_id": "テーブル",
+    "by_hour": "時間帯",
+    "by_language": "言語",
+}
+
+with tab4:
+    st.subheader("⏱️ 対応時間（呼び出し → 対応済み）")
+
+    window = st.radio("期間", options=list(RESPONSE_TIME_WINDOWS.keys()), horizontal=True, key="response_time_window")
+    window_delta = RESPONSE_TIME_WINDOWS[window]
+    start = None
+    if window_delta:
+        # Truncate to the minute so reruns within a minute share one cached report
+        start = (datetime.utcnow() - window_delta).strftime("%Y-%m-%d %H:%M:00")
+
+    report = get_response_times(start=start)
+    overall = report["overall"]
+
+    if overall["count"]:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("対応件数", overall["count"])
+        with col2:
+            st.metric("p50", f"{overall['p50']:.0f}秒")
+        with col3:
+            st.metric("p95", f"{overall['p95']:.0f}秒")
+        with col4:
+            st.metric("p99", f"{overall['p99']:.0f}秒")
+
+        # Histogram (trim the empty tail)
+        counts = report["histogram"]["counts"]
+        bin_seconds = report["histogram"]["bin_seconds"]
+        last = max(i for i, count in enumerate(counts) if count)
+        st.bar_chart({f"{i * bin_seconds:04d}s": count for i, count in enumerate(counts[:last + 1])})
+
+        for key, label in RESPONSE_TIME_DIMENSIONS.items():
+            st.markdown(f"### {label}別")
+            st.dataframe(
+                [{label: group, **stats} for group, stats in report[key].items()],
+                hide_index=True,
+                use_container_width=True,
+            )
+    else:
+        st.caption("データがありません")
+
+LATENCY_WINDOWS = {
+    "1時間": 1,
+    "24時間": 24,
+    "7日間": 24 * 7,
+}
+
+with tab5:
+    st.subheader("🛰️ 処理レイテンシ（ステージ × モード）")
+    st.caption("tts.* = ElevenLabs, llm.* = Kimi, stt.* = Whisper, db.* = SQLite, ui.panel = 画面全体（数秒遅れで反映）")
+
+    window = st.radio("期間", options=list(LATENCY_WINDOWS.keys()), horizontal=True, key="latency_window")
+    latency = get_stage_latency(hours=LATENCY_WINDOWS[window])
+
+    if latency:
+        modes = sorted({row["mode"] for row in latency})
+        selected_modes = st.multiselect("モード", options=modes, default=modes, key="latency_modes")
+        rows = [row for row in latency if row["mode"] in selected_modes]
+
+        st.bar_chart({f"{row['stage']} ({row['mode']})": row["p95_ms"] for row in rows[:15]})
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+    else:
+        st.caption("データがありません")
+
 # Sidebar info
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 🍽️ Bridge")
@@ -248,11 +488,7 @@ st.sidebar.markdown("[← お客様向けアプリ](https://bridge.three-sisters
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 🧪 テスト用")
-st.sidebar.markdown("[🙋 呼び出しテスト](https://bridge.three-sisters.ai/?mode=call&table=TEST)")
-st.sidebar.markdown("[⚡ クイックフレーズ](https://bridge.three-sisters.ai/?mode=quick&table=TEST)")
-st.sidebar.markdown("[🌐 翻訳テスト](https://bridge.three-sisters.ai/?mode=translate&table=TEST)")
-
-# Auto-refresh
-if auto_refresh:
-    time.sleep(10)
-    st.rerun()
+store_param = f"&store={st.session_state.store_id}" if st.session_state.store_id else ""
+st.sidebar.markdown(f"[🙋 呼び出しテスト](https://bridge.three-sisters.ai/?mode=call&table=TEST{store_param})")
+st.sidebar.markdown(f"[⚡ クイックフレーズ](https://bridge.three-sisters.ai/?mode=quick&table=TEST{store_param})")
+st.sidebar.markdown(f"[🌐 翻訳テスト](https://bridge.three-sisters.ai/?mode=translate&table=TEST{store_param})")
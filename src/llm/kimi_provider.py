@@ -5,7 +5,13 @@ Used for: Writing correction, Speaking feedback, Sister responses
 
 import os
 from typing import Optional
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient
+
+from metering import get_meter
+from tracing import traced
+
+# Override to point at a proxy or the local stand-in (benchmarks/standin_server.py)
+KIMI_BASE_URL = "https://api.moonshot.ai/v1"
 
 
 class KimiLLM:
@@ -16,24 +22,45 @@ class KimiLLM:
         if not self.api_key:
             raise ValueError("KIMI_API_KEY not set in environment")
 
+        # Keep our own pooled HTTP client so warm_up() can pre-open the TLS connection
+        self.http_client = DefaultHttpxClient()
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url="https://api.moonshot.ai/v1"
+            base_url=os.getenv("KIMI_BASE_URL") or KIMI_BASE_URL,
+            http_client=self.http_client
         )
         self.model = os.getenv("KIMI_MODEL", "moonshot-v1-8k")
 
-    def generate(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
+    def warm_up(self):
+        """Open a pooled TLS connection to the API ahead of the first request"""
+        try:
+            self.http_client.head(str(self.client.base_url), timeout=5)
+        except Exception as e:
+            print(f"[LLM] Warm-up failed: {e}")
+
+    def _chat(self, operation: str, **kwargs):
+        """Chat completion, throttled / quota-checked and billed in tokens to the current table"""
+        meter = get_meter()
+        meter.check("llm")
+        response = self.client.chat.completions.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        meter.record("llm", operation, usage.total_tokens if usage else 0)
+        return response
+
+    @traced("llm.generate")
+    def generate(self, prompt: str, system_prompt: str = "You are a helpful assistant.", operation: str = "generate") -> str:
         """
         Generic text generation method.
 
         Args:
             prompt: User prompt
             system_prompt: System instruction
+            operation: Name the tokens are metered under
 
         Returns:
             Generated text response
         """
-        response = self.client.chat.completions.create(
+        response = self._chat(operation,
             model=self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -43,6 +70,78 @@ class KimiLLM:
         )
         return response.choices[0].message.content
 
+    @traced("llm.translate_to_japanese")
+    def translate_to_japanese(self, text: str, source_lang: str = "English") -> Optional[dict]:
+        """
+        Translate guest input to polite Japanese (keigo) for restaurant use.
+
+        Args:
+            text: What the guest wants to say
+            source_lang: Name of the guest's language
+
+        Returns:
+            dict with "japanese", "romaji" and "explanation" (in source_lang),
+            or None if the response could not be parsed
+        """
+        prompt = f"""Translate to polite Japanese (keigo) for restaurant use:
+Input ({source_lang}): {text}
+
+Respond in JSON: {{"japanese": "...", "romaji": "...", "explanation": "brief {source_lang} explanation"}}"""
+
+        response = self.generate(prompt, system_prompt="You are a Japanese restaurant language expert. Respond only in valid JSON.",
+                                 operation="translate_to_japanese")
+
+        import json
+        import re
+        json_match = re.search(r'\{[^}]+\}', response, re.DOTALL)
+        if not json_match:
+            return None
+        try:
+            return json.loads(json_match.group())
+        except json.JSONDecodeError:
+            return None
+
+    @traced("llm.translate_catalog")
+    def translate_catalog(self, items: dict, target_lang: str, kind: str = "phrase") -> dict:
+        """
+        Translate a batch of catalog strings (build time, see scripts/translate_catalog.py).
+
+        Args:
+            items: {id: {"ja": Japanese source or None, "en": English reference or None}}
+            target_lang: Name of the language to translate into
+            kind: "phrase" (what a guest says to staff) or "ui" (app labels and messages)
+
+        Returns:
+            {id: translated text} as returned by the model ({} if the response could not be parsed)
+        """
+        import json
+
+        if kind == "ui":
+            context = "short labels and messages in a restaurant ordering app used by foreign guests"
+        else:
+            context = "phrases a foreign guest shows or says to Japanese restaurant staff"
+        prompt = f"""Translate these {context} into {target_lang}.
+Use the Japanese ("ja") as the source when present and the English ("en") as a reference.
+Keep them as short and natural as the originals, keep emoji and {{placeholders}} unchanged,
+and keep brand names such as "Bridge" untranslated.
+
+{json.dumps(items, ensure_ascii=False, indent=1)}
+
+Respond in JSON with the same ids: {{"<id>": "<{target_lang} text>", ...}}"""
+
+        response = self.generate(prompt, system_prompt="You are a professional localizer for restaurant apps. Respond only in valid JSON.",
+                                 operation="translate_catalog")
+
+        start, end = response.find("{"), response.rfind("}")
+        if start < 0 or end < start:
+            return {}
+        try:
+            result = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        return result if isinstance(result, dict) else {}
+
+    @traced("llm.correct_writing")
     def correct_writing(self, native_text: str, target_text: str, native_lang: str = "日本語", target_lang: str = "English") -> dict:
         """
         Correct user's writing in target language based on native language intent.
@@ -78,7 +177,7 @@ Respond in this JSON format:
     "encouragement": "encouraging message in {native_lang}"
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("correct_writing",
             model=self.model,
             messages=[
                 {"role": "system", "content": f"You are a helpful {target_lang} tutor. Always respond in valid JSON."},
@@ -101,6 +200,7 @@ Respond in this JSON format:
                 "encouragement": "Keep going!"
             }
 
+    @traced("llm.correct_speaking")
     def correct_speaking(self, target_text: str, spoken_text: str, native_lang: str = "日本語", target_lang: str = "English") -> dict:
         """
         Compare what user should have said vs what they actually said.
@@ -136,7 +236,7 @@ Respond in this JSON format:
     "focus_point": "focus point in {native_lang}"
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("correct_speaking",
             model=self.model,
             messages=[
                 {"role": "system", "content": f"You are a helpful {target_lang} pronunciation coach. Always respond in valid JSON."},
@@ -158,6 +258,7 @@ Respond in this JSON format:
                 "focus_point": "Please try again"
             }
 
+    @traced("llm.generate_conversation_starter")
     def generate_conversation_starter(
         self,
         sister_name: str,
@@ -206,7 +307,7 @@ Respond in this JSON format:
     "words_to_highlight": ["key", "vocabulary", "words"]
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("generate_conversation_starter",
             model=self.model,
             messages=[
                 {"role": "system", "content": f"You are {sister_name}, starting a friendly conversation. Always respond in valid JSON."},
@@ -240,6 +341,7 @@ Respond in this JSON format:
                 "words_to_highlight": []
             }
 
+    @traced("llm.sister_response")
     def sister_response(
         self,
         sister_name: str,
@@ -276,7 +378,7 @@ Respond in this JSON format:
     "words_to_highlight": ["key", "vocabulary", "words"]
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("sister_response",
             model=self.model,
             messages=[
                 {"role": "system", "content": f"You are {sister_name}, a language learning partner. Always respond in valid JSON."},
@@ -301,6 +403,7 @@ Respond in this JSON format:
                 "words_to_highlight": ["interesting", "more"]
             }
 
+    @traced("llm.generate_placement_test")
     def generate_placement_test(self, test_type: str = "grammar", target_language: str = "English") -> dict:
         """
         Generate CEFR placement test questions.
@@ -409,7 +512,7 @@ Respond in JSON:
 }}"""
         }
 
-        response = self.client.chat.completions.create(
+        response = self._chat("generate_placement_test",
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are an English test generator. Always respond in valid JSON."},
@@ -424,6 +527,7 @@ Respond in JSON:
         except json.JSONDecodeError:
             return {"questions": []}
 
+    @traced("llm.calculate_cefr_level")
     def calculate_cefr_level(self, results: dict) -> dict:
         """
         Calculate CEFR level based on test results.
@@ -456,7 +560,7 @@ Respond in JSON:
     "confidence": 0.85
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("calculate_cefr_level",
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are an English level assessment expert. Always respond in valid JSON."},
@@ -477,6 +581,7 @@ Respond in JSON:
                 "confidence": 0.5
             }
 
+    @traced("llm.analyze_performance")
     def analyze_performance(self, session_data: dict) -> dict:
         """
         Analyze learning session performance for continuous level adjustment.
@@ -503,7 +608,7 @@ Respond in JSON:
     "confidence": 0.8
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("analyze_performance",
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are an English learning analyst. Always respond in valid JSON."},
@@ -518,6 +623,7 @@ Respond in JSON:
         except json.JSONDecodeError:
             return {"should_adjust": False, "confidence": 0.5}
 
+    @traced("llm.generate_quiz")
     def generate_quiz(self, sister_response: str) -> dict:
         """
         Generate a comprehension quiz based on sister's response.
@@ -541,7 +647,7 @@ Respond in this JSON format:
     "explanation_jp": "正解の解説"
 }}"""
 
-        response = self.client.chat.completions.create(
+        response = self._chat("generate_quiz",
             model=self.model,
             messages=[
                 {"role": "system", "content": "You are a quiz generator. Always respond in valid JSON."},
@@ -0,0 +1,19 @@
+from .meter import (
+    PROVIDER_UNITS,
+    LimitExceeded,
+    Meter,
+    TokenBucket,
+    get_meter,
+    metering_scope,
+)
+from .fallback import translate_with_fallback
+
+__all__ = [
+    "PROVIDER_UNITS",
+    "LimitExceeded",
+    "Meter",
+    "TokenBucket",
+    "get_meter",
+    "metering_scope",
+    "translate_with_fallback",
+]
@@ -0,0 +1,80 @@
+"""
+Cached answers for metered providers
+Translations are reused for identical guest input (across every replica sharing the
+store's database); when a limit refuses a new one, the closest catalog phrase stands in.
+"""
+
+from typing import Optional, Tuple
+
+from storage.shared_cache import single_flight
+from storage.sqlite_store import cache_translation, get_cached_translation, get_db_path
+
+from .meter import LimitExceeded
+
+
+def normalize_input(text: str) -> str:
+    """Cache key for guest input: whitespace-collapsed and case-folded"""
+    return " ".join(text.split()).casefold()
+
+
+def closest_phrase(text: str, lang: str, catalog) -> Optional[dict]:
+    """Best-matching catalog phrase as a translation result, or None"""
+    matches = catalog.search(text, lang, limit=1)
+    if not matches:
+        return None
+    phrase = matches[0]
+    return {
+        "japanese": phrase["ja"],
+        "romaji": phrase["romaji"],
+        "explanation": catalog.translation(phrase["phrase_id"], lang),
+    }
+
+
+def translate_with_fallback(kimi, text: str, lang: str, lang_name: str, catalog) -> Tuple[Optional[dict], str]:
+    """
+    Translate guest input to Japanese, spending tokens only when needed.
+
+    Args:
+        kimi: KimiLLM (may be None if the provider is unavailable)
+        text: Guest input
+        lang: Guest language code
+        lang_name: Guest language name for the prompt
+        catalog: CompiledCatalog used for the phrase fallback
+
+    Returns:
+        (result, source): source is "cache", "live" or "phrase" (closest catalog phrase
+        because a limit was hit or there is no provider); result is None if the reply
+        could not be parsed
+
+    Raises:
+        LimitExceeded: limit hit and no catalog phrase matches the input
+        RuntimeError: no provider and no catalog phrase matches the input
+    """
+    key = normalize_input(text)
+    cached = get_cached_translation(lang, key)
+    if cached:
+        return cached, "cache"
+
+    # Tables in several replicas often send the same sentence at once: translate it once
+    with single_flight(f"translate:{get_db_path()}:{lang}:{key}"):
+        cached = get_cached_translation(lang, key)
+        if cached:
+            return cached, "cache"
+
+        if kimi is None:
+            result = closest_phrase(text, lang, catalog)
+            if result is None:
+                raise RuntimeError("Translation provider unavailable")
+            return result, "phrase"
+
+        try:
+            result = kimi.translate_to_japanese(text, lang_name)
+        except LimitExceeded:
+            result = closest_phrase(text, lang, catalog)
+            if result is None:
+                raise
+            return result, "phrase"
+
+        if result:
+            cache_translation(lang, key, result)
+        return result, "live"
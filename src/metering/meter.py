@@ -0,0 +1,216 @@
+"""
+Provider usage metering
+Records what every provider call costs (ElevenLabs characters, Whisper audio seconds,
+Kimi tokens) per table and language, throttles each table with token buckets and
+enforces daily quotas; each store has its own Meter and shard. Callers catch
+LimitExceeded and degrade to cached answers.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# Billing unit per provider
+PROVIDER_UNITS = {
+    "tts": "characters",
+    "stt": "audio_seconds",
+    "llm": "tokens",
+}
+
+# Per-table request rate "N/S" = bursts of N, refilled at N per S seconds.
+# Override with BRIDGE_TABLE_RATE_<PROVIDER> (empty or 0 = no throttle)
+DEFAULT_TABLE_RATES = {
+    "tts": "30/60",
+    "stt": "6/60",
+    "llm": "6/60",
+}
+
+# Daily quota per provider in its billing unit: BRIDGE_DAILY_QUOTA_<PROVIDER> (empty or 0 = unlimited)
+QUOTA_ENV = "BRIDGE_DAILY_QUOTA_{}"
+TABLE_RATE_ENV = "BRIDGE_TABLE_RATE_{}"
+
+# The app and the API are separate processes sharing bridge.db: re-read today's
+# totals this often so one process sees what the other spent
+QUOTA_SYNC_SECONDS = 10
+
+# Days follow the restaurant's clock, like the hour-of-day analytics
+UTC_OFFSET_ENV = "BRIDGE_UTC_OFFSET_HOURS"
+DEFAULT_UTC_OFFSET_HOURS = 9
+
+# (table_id, language) the provider calls in the current context are billed to
+_scope = contextvars.ContextVar("bridge_metering_scope", default=(None, None))
+
+
+class LimitExceeded(Exception):
+    """A table throttle or a daily quota refused a provider call"""
+
+    def __init__(self, provider: str, reason: str, retry_after: Optional[float] = None):
+        detail = f", retry in {retry_after:.0f} s" if retry_after else ""
+        super().__init__(f"{provider} {reason}{detail}")
+        self.provider = provider
+        self.reason = reason  # "throttled" (this table) or "quota" (whole restaurant, today)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, refilled at `rate` tokens per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take one token; returns 0 on success, else seconds until one is available"""
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def parse_rate(spec: Optional[str]):
+    """"N/S" -> (capacity N, refill N/S per second); None when empty or zero"""
+    if not spec or spec.strip() in ("0", "off"):
+        return None
+    count, _, seconds = spec.partition("/")
+    count, seconds = float(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, count / seconds
+
+
+def metering_day(now: Optional[datetime] = None) -> str:
+    """Restaurant-local date the quotas are counted against"""
+    now = now or datetime.now(timezone.utc)
+    # Read at call time: .env is loaded after this module is imported
+    offset = int(os.getenv(UTC_OFFSET_ENV) or DEFAULT_UTC_OFFSET_HOURS)
+    return (now + timedelta(hours=offset)).strftime("%Y-%m-%d")
+
+
+class Meter:
+    """Per-process throttles and quota bookkeeping over the provider_usage tables"""
+
+    def __init__(self, quotas: Optional[dict] = None, table_rates: Optional[dict] = None):
+        if quotas is None:
+            quotas = {p: float(os.getenv(QUOTA_ENV.format(p.upper())) or 0) for p in PROVIDER_UNITS}
+        if table_rates is None:
+            table_rates = {p: os.getenv(TABLE_RATE_ENV.format(p.upper()), DEFAULT_TABLE_RATES[p])
+                           for p in PROVIDER_UNITS}
+        self.quotas = {p: q for p, q in quotas.items() if q}
+        self.table_rates = {p: rate for p, rate in ((p, parse_rate(s)) for p, s in table_rates.items()) if rate}
+        self._buckets = {}  # (provider, table_id) -> TokenBucket
+        self._lock = threading.Lock()
+        self._day = None
+        self._used = {}  # provider -> units spent today (all processes, as of the last sync)
+        self._synced_at = 0.0
+        self.limited = {"throttled": 0, "quota": 0}
+
+    def _sync(self, now: float):
+        from storage.sqlite_store import get_provider_usage_for_day
+
+        day = metering_day()
+        if day != self._day or now - self._synced_at > QUOTA_SYNC_SECONDS:
+            usage = get_provider_usage_for_day(day)
+            self._day = day
+            self._used = {provider: units for provider, (units, requests) in usage.items()}
+            self._synced_at = now
+
+    def check(self, provider: str, table_id: Optional[str] = None):
+        """Raise LimitExceeded if this call may not go out (takes one throttle token otherwise)"""
+        if table_id is None:
+            table_id = _scope.get()[0]
+        now = time.monotonic()
+        with self._lock:
+            rate = self.table_rates.get(provider)
+            if rate and table_id is not None:
+                bucket = self._buckets.get((provider, table_id))
+                if bucket is None:
+                    bucket = self._buckets[(provider, table_id)] = TokenBucket(*rate)
+                wait = bucket.take(now)
+                if wait:
+                    self._refuse(provider, "throttled", table_id)
+                    raise LimitExceeded(provider, "throttled", wait)
+
+            quota = self.quotas.get(provider)
+            if quota:
+                self._sync(now)
+                if self._used.get(provider, 0) >= quota:
+                    self._refuse(provider, "quota", table_id)
+                    raise LimitExceeded(provider, "quota")
+
+    def _refuse(self, provider: str, reason: str, table_id: Optional[str]):
+        from storage import log_usage
+
+        self.limited[reason] += 1
+        log_usage("limit_reached", None, f"{provider}:{reason}", _scope.get()[1], table_id)
+
+    def record(self, provider: str, operation: str, units: float,
+               table_id: Optional[str] = None, language: Optional[str] = None):
+        """Bill a finished provider call to the current (or given) table and language"""
+        from storage.sqlite_store import record_provider_usage
+
+        scope_table, scope_language = _scope.get()
+        day = metering_day()
+        record_provider_usage(day, provider, operation, float(units or 0),
+                              table_id or scope_table, language or scope_language)
+        with self._lock:
+            if day == self._day:
+                self._used[provider] = self._used.get(provider, 0) + float(units or 0)
+
+    def report(self) -> dict:
+        """Today's usage per provider against its quota, and the heaviest tables"""
+        from storage.sqlite_store import get_provider_usage_by_table, get_provider_usage_for_day
+
+        day = metering_day()
+        usage = get_provider_usage_for_day(day)
+        providers = {}
+        for provider, unit in PROVIDER_UNITS.items():
+            units, requests = usage.get(provider, (0, 0))
+            providers[provider] = {
+                "unit": unit,
+                "units": units,
+                "requests": requests,
+                "quota": self.quotas.get(provider),
+            }
+        return {
+            "day": day,
+            "providers": providers,
+            "tables": get_provider_usage_by_table(day),
+            "limited": dict(self.limited),
+        }
+
+
+_meters = {}  # store_id -> Meter
+_meter_lock = threading.Lock()
+
+
+def get_meter() -> Meter:
+    """Get (or create) this process's Meter for the store in effect (limits read from the environment)"""
+    from storage.stores import current_store
+
+    store_id = current_store()
+    meter = _meters.get(store_id)
+    if meter is None:
+        with _meter_lock:
+            meter = _meters.get(store_id)
+            if meter is None:
+                meter = _meters[store_id] = Meter()
+    return meter
+
+
+@contextmanager
+def metering_scope(table_id: Optional[str], language: Optional[str] = None):
+    """Bill provider calls inside the block to a table and guest language"""
+    token = _scope.set((table_id, language))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
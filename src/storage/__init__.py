@@ -0,0 +1,62 @@
+from .sqlite_store import (
+    DB_PATH,
+    init_db,
+    ensure_schema,
+    log_usage,
+    call_staff,
+    get_pending_calls,
+    get_call_cursor,
+    get_call_changes,
+    get_recent_calls,
+    respond_to_call,
+    resolve_table_calls,
+    get_usage_stats,
+    get_hourly_usage,
+    rebuild_usage_rollups,
+)
+from .archive import RETENTION_DAYS, archive_old_rows, list_archives
+from .call_events import CallNotifier, get_call_notifier
+from .stores import (
+    UnknownStore,
+    current_store,
+    ensure_store_schema,
+    list_stores,
+    resolve_store,
+    store_pack,
+    store_scope,
+    use_store,
+)
+from .dispatch import CALL_PRIORITY, call_priority, prioritize_calls
+
+__all__ = [
+    "DB_PATH",
+    "init_db",
+    "ensure_schema",
+    "log_usage",
+    "call_staff",
+    "get_pending_calls",
+    "get_call_cursor",
+    "get_call_changes",
+    "get_recent_calls",
+    "respond_to_call",
+    "resolve_table_calls",
+    "get_usage_stats",
+    "get_hourly_usage",
+    "rebuild_usage_rollups",
+    "RETENTION_DAYS",
+    "archive_old_rows",
+    "list_archives",
+    "CallNotifier",
+    "get_call_notifier",
+    "UnknownStore",
+    "current_store",
+    "ensure_store_schema",
+    "list_stores",
+    "resolve_store",
+    "store_pack",
+    "store_scope",
+    "use_store",
+    "CALL_PRIORITY",
+    "call_priority",
+    "prioritize_calls",
+]
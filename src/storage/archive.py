@@ -0,0 +1,199 @@
+"""
+Retention and archival for the live Bridge database
+usage_logs and staff_calls rows older than the retention window move into monthly
+archive databases (data/archive/bridge-YYYY-MM.db, same columns; store shards keep theirs
+in data/stores/<id>/archive/), then the live file is compacted with VACUUM.
+Analytics read the archives alongside the live tables.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from .sqlite_store import DB_PATH, _store, get_connection, get_db_path
+
+# Rows older than this many days are archived (BRIDGE_RETENTION_DAYS)
+RETENTION_DAYS = int(os.getenv("BRIDGE_RETENTION_DAYS", "90"))
+
+# Monthly archive databases of the default store (BRIDGE_ARCHIVE_DIR, default data/archive
+# next to bridge.db); each store shard keeps its own archive/ next to its database
+ARCHIVE_DIR = Path(os.getenv("BRIDGE_ARCHIVE_DIR") or DB_PATH.parent / "archive")
+ARCHIVE_PREFIX = "bridge-"
+
+# Archived tables and the extra condition a row must meet to leave the live DB:
+# pending calls stay until answered, and the newest call is kept so the change_seq
+# high-water mark (the dashboard / API cursor) never goes backwards
+ARCHIVED_TABLES = {
+    "usage_logs": "1",
+    "staff_calls": "status != 'pending' AND change_seq < (SELECT MAX(change_seq) FROM main.staff_calls)",
+}
+
+
+def get_archive_dir() -> Path:
+    """Archive directory of the store in effect"""
+    return ARCHIVE_DIR if _store.get() is None else get_db_path().parent / "archive"
+
+
+def archive_path(month: str) -> Path:
+    """Archive database for a month ("YYYY-MM") of the store in effect"""
+    return get_archive_dir() / f"{ARCHIVE_PREFIX}{month}.db"
+
+
+def _month_bounds(month: str):
+    """("YYYY-MM") -> (first instant, first instant of the next month) as SQLite timestamps"""
+    year, mon = int(month[:4]), int(month[5:7])
+    next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return f"{year:04d}-{mon:02d}-01 00:00:00", f"{next_year:04d}-{next_mon:02d}-01 00:00:00"
+
+
+def list_archives(start: Optional[str] = None, end: Optional[str] = None) -> list:
+    """
+    Archive databases, oldest first, optionally only months overlapping [start, end).
+
+    Args:
+        start: Inclusive lower bound (SQLite UTC timestamp), None for no bound
+        end: Exclusive upper bound, None for no bound
+
+    Returns:
+        List of Paths
+    """
+    archive_dir = get_archive_dir()
+    if not archive_dir.exists():
+        return []
+    paths = []
+    for path in sorted(archive_dir.glob(f"{ARCHIVE_PREFIX}????-??.db")):
+        month_start, month_end = _month_bounds(path.stem[len(ARCHIVE_PREFIX):])
+        if (start and month_end <= start) or (end and month_start >= end):
+            continue
+        paths.append(path)
+    return paths
+
+
+def archive_fingerprint():
+    """Cheap value that changes whenever an archive is written (for analytics caches)"""
+    return tuple((path.name, path.stat().st_mtime_ns) for path in list_archives())
+
+
+def connect_archive(path: Path) -> sqlite3.Connection:
+    """Read-only connection to an archive database"""
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _ensure_archive_table(c: sqlite3.Cursor, table: str) -> list:
+    """Create / widen archive.<table> to match the live columns. Returns the column names."""
+    c.execute(f"PRAGMA main.table_info({table})")
+    columns = [(row[1], row[2]) for row in c.fetchall()]
+    definitions = ", ".join(
+        f"{name} INTEGER PRIMARY KEY" if name == "id" else f"{name} {kind}" for name, kind in columns
+    )
+    c.execute(f"CREATE TABLE IF NOT EXISTS archive.{table} ({definitions})")
+    c.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_created_at ON {table} (created_at)")
+
+    # Live schema gained a column since this archive was created
+    c.execute(f"PRAGMA archive.table_info({table})")
+    existing = {row[1] for row in c.fetchall()}
+    for name, kind in columns:
+        if name not in existing:
+            c.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {kind}")
+    return [name for name, kind in columns]
+
+
+def archive_old_rows(retention_days: int = RETENTION_DAYS, vacuum: bool = True) -> dict:
+    """
+    Move rows older than the retention window into monthly archives and compact the live DB.
+
+    Each month is copied and deleted in one transaction spanning both files, so a crash
+    leaves every row in exactly one place; rerunning is safe (archived ids are ignored).
+    Lifetime rollups (actions, languages, phrases) keep counting archived rows; hourly
+    rollup buckets older than the window are dropped with them.
+
+    Args:
+        retention_days: Keep rows created within this many days in the live DB
+        vacuum: Rebuild the live file afterwards to return the freed pages to the OS
+
+    Returns:
+        dict with "cutoff", rows moved per table ("archived"), "months" written, and the
+        live DB size before / after in bytes
+    """
+    db_path = get_db_path()
+    size_before = db_path.stat().st_size if db_path.exists() else 0
+    conn = get_connection(isolation_level=None)
+    c = conn.cursor()
+    # On an hour boundary: the hourly rollup buckets dropped below then match the archived rows exactly
+    c.execute("SELECT strftime('%Y-%m-%d %H:00:00', 'now', ?)", (f"-{retention_days} days",))
+    cutoff = c.fetchone()[0]
+
+    archived = {table: 0 for table in ARCHIVED_TABLES}
+    months = set()
+    try:
+        for table, condition in ARCHIVED_TABLES.items():
+            c.execute(f'''SELECT DISTINCT substr(created_at, 1, 7) FROM {table}
+                          WHERE created_at < ? AND {condition}''', (cutoff,))
+            for (month,) in sorted(c.fetchall()):
+                month_start, month_end = _month_bounds(month)
+                archive_path(month).parent.mkdir(parents=True, exist_ok=True)
+                c.execute("ATTACH DATABASE ? AS archive", (str(archive_path(month)),))
+                try:
+                    columns = ", ".join(_ensure_archive_table(c, table))
+                    where = f"created_at >= ? AND created_at < ? AND created_at < ? AND {condition}"
+                    params = (month_start, month_end, cutoff)
+                    c.execute("BEGIN IMMEDIATE")
+                    c.execute(f'''INSERT OR IGNORE INTO archive.{table} ({columns})
+                                  SELECT {columns} FROM main.{table} WHERE {where}''', params)
+                    c.execute(f"DELETE FROM main.{table} WHERE {where}", params)
+                    archived[table] += c.rowcount
+                    c.execute("COMMIT")
+                finally:
+                    if conn.in_transaction:
+                        c.execute("ROLLBACK")
+                    c.execute("DETACH DATABASE archive")
+                months.add(month)
+
+        # Hour-of-day buckets only cover the recent past; older ones live in the archives
+        c.execute("DELETE FROM usage_rollup_hourly WHERE hour_bucket < strftime('%Y-%m-%d %H:00', ?)", (cutoff,))
+
+        if vacuum:
+            c.execute("VACUUM")
+    finally:
+        conn.close()
+
+    return {
+        "cutoff": cutoff,
+        "archived": archived,
+        "months": sorted(months),
+        "size_before": size_before,
+        "size_after": db_path.stat().st_size if db_path.exists() else 0,
+    }
+
+
+def archived_usage_counts():
+    """
+    Lifetime usage counts held in the archives, for rebuilding the rollups.
+
+    Returns:
+        dict with "action" [(action, count)], "language" [(language, count)] and
+        "phrase" [(action, phrase_ja, count)], summed over every archive
+    """
+    totals = {"action": {}, "language": {}, "phrase": {}}
+    queries = {
+        "action": "SELECT action, COUNT(*) FROM usage_logs GROUP BY action",
+        "language": "SELECT language, COUNT(*) FROM usage_logs WHERE language IS NOT NULL GROUP BY language",
+        "phrase": '''SELECT action, phrase_ja, COUNT(*) FROM usage_logs
+                     WHERE phrase_ja IS NOT NULL GROUP BY action, phrase_ja''',
+    }
+    for path in list_archives():
+        conn = connect_archive(path)
+        try:
+            c = conn.cursor()
+            c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_logs'")
+            if c.fetchone() is None:
+                continue
+            for name, query in queries.items():
+                c.execute(query)
+                for *key, count in c.fetchall():
+                    key = tuple(key)
+                    totals[name][key] = totals[name].get(key, 0) + count
+        finally:
+            conn.close()
+    return {name: [(*key, count) for key, count in counts.items()] for name, counts in totals.items()}
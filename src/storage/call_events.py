@@ -0,0 +1,111 @@
+"""
+Staff call change notifications
+One watcher thread per process and store turns SQLite commits into an in-process version bump,
+so dashboard sessions only re-query staff_calls when something actually changed.
+"""
+
+import sqlite3
+import threading
+from typing import Optional
+
+# How often the watcher checks PRAGMA data_version (seconds).
+# Same-process writers call publish() and wake it immediately.
+WATCH_INTERVAL = 0.2
+
+
+class CallNotifier:
+    """Process-wide change feed for one store's staff_calls table"""
+
+    def __init__(self, watch_interval: float = WATCH_INTERVAL):
+        self.watch_interval = watch_interval
+        self._cond = threading.Condition()
+        self._version = 0
+        self._dirty = False
+
+        from .sqlite_store import get_connection
+
+        # Dedicated connection: data_version only moves when *other* connections commit
+        self._conn = get_connection(check_same_thread=False)
+        self._data_version = self._read_data_version()
+        self._fingerprint = self._read_fingerprint()
+
+        self._thread = threading.Thread(target=self._watch, name="bridge-call-notifier", daemon=True)
+        self._thread.start()
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter, bumped once per observed staff_calls change"""
+        return self._version
+
+    def publish(self):
+        """Signal a staff_calls write made in this process (wakes the watcher at once)"""
+        with self._cond:
+            self._dirty = True
+            self._cond.notify_all()
+
+    def wait_for_change(self, since: int, timeout: Optional[float] = None) -> int:
+        """Block until version > since (or timeout). Returns the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > since, timeout=timeout)
+            return self._version
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_fingerprint(self):
+        from .sqlite_store import get_calls_fingerprint
+
+        # Usage logs share the database file, so a data_version change alone is not enough
+        try:
+            return get_calls_fingerprint(self._conn)
+        except sqlite3.Error:
+            return None
+
+    def _watch(self):
+        while True:
+            with self._cond:
+                if not self._dirty:
+                    self._cond.wait(self.watch_interval)
+                self._dirty = False
+
+            try:
+                data_version = self._read_data_version()
+            except sqlite3.Error:
+                continue
+            if data_version == self._data_version:
+                continue
+            self._data_version = data_version
+
+            fingerprint = self._read_fingerprint()
+            if fingerprint != self._fingerprint:
+                self._fingerprint = fingerprint
+                with self._cond:
+                    self._version += 1
+                    self._cond.notify_all()
+
+
+_notifiers = {}  # store_id -> CallNotifier
+_notifier_lock = threading.Lock()
+
+
+def get_call_notifier() -> CallNotifier:
+    """Get (or start) this process's CallNotifier for the store in effect"""
+    from .sqlite_store import _store
+
+    store_id = _store.get()
+    notifier = _notifiers.get(store_id)
+    if notifier is None:
+        with _notifier_lock:
+            notifier = _notifiers.get(store_id)
+            if notifier is None:
+                notifier = _notifiers[store_id] = CallNotifier()
+    return notifier
+
+
+def publish_call_event():
+    """Wake the store's notifier after a staff_calls write (no-op if nobody is listening)"""
+    from .sqlite_store import _store
+
+    notifier = _notifiers.get(_store.get())
+    if notifier is not None:
+        notifier.publish()
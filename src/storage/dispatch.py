@@ -0,0 +1,61 @@
+"""
+Staff call dispatch order
+Pending calls are ranked by call type priority, plus aging so nothing waits forever
+"""
+
+from datetime import datetime
+from typing import Optional
+
+# Base priority per call type (higher = serve first)
+CALL_PRIORITY = {
+    "problem": 4,
+    "bill": 3,
+    "call": 2,
+    "toilet": 1,
+    "water": 1,
+    "menu": 1,
+}
+DEFAULT_PRIORITY = 1
+
+# Aging: a call gains one priority level for every AGING_SECONDS it has waited,
+# so a water request left for 3 minutes overtakes a fresh "sumimasen"
+AGING_SECONDS = 90
+
+# Each extra tap (coalesced call_count) counts as this many seconds of waiting
+REPEAT_TAP_SECONDS = 30
+
+
+def _parse_timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def call_priority(call_type: str, created_at: str, call_count: int = 1, now: Optional[datetime] = None) -> float:
+    """Dispatch score for one pending call (created_at is a SQLite UTC timestamp)"""
+    now = now or datetime.utcnow()
+    created = _parse_timestamp(created_at)
+    waited = max((now - created).total_seconds(), 0) if created else 0
+    waited += max((call_count or 1) - 1, 0) * REPEAT_TAP_SECONDS
+    return CALL_PRIORITY.get(call_type, DEFAULT_PRIORITY) + waited / AGING_SECONDS
+
+
+def prioritize_calls(calls: list, now: Optional[datetime] = None) -> list:
+    """
+    Order pending call rows for dispatch, most urgent first.
+
+    Args:
+        calls: Rows in CALL_COLUMNS order (id, table_id, call_type, message, status, created_at, ...)
+        now: Reference time (UTC), defaults to the current time
+
+    Returns:
+        New list sorted by descending priority, oldest first on ties
+    """
+    now = now or datetime.utcnow()
+
+    def sort_key(call):
+        call_count = call[7] if len(call) > 7 else 1
+        return (-call_priority(call[2], call[5], call_count, now), call[0])
+
+    return sorted(calls, key=sort_key)
@@ -0,0 +1,229 @@
+"""
+Host-wide shared cache
+st.cache_resource and the in-memory AudioStore only live as long as one process, so
+several Streamlit replicas (plus the API) on one host would each pay for the same
+synthesis and translations. DiskCache keeps blobs under data/cache/<namespace>/ with a
+SQLite index for LRU eviction, and single_flight() serializes a miss across processes
+with flock'd lock files: whichever replica gets there first calls the provider, the
+others wait and reuse its result.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from .sqlite_store import DB_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: single_flight() then only covers this process
+    fcntl = None
+
+# Shared by every process on the host (BRIDGE_CACHE_DIR, default data/cache next to bridge.db)
+CACHE_DIR = Path(os.getenv("BRIDGE_CACHE_DIR") or DB_PATH.parent / "cache")
+
+# Lock files single_flight() hashes names onto (a fixed set, so the directory never grows
+# and no lock file is ever deleted under a waiter). Unrelated names sharing a stripe
+# serialize across processes; with 256 stripes that is rare and costs one provider call
+LOCK_STRIPES = 256
+
+# Longest a miss waits for another process's call before making its own; a crashed
+# holder releases its flock immediately, this only guards against a hung one
+LOCK_TIMEOUT = 30.0
+LOCK_POLL_SECONDS = 0.05
+
+_local_locks = {}  # name -> [Lock, waiters]
+_local_guard = threading.Lock()
+
+
+def _digest(name: str) -> str:
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+
+def lock_stripe(name: str) -> int:
+    """Lock file index single_flight() uses for name across processes"""
+    return int(_digest(name)[:8], 16) % LOCK_STRIPES
+
+
+@contextmanager
+def single_flight(name: str, timeout: float = LOCK_TIMEOUT, shared: bool = True):
+    """
+    Hold the host-wide lock for name: one thread in one process at a time.
+
+    Callers re-check their cache inside the block, so concurrent misses for the same
+    key (in any replica) produce the value once. Across processes the lock is one of
+    LOCK_STRIPES lock files picked by the name's hash: two different names on the same
+    stripe also wait for each other (up to timeout); shared=False never does.
+
+    Args:
+        name: Lock name, e.g. "audio:<key>"
+        timeout: Seconds to wait before going ahead without the lock
+        shared: Also lock out other processes (False = this process only)
+
+    Yields:
+        True if the lock is held, False if the wait timed out
+    """
+    with _local_guard:
+        entry = _local_locks.setdefault(name, [threading.Lock(), 0])
+        entry[1] += 1
+    local_held = entry[0].acquire(timeout=timeout)
+    lock_file = None
+    try:
+        held = local_held
+        if held and shared and fcntl is not None:
+            deadline = time.monotonic() + timeout
+            held = False
+            try:
+                lock_dir = CACHE_DIR / "locks"
+                lock_dir.mkdir(parents=True, exist_ok=True)
+                lock_file = open(lock_dir / f"{lock_stripe(name):03d}.lock", "a+b")
+                while True:
+                    try:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        held = True
+                        break
+                    except BlockingIOError:
+                        if time.monotonic() >= deadline:
+                            break
+                        time.sleep(LOCK_POLL_SECONDS)
+            except OSError as e:
+                print(f"[CACHE] Lock unavailable for {name}: {e}")
+        yield held
+    finally:
+        if lock_file is not None:
+            lock_file.close()  # Releases the flock
+        if local_held:
+            entry[0].release()
+        with _local_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _local_locks.pop(name, None)
+
+
+class DiskCache:
+    """Key -> bytes cache shared by every process on the host, LRU-evicted to max_bytes"""
+
+    def __init__(self, namespace: str, max_bytes: int, root: Optional[Path] = None):
+        self.dir = Path(root or CACHE_DIR) / namespace
+        self.index_path = self.dir / "index.db"
+        self.max_bytes = max_bytes
+        self._ready = False
+        self.hits = 0  # This process only
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.index_path), timeout=10)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                accessed_at REAL NOT NULL
+            )''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _path(self, key: str) -> Path:
+        digest = _digest(key)
+        return self.dir / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached bytes for key, or None"""
+        try:
+            data = self._path(key).read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            conn = self._connect()
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            pass  # Recency is best effort
+        return data
+
+    def put(self, key: str, data: bytes) -> bool:
+        """Store bytes under key (visible to other processes once this returns)"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Temp file + rename: readers in other processes never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            conn = self._connect()
+            conn.execute('''INSERT OR REPLACE INTO entries (key, size, accessed_at)
+                            VALUES (?, ?, ?)''', (key, len(data), time.time()))
+            conn.commit()
+            conn.close()
+            self._evict()
+            return True
+        except Exception as e:
+            print(f"[CACHE] Could not store {key} in {self.dir}: {e}")
+            return False
+
+    def _evict(self):
+        """Drop least recently used entries until the index is under budget"""
+        conn = self._connect()
+        try:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            c.execute("SELECT COALESCE(SUM(size), 0) FROM entries")
+            excess = c.fetchone()[0] - self.max_bytes
+            victims = []
+            if excess > 0:
+                c.execute("SELECT key, size FROM entries ORDER BY accessed_at")
+                for key, size in c:
+                    if excess <= 0:
+                        break
+                    victims.append(key)
+                    excess -= size
+                c.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+            conn.commit()
+        finally:
+            conn.close()
+        # Files go after the commit; a process that already opened one still reads it whole
+        for key in victims:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        """Cache statistics (entries / bytes across the host, hits / misses in this process)"""
+        entries, size = 0, 0
+        try:
+            conn = self._connect()
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            conn.close()
+        except Exception as e:
+            pass
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
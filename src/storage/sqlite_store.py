@@ -0,0 +1,690 @@
+"""
+SQLite storage for Bridge
+Staff calls, usage logs and the usage rollup tables read by the dashboard,
+plus provider metering and the translation cache (old rows move to storage.archive)
+"""
+
+import contextvars
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from tracing import traced
+
+from .call_events import publish_call_event
+
+# Database path (BRIDGE_DB_PATH points benchmarks and load tests at a scratch database)
+DB_PATH = Path(os.getenv("BRIDGE_DB_PATH") or Path(__file__).parent.parent.parent / "data" / "bridge.db")
+
+# Bump whenever init_db() changes the schema; ensure_schema() skips init_db() when current
+SCHEMA_VERSION = 5
+
+# Every insert/update of staff_calls takes the next change_seq, so "changed since N"
+# is a single index range scan (writes are serialized by SQLite, so values are unique)
+NEXT_CHANGE_SEQ = "(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM staff_calls)"
+
+# Columns returned for full staff call rows
+CALL_COLUMNS = "id, table_id, call_type, message, status, created_at, responded_at, call_count"
+
+# Repeated calls of the same type from the same table within this window
+# (measured from the latest tap) bump call_count on the pending row instead of adding one
+CALL_COALESCE_SECONDS = 180
+
+# Rollup tables: one row per key, counts maintained on every log_usage() call
+ROLLUP_TABLES = (
+    "usage_rollup_action",
+    "usage_rollup_language",
+    "usage_rollup_phrase",
+    "usage_rollup_hourly",
+)
+
+
+# Per-store shards live under data/stores/<store_id>/ (see storage.stores)
+STORES_DIR = DB_PATH.parent / "stores"
+
+# Store the storage calls in the current context go to (None = the default database)
+_store = contextvars.ContextVar("bridge_store", default=None)
+
+
+def get_db_path(store_id: Optional[str] = None) -> Path:
+    """Database file for a store (default: the store in effect)"""
+    store_id = store_id or _store.get()
+    return DB_PATH if store_id is None else STORES_DIR / store_id / DB_PATH.name
+
+
+def get_connection(**kwargs) -> sqlite3.Connection:
+    """Open a connection to the Bridge database of the store in effect"""
+    db_path = get_db_path()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(str(db_path), **kwargs)
+
+
+def get_shared_connection(**kwargs) -> sqlite3.Connection:
+    """Open a connection to the default database (process-wide data such as trace spans)"""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(str(DB_PATH), **kwargs)
+
+
+# ===========================================
+# Schema
+# ===========================================
+def _add_column_if_missing(c: sqlite3.Cursor, table: str, column: str, definition: str) -> bool:
+    """Add a column to an existing table (schema upgrade). Returns True if it was added."""
+    c.execute(f"PRAGMA table_info({table})")
+    if any(row[1] == column for row in c.fetchall()):
+        return False
+    c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+def init_db():
+    """Initialize SQLite database"""
+    conn = get_connection()
+    c = conn.cursor()
+
+    # Staff calls table
+    c.execute('''CREATE TABLE IF NOT EXISTS staff_calls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_id TEXT NOT NULL,
+        call_type TEXT NOT NULL,
+        message TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        responded_at TIMESTAMP,
+        change_seq INTEGER,
+        call_count INTEGER NOT NULL DEFAULT 1,
+        last_called_at TIMESTAMP,
+        language TEXT
+    )''')
+    if _add_column_if_missing(c, "staff_calls", "change_seq", "INTEGER"):
+        c.execute("UPDATE staff_calls SET change_seq = id WHERE change_seq IS NULL")
+    _add_column_if_missing(c, "staff_calls", "call_count", "INTEGER NOT NULL DEFAULT 1")
+    _add_column_if_missing(c, "staff_calls", "last_called_at", "TIMESTAMP")
+    _add_column_if_missing(c, "staff_calls", "language", "TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_staff_calls_status ON staff_calls (status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_staff_calls_table_status ON staff_calls (table_id, status)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_staff_calls_created_at ON staff_calls (created_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_staff_calls_change_seq ON staff_calls (change_seq)")
+
+    # Usage logs table
+    c.execute('''CREATE TABLE IF NOT EXISTS usage_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        action TEXT NOT NULL,
+        phrase_ja TEXT,
+        phrase_category TEXT,
+        language TEXT,
+        table_id TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_created_at ON usage_logs (created_at)")
+
+    # Usage rollups (incrementally maintained aggregates of usage_logs)
+    c.execute('''CREATE TABLE IF NOT EXISTS usage_rollup_action (
+        action TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS usage_rollup_language (
+        language TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS usage_rollup_phrase (
+        action TEXT NOT NULL,
+        phrase_ja TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (action, phrase_ja)
+    )''')
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_usage_rollup_phrase_count
+                 ON usage_rollup_phrase (action, count DESC)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS usage_rollup_hourly (
+        hour_bucket TEXT NOT NULL,
+        action TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (hour_bucket, action)
+    )''')
+
+    # Latency trace spans (written in batches by tracing.Tracer)
+    c.execute('''CREATE TABLE IF NOT EXISTS trace_spans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at REAL NOT NULL,
+        stage TEXT NOT NULL,
+        mode TEXT,
+        duration_ms REAL NOT NULL,
+        ok INTEGER NOT NULL DEFAULT 1
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_trace_spans_started_at ON trace_spans (started_at)")
+
+    # Provider metering: one row per billed provider call, plus a per-day rollup for quotas
+    c.execute('''CREATE TABLE IF NOT EXISTS provider_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        day TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        operation TEXT,
+        units REAL NOT NULL,
+        table_id TEXT,
+        language TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_provider_usage_day ON provider_usage (day)")
+    c.execute('''CREATE TABLE IF NOT EXISTS provider_usage_daily (
+        day TEXT NOT NULL,
+        provider TEXT NOT NULL,
+        units REAL NOT NULL DEFAULT 0,
+        requests INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, provider)
+    )''')
+
+    # Translations already paid for, reused for identical guest input
+    c.execute('''CREATE TABLE IF NOT EXISTS translation_cache (
+        language TEXT NOT NULL,
+        source_text TEXT NOT NULL,
+        result TEXT NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (language, source_text)
+    )''')
+
+    # Incremental export high-water marks, one per (export name, table)
+    c.execute('''CREATE TABLE IF NOT EXISTS export_watermarks (
+        name TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        watermark INTEGER NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (name, table_name)
+    )''')
+
+    # First start after upgrading: backfill rollups from existing history
+    c.execute("SELECT EXISTS (SELECT 1 FROM usage_rollup_action), EXISTS (SELECT 1 FROM usage_logs)")
+    has_rollups, has_logs = c.fetchone()
+    if has_logs and not has_rollups:
+        _rebuild_rollups(c)
+
+    c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+
+
+def ensure_schema():
+    """Run init_db() only if the database is older than SCHEMA_VERSION (one PRAGMA read otherwise)"""
+    conn = get_connection()
+    user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    if user_version < SCHEMA_VERSION:
+        init_db()
+
+
+# ===========================================
+# Usage logs
+# ===========================================
+def _bump_rollups(c: sqlite3.Cursor, log_id: int, action: str, phrase_ja: Optional[str], language: Optional[str]):
+    """Add one usage log entry to every rollup row it touches"""
+    c.execute('''INSERT INTO usage_rollup_action (action, count) VALUES (?, 1)
+                 ON CONFLICT(action) DO UPDATE SET count = count + 1''', (action,))
+    if language is not None:
+        c.execute('''INSERT INTO usage_rollup_language (language, count) VALUES (?, 1)
+                     ON CONFLICT(language) DO UPDATE SET count = count + 1''', (language,))
+    if phrase_ja is not None:
+        c.execute('''INSERT INTO usage_rollup_phrase (action, phrase_ja, count) VALUES (?, ?, 1)
+                     ON CONFLICT(action, phrase_ja) DO UPDATE SET count = count + 1''', (action, phrase_ja))
+    # Bucket by the row's own created_at so incremental and rebuilt rollups agree
+    c.execute('''INSERT INTO usage_rollup_hourly (hour_bucket, action, count)
+                 SELECT strftime('%Y-%m-%d %H:00', created_at), action, 1 FROM usage_logs WHERE id = ?
+                 ON CONFLICT(hour_bucket, action) DO UPDATE SET count = count + 1''', (log_id,))
+
+
+@traced("db.log_usage")
+def log_usage(action: str, phrase_ja: str = None, phrase_category: str = None, language: str = None, table_id: str = None):
+    """Log usage data and update the rollups in the same transaction"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''INSERT INTO usage_logs (action, phrase_ja, phrase_category, language, table_id)
+                     VALUES (?, ?, ?, ?, ?)''', (action, phrase_ja, phrase_category, language, table_id))
+        _bump_rollups(c, c.lastrowid, action, phrase_ja, language)
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        pass  # Silent fail for logging
+
+
+def _rebuild_rollups(c: sqlite3.Cursor):
+    """Recompute every rollup table from usage_logs (and the archived logs)"""
+    for table in ROLLUP_TABLES:
+        c.execute(f"DELETE FROM {table}")
+
+    c.execute('''INSERT INTO usage_rollup_action (action, count)
+                 SELECT action, COUNT(*) FROM usage_logs GROUP BY action''')
+    c.execute('''INSERT INTO usage_rollup_language (language, count)
+                 SELECT language, COUNT(*) FROM usage_logs
+                 WHERE language IS NOT NULL GROUP BY language''')
+    c.execute('''INSERT INTO usage_rollup_phrase (action, phrase_ja, count)
+                 SELECT action, phrase_ja, COUNT(*) FROM usage_logs
+                 WHERE phrase_ja IS NOT NULL GROUP BY action, phrase_ja''')
+    c.execute('''INSERT INTO usage_rollup_hourly (hour_bucket, action, count)
+                 SELECT strftime('%Y-%m-%d %H:00', created_at), action, COUNT(*) FROM usage_logs
+                 GROUP BY 1, action''')
+
+    # Archived rows still count toward the lifetime totals (hourly buckets cover live rows only)
+    from .archive import archived_usage_counts
+
+    archived = archived_usage_counts()
+    c.executemany('''INSERT INTO usage_rollup_action (action, count) VALUES (?, ?)
+                     ON CONFLICT(action) DO UPDATE SET count = count + excluded.count''', archived["action"])
+    c.executemany('''INSERT INTO usage_rollup_language (language, count) VALUES (?, ?)
+                     ON CONFLICT(language) DO UPDATE SET count = count + excluded.count''', archived["language"])
+    c.executemany('''INSERT INTO usage_rollup_phrase (action, phrase_ja, count) VALUES (?, ?, ?)
+                     ON CONFLICT(action, phrase_ja) DO UPDATE SET count = count + excluded.count''', archived["phrase"])
+
+
+def rebuild_usage_rollups() -> int:
+    """Rebuild the rollup tables from scratch. Returns the number of log rows aggregated."""
+    conn = get_connection()
+    c = conn.cursor()
+    _rebuild_rollups(c)
+    c.execute("SELECT COALESCE(SUM(count), 0) FROM usage_rollup_action")
+    aggregated = c.fetchone()[0]
+    conn.commit()
+    conn.close()
+    return aggregated
+
+
+@traced("db.get_usage_stats")
+def get_usage_stats():
+    """Get usage statistics from the rollup tables"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+
+        # Total phrase taps / translations
+        c.execute("SELECT action, count FROM usage_rollup_action WHERE action IN ('phrase_tap', 'translate')")
+        totals = dict(c.fetchall())
+
+        # Language distribution
+        c.execute('''SELECT language, count
+                     FROM usage_rollup_language
+                     ORDER BY count DESC''')
+        languages = c.fetchall()
+
+        # Popular phrases
+        c.execute('''SELECT phrase_ja, count
+                     FROM usage_rollup_phrase
+                     WHERE action = 'phrase_tap'
+                     ORDER BY count DESC
+                     LIMIT 10''')
+        popular_phrases = c.fetchall()
+
+        conn.close()
+        return {
+            "phrase_taps": totals.get("phrase_tap", 0),
+            "translations": totals.get("translate", 0),
+            "languages": languages,
+            "popular_phrases": popular_phrases
+        }
+    except Exception as e:
+        return {"phrase_taps": 0, "translations": 0, "languages": [], "popular_phrases": []}
+
+
+@traced("db.get_hourly_usage")
+def get_hourly_usage(hours: int = 24):
+    """Get usage counts per hour bucket for the last `hours` hours"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''SELECT hour_bucket, action, count
+                     FROM usage_rollup_hourly
+                     WHERE hour_bucket >= strftime('%Y-%m-%d %H:00', 'now', ?)
+                     ORDER BY hour_bucket''', (f"-{hours} hours",))
+        rows = c.fetchall()
+        conn.close()
+        return rows
+    except Exception as e:
+        return []
+
+
+# ===========================================
+# Staff calls
+# ===========================================
+@traced("db.call_staff")
+def call_staff(table_id: str, call_type: str, message: str = None, language: str = None):
+    """Create a staff call notification (or coalesce it into a recent pending one)"""
+    try:
+        conn = get_connection(isolation_level=None)
+        c = conn.cursor()
+        # IMMEDIATE: take the write lock before looking, so two taps can't both insert
+        c.execute("BEGIN IMMEDIATE")
+        c.execute('''SELECT id FROM staff_calls
+                     WHERE table_id = ? AND call_type = ? AND status = 'pending'
+                       AND COALESCE(last_called_at, created_at) >= datetime('now', ?)
+                     ORDER BY id DESC
+                     LIMIT 1''', (table_id, call_type, f"-{CALL_COALESCE_SECONDS} seconds"))
+        row = c.fetchone()
+        if row:
+            c.execute(f'''UPDATE staff_calls
+                          SET call_count = call_count + 1, last_called_at = CURRENT_TIMESTAMP,
+                              change_seq = {NEXT_CHANGE_SEQ}
+                          WHERE id = ?''', (row[0],))
+        else:
+            c.execute(f'''INSERT INTO staff_calls (table_id, call_type, message, language, change_seq, last_called_at)
+                          VALUES (?, ?, ?, ?, {NEXT_CHANGE_SEQ}, CURRENT_TIMESTAMP)''',
+                      (table_id, call_type, message, language))
+        c.execute("COMMIT")
+        conn.close()
+        publish_call_event()
+        return True
+    except Exception as e:
+        return False
+
+
+def get_pending_calls():
+    """Get all pending staff calls"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''SELECT id, table_id, call_type, message, created_at, call_count
+                     FROM staff_calls
+                     WHERE status = 'pending'
+                     ORDER BY created_at DESC''')
+        calls = c.fetchall()
+        conn.close()
+        return calls
+    except Exception as e:
+        return []
+
+
+def get_calls_fingerprint(conn: sqlite3.Connection):
+    """Cheap (index-only) value that changes on every new call or response"""
+    c = conn.cursor()
+    c.execute("SELECT MAX(change_seq) FROM staff_calls")
+    return c.fetchone()[0]
+
+
+def get_call_cursor() -> int:
+    """Current staff_calls high-water mark (pass to get_call_changes to receive later changes)"""
+    try:
+        conn = get_connection()
+        cursor = get_calls_fingerprint(conn) or 0
+        conn.close()
+        return cursor
+    except Exception as e:
+        return 0
+
+
+# Not traced: the dashboard polls this twice a second
+def get_call_changes(cursor: Optional[int] = None, limit: int = 500):
+    """
+    Delta-sync staff calls using a change_seq high-water mark.
+
+    Args:
+        cursor: Last cursor returned by this function (None for the initial snapshot)
+        limit: Maximum rows per delta; call again with the new cursor if more remain
+
+    Returns:
+        (calls, cursor, is_snapshot). The initial snapshot holds only pending calls;
+        deltas hold every call created or changed after `cursor`, in change order.
+    """
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        if cursor is None:
+            c.execute("SELECT COALESCE(MAX(change_seq), 0) FROM staff_calls")
+            new_cursor = c.fetchone()[0]
+            c.execute(f'''SELECT {CALL_COLUMNS}
+                          FROM staff_calls
+                          WHERE status = 'pending' AND change_seq <= ?
+                          ORDER BY id DESC''', (new_cursor,))
+            calls = c.fetchall()
+            conn.close()
+            return calls, new_cursor, True
+
+        c.execute(f'''SELECT {CALL_COLUMNS}, change_seq
+                      FROM staff_calls
+                      WHERE change_seq > ?
+                      ORDER BY change_seq
+                      LIMIT ?''', (cursor, limit))
+        rows = c.fetchall()
+        conn.close()
+        if rows:
+            cursor = rows[-1][-1]
+        return [row[:-1] for row in rows], cursor, False
+    except Exception as e:
+        return [], cursor, False
+
+
+@traced("db.get_recent_calls")
+def get_recent_calls(limit=20, before_id: Optional[int] = None):
+    """Get recent staff calls (all statuses), newest first. Pass the last id seen as before_id for the next page."""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        if before_id is None:
+            c.execute(f'''SELECT {CALL_COLUMNS}
+                          FROM staff_calls
+                          ORDER BY id DESC
+                          LIMIT ?''', (limit,))
+        else:
+            c.execute(f'''SELECT {CALL_COLUMNS}
+                          FROM staff_calls
+                          WHERE id < ?
+                          ORDER BY id DESC
+                          LIMIT ?''', (before_id, limit))
+        calls = c.fetchall()
+        conn.close()
+        return calls
+    except Exception as e:
+        return []
+
+
+@traced("db.respond_to_call")
+def respond_to_call(call_id):
+    """Mark a call as responded"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute(f'''UPDATE staff_calls
+                      SET status = 'responded', responded_at = CURRENT_TIMESTAMP,
+                          change_seq = {NEXT_CHANGE_SEQ}
+                      WHERE id = ?''', (call_id,))
+        conn.commit()
+        conn.close()
+        publish_call_event()
+        return True
+    except Exception as e:
+        return False
+
+
+@traced("db.resolve_table_calls")
+def resolve_table_calls(table_id: str) -> int:
+    """Mark every pending call from one table as responded in a single transaction. Returns the number resolved."""
+    try:
+        conn = get_connection(isolation_level=None)
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("SELECT id FROM staff_calls WHERE table_id = ? AND status = 'pending'", (table_id,))
+        call_ids = [row[0] for row in c.fetchall()]
+        # One row at a time so each keeps a distinct change_seq
+        for call_id in call_ids:
+            c.execute(f'''UPDATE staff_calls
+                          SET status = 'responded', responded_at = CURRENT_TIMESTAMP,
+                              change_seq = {NEXT_CHANGE_SEQ}
+                          WHERE id = ?''', (call_id,))
+        c.execute("COMMIT")
+        conn.close()
+        if call_ids:
+            publish_call_event()
+        return len(call_ids)
+    except Exception as e:
+        return 0
+
+
+# ===========================================
+# Trace spans
+# ===========================================
+def record_spans(spans: list) -> bool:
+    """Insert a batch of (started_at, stage, mode, duration_ms, ok) spans"""
+    try:
+        conn = get_shared_connection()
+        conn.executemany('''INSERT INTO trace_spans (started_at, stage, mode, duration_ms, ok)
+                            VALUES (?, ?, ?, ?, ?)''', spans)
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        return False
+
+
+def prune_spans(before: float) -> int:
+    """Delete spans that started before the given epoch time"""
+    try:
+        conn = get_shared_connection()
+        c = conn.cursor()
+        c.execute("DELETE FROM trace_spans WHERE started_at < ?", (before,))
+        conn.commit()
+        conn.close()
+        return c.rowcount
+    except Exception as e:
+        return 0
+
+
+def get_span_durations(since: float):
+    """(stage, mode, duration_ms, ok) for every span started at or after `since` (epoch)"""
+    try:
+        conn = get_shared_connection()
+        c = conn.cursor()
+        c.execute('''SELECT stage, COALESCE(mode, '-'), duration_ms, ok
+                     FROM trace_spans
+                     WHERE started_at >= ?''', (since,))
+        rows = c.fetchall()
+        conn.close()
+        return rows
+    except Exception as e:
+        return []
+
+
+# ===========================================
+# Provider metering
+# ===========================================
+def record_provider_usage(day: str, provider: str, operation: str, units: float,
+                          table_id: str = None, language: str = None) -> bool:
+    """Record one billed provider call and add it to the day's rollup"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''INSERT INTO provider_usage (day, provider, operation, units, table_id, language)
+                     VALUES (?, ?, ?, ?, ?, ?)''', (day, provider, operation, units, table_id, language))
+        c.execute('''INSERT INTO provider_usage_daily (day, provider, units, requests) VALUES (?, ?, ?, 1)
+                     ON CONFLICT(day, provider) DO UPDATE SET units = units + excluded.units,
+                                                              requests = requests + 1''',
+                  (day, provider, units))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        return False
+
+
+def get_provider_usage_for_day(day: str) -> dict:
+    """{provider: (units, requests)} for one day (from the rollup)"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute("SELECT provider, units, requests FROM provider_usage_daily WHERE day = ?", (day,))
+        rows = c.fetchall()
+        conn.close()
+        return {provider: (units, requests) for provider, units, requests in rows}
+    except Exception as e:
+        return {}
+
+
+def get_provider_usage_by_table(day: str, limit: int = 20):
+    """(provider, table_id, units, requests) for one day, heaviest first"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''SELECT provider, COALESCE(table_id, '-'), SUM(units), COUNT(*)
+                     FROM provider_usage
+                     WHERE day = ?
+                     GROUP BY provider, table_id
+                     ORDER BY SUM(units) DESC
+                     LIMIT ?''', (day, limit))
+        rows = c.fetchall()
+        conn.close()
+        return rows
+    except Exception as e:
+        return []
+
+
+# ===========================================
+# Translation cache
+# ===========================================
+def get_cached_translation(language: str, source_text: str) -> Optional[dict]:
+    """Previously returned translation for the same (normalized) input, or None"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''UPDATE translation_cache SET hits = hits + 1
+                     WHERE language = ? AND source_text = ?
+                     RETURNING result''', (language, source_text))
+        row = c.fetchone()
+        conn.commit()
+        conn.close()
+        return json.loads(row[0]) if row else None
+    except Exception as e:
+        return None
+
+
+def cache_translation(language: str, source_text: str, result: dict) -> bool:
+    """Store a translation result for reuse"""
+    try:
+        conn = get_connection()
+        conn.execute('''INSERT OR REPLACE INTO translation_cache (language, source_text, result)
+                        VALUES (?, ?, ?)''', (language, source_text, json.dumps(result, ensure_ascii=False)))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        return False
+
+
+# ===========================================
+# Export watermarks
+# ===========================================
+def get_export_watermark(name: str, table_name: str) -> Optional[int]:
+    """Last exported id / change_seq of a table for an incremental export, or None"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute("SELECT watermark FROM export_watermarks WHERE name = ? AND table_name = ?", (name, table_name))
+        row = c.fetchone()
+        conn.close()
+        return row[0] if row else None
+    except Exception as e:
+        return None
+
+
+def set_export_watermark(name: str, table_name: str, watermark: int, rows: int):
+    """Advance an incremental export's watermark after its file was written"""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute('''INSERT INTO export_watermarks (name, table_name, watermark, rows) VALUES (?, ?, ?, ?)
+                 ON CONFLICT(name, table_name) DO UPDATE
+                 SET watermark = excluded.watermark, rows = excluded.rows, exported_at = CURRENT_TIMESTAMP''',
+              (name, table_name, watermark, rows))
+    conn.commit()
+    conn.close()
+
+
+def get_export_watermarks():
+    """(name, table_name, watermark, rows, exported_at) for every incremental export"""
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''SELECT name, table_name, watermark, rows, exported_at
+                     FROM export_watermarks
+                     ORDER BY name, table_name''')
+        rows = c.fetchall()
+        conn.close()
+        return rows
+    except Exception as e:
+        return []
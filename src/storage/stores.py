@@ -0,0 +1,89 @@
+"""
+Multi-restaurant routing
+Each store (?store=<id> next to table / lang) gets its own SQLite shard under
+data/stores/<id>/ and its own phrase pack, so one busy location never waits on another's
+write lock. Storage calls go to the store in effect: see store_scope() / use_store().
+"""
+
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from .sqlite_store import _store, ensure_schema
+
+# Registered stores: "shibuya=example-izakaya,umeda" (store id, optional =phrase pack).
+# Empty = single-restaurant mode (everything in the default database)
+STORES_ENV = "BRIDGE_STORES"
+
+# Store ids become directory names
+STORE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_ready = set()
+_ready_lock = threading.Lock()
+
+
+class UnknownStore(KeyError):
+    """A store id that is not registered in BRIDGE_STORES"""
+
+
+def list_stores() -> dict:
+    """Registered stores: {store_id: phrase pack or None}"""
+    stores = {}
+    for entry in (os.getenv(STORES_ENV) or "").split(","):
+        store_id, _, pack = entry.strip().partition("=")
+        store_id = store_id.strip()
+        if not store_id:
+            continue
+        if not STORE_ID_PATTERN.match(store_id):
+            raise ValueError(f"{STORES_ENV}: invalid store id '{store_id}'")
+        stores[store_id] = pack.strip() or None
+    return stores
+
+
+def resolve_store(store_id: Optional[str]) -> Optional[str]:
+    """Validate a store id from a URL / request (None or "" = the default database)"""
+    if not store_id:
+        return None
+    if store_id not in list_stores():
+        raise UnknownStore(store_id)
+    return store_id
+
+
+def store_pack(store_id: Optional[str]) -> Optional[str]:
+    """Phrase pack for a store (None = BRIDGE_PHRASE_PACK / the default catalog)"""
+    if store_id is None:
+        return None
+    return list_stores().get(store_id)
+
+
+def current_store() -> Optional[str]:
+    """Store the storage calls in the current context go to"""
+    return _store.get()
+
+
+def ensure_store_schema(store_id: Optional[str]):
+    """ensure_schema() for a store's shard, once per process"""
+    if store_id in _ready:
+        return
+    with _ready_lock:
+        if store_id not in _ready:
+            with store_scope(store_id):
+                ensure_schema()
+            _ready.add(store_id)
+
+
+@contextmanager
+def store_scope(store_id: Optional[str]):
+    """Route storage calls inside the block to a store's shard"""
+    token = _store.set(store_id)
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def use_store(store_id: Optional[str]):
+    """Route the rest of the current context (e.g. one Streamlit script run) to a store's shard"""
+    _store.set(store_id)
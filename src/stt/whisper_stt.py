@@ -4,7 +4,10 @@ Whisper STT Provider for Sisters-Multilingual-Coach
 
 import os
 from typing import Optional
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient
+
+from metering import get_meter
+from tracing import traced
 
 
 class WhisperSTT:
@@ -15,9 +18,21 @@ class WhisperSTT:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not set in environment")
 
-        self.client = OpenAI(api_key=self.api_key)
+        # Keep our own pooled HTTP client so warm_up() can pre-open the TLS connection
+        self.http_client = DefaultHttpxClient()
+        # OPENAI_BASE_URL (e.g. the local stand-in) overrides the public endpoint
+        self.client = OpenAI(api_key=self.api_key, base_url=os.getenv("OPENAI_BASE_URL") or None,
+                             http_client=self.http_client)
         self.model = "whisper-1"
 
+    def warm_up(self):
+        """Open a pooled TLS connection to the API ahead of the first request"""
+        try:
+            self.http_client.head(str(self.client.base_url), timeout=5)
+        except Exception as e:
+            print(f"[STT] Warm-up failed: {e}")
+
+    @traced("stt.transcribe")
     def transcribe(
         self,
         audio_path: str,
@@ -33,6 +48,10 @@ class WhisperSTT:
         Returns:
             Dict with transcription result
         """
+        # Billed per second of audio
+        meter = get_meter()
+        meter.check("stt")
+
         with open(audio_path, "rb") as audio_file:
             kwargs = {
                 "model": self.model,
@@ -44,6 +63,7 @@ class WhisperSTT:
                 kwargs["language"] = language
 
             response = self.client.audio.transcriptions.create(**kwargs)
+        meter.record("stt", "transcribe", getattr(response, "duration", None) or 0)
 
         return {
             "text": response.text,
@@ -52,6 +72,7 @@ class WhisperSTT:
             "segments": response.segments if hasattr(response, 'segments') else []
         }
 
+    @traced("stt.transcribe_bytes")
     def transcribe_bytes(
         self,
         audio_bytes: bytes,
@@ -0,0 +1,3 @@
+from .tracer import Tracer, get_tracer, span, traced, trace_mode, traced_mode
+
+__all__ = ["Tracer", "get_tracer", "span", "traced", "trace_mode", "traced_mode"]
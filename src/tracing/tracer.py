@@ -0,0 +1,164 @@
+"""
+Lightweight latency tracing
+Spans (stage, mode, duration) are appended to an in-memory ring buffer and written to
+SQLite in batches by a background thread, so tracing never adds a DB write to a tap.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+# Spans kept in memory while waiting for the next flush (oldest dropped when full)
+RING_SIZE = 10_000
+
+# Flush every FLUSH_SECONDS, or sooner once FLUSH_BATCH spans are waiting
+FLUSH_SECONDS = 5.0
+FLUSH_BATCH = 500
+
+# Persisted spans older than this are pruned (checked once per PRUNE_SECONDS)
+RETENTION_DAYS = 7
+PRUNE_SECONDS = 3600
+
+# UI mode (quick / call / practice / translate / api ...) the current span belongs to
+_mode = contextvars.ContextVar("bridge_trace_mode", default=None)
+
+
+_enabled: Optional[bool] = None
+
+
+def tracing_enabled() -> bool:
+    """BRIDGE_TRACING=0 turns spans into no-ops (read on first use, after .env is loaded)"""
+    global _enabled
+    if _enabled is None:
+        _enabled = os.getenv("BRIDGE_TRACING", "1").lower() not in ("0", "false", "off")
+    return _enabled
+
+
+class Tracer:
+    """Ring buffer of finished spans plus the batch writer thread"""
+
+    def __init__(self, ring_size: int = RING_SIZE, flush_seconds: float = FLUSH_SECONDS):
+        self._ring = deque(maxlen=ring_size)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self.written = 0
+        self._last_prune = 0.0
+
+    def record(self, stage: str, mode: Optional[str], started_at: float, duration_ms: float, ok: bool):
+        """Queue a finished span (cheap: one deque append)"""
+        if len(self._ring) == self._ring.maxlen:
+            self.dropped += 1
+        self._ring.append((started_at, stage, mode, duration_ms, int(ok)))
+        if self._thread is None:
+            self._start()
+        elif len(self._ring) >= FLUSH_BATCH:
+            self._wake.set()
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bridge-tracer", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        """Write every queued span to SQLite; returns the number written"""
+        from storage.sqlite_store import record_spans, prune_spans
+
+        with self._flush_lock:
+            batch = []
+            while self._ring:
+                try:
+                    batch.append(self._ring.popleft())
+                except IndexError:
+                    break
+            if batch and record_spans(batch):
+                self.written += len(batch)
+
+            now = time.time()
+            if now - self._last_prune > PRUNE_SECONDS:
+                self._last_prune = now
+                prune_spans(now - RETENTION_DAYS * 86400)
+            return len(batch)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[TRACE] Flush failed: {e}")
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get (or create) this process's Tracer"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+    return _tracer
+
+
+@contextmanager
+def span(stage: str, mode: Optional[str] = None):
+    """Time the enclosed block as one span of `stage` (mode defaults to the current trace mode)"""
+    if not tracing_enabled():
+        yield
+        return
+    started_at = time.time()
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        get_tracer().record(stage, mode or _mode.get(), started_at, duration_ms, ok)
+
+
+def traced(stage: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace_mode(mode: str):
+    """Attribute spans started inside the block to a UI mode"""
+    token = _mode.set(mode)
+    try:
+        yield
+    finally:
+        _mode.reset(token)
+
+
+def traced_mode(mode: str, stage: str = "ui.panel"):
+    """Decorator: run func under trace_mode(mode) and time it as a `stage` span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_mode(mode), span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
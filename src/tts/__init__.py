@@ -1,3 +1,6 @@
 from .elevenlabs_tts import ElevenLabsTTS
+from .audio_store import AudioStore, shared_audio_store
+from .phrase_assets import PhraseAssets
+from .postprocess import AudioPostProcessor
 
-__all__ = ["ElevenLabsTTS"]
+__all__ = ["ElevenLabsTTS", "AudioStore", "shared_audio_store", "PhraseAssets", "AudioPostProcessor"]
@@ -0,0 +1,182 @@
+"""
+Shared audio store
+Process-wide, size-bounded cache of generated speech. Sessions keep only a content key,
+so the same phrase is held in memory once no matter how many tables played it.
+Backed by the host-wide disk cache, replicas reuse each other's synthesis too.
+New clips are post-processed (trimmed, loudness-normalized, re-encoded) once, as they
+enter the cache, so every later play gets the processed bytes for free.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from storage.shared_cache import DiskCache, single_flight
+
+from .postprocess import AudioPostProcessor
+
+# Default memory budget for cached audio (bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Streamlit never tells us when a browser session goes away, so a session's
+# reference counts as live only if it was touched within this many seconds
+DEFAULT_REF_TTL = 30 * 60
+
+# Disk budget for audio shared by every process on the host (0 = memory only)
+DISK_CACHE_ENV = "BRIDGE_AUDIO_DISK_CACHE_MB"
+DEFAULT_DISK_CACHE_MB = 512
+
+
+class AudioStore:
+    """Content-keyed audio cache with reference-aware LRU eviction"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ref_ttl: float = DEFAULT_REF_TTL,
+                 disk: Optional[DiskCache] = None, postprocessor: Optional[AudioPostProcessor] = None):
+        self.max_bytes = max_bytes
+        self.ref_ttl = ref_ttl
+        self.disk = disk
+        self.postprocessor = postprocessor
+        self._entries = OrderedDict()  # key -> bytes, least recently used first
+        self._refs = {}  # key -> {owner: last_touched}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(text: str, voice_id: Optional[str] = None, model: Optional[str] = None) -> str:
+        """Content key for a synthesis request"""
+        return hashlib.sha1(f"{model}\x00{voice_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[bytes]:
+        """Get audio by key from memory, then the disk cache (None if never stored or evicted)"""
+        if key is None:
+            return None
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+        if self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store audio under key (and on disk for other processes), evicting older entries if over budget"""
+        if self.disk is not None:
+            self.disk.put(key, data)
+        return self._remember(key, data)
+
+    def _remember(self, key: str, data: bytes) -> str:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            self._evict()
+        return key
+
+    def get_or_create(self, key: str, producer: Callable[[], bytes]) -> Optional[bytes]:
+        """Return cached audio for key, calling producer() (and the post-processor) once on a miss"""
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        with single_flight(f"audio:{key}", shared=self.disk is not None):
+            # Another session or replica may have produced it while we waited
+            data = self.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            self.misses += 1
+            data = producer()
+            if data:
+                if self.postprocessor is not None:
+                    data = self.postprocessor.process(data)
+                self.put(key, data)
+            return data
+
+    def acquire(self, key: Optional[str], owner: str):
+        """Mark key as in use by owner (a session); refreshes the reference timestamp"""
+        if key is None:
+            return
+        with self._lock:
+            self._refs.setdefault(key, {})[owner] = time.monotonic()
+
+    def release(self, key: Optional[str], owner: str):
+        """Drop owner's reference to key"""
+        if key is None:
+            return
+        with self._lock:
+            owners = self._refs.get(key)
+            if owners:
+                owners.pop(owner, None)
+                if not owners:
+                    del self._refs[key]
+
+    def _is_referenced(self, key: str, now: float) -> bool:
+        owners = self._refs.get(key)
+        if not owners:
+            return False
+        for owner, touched in list(owners.items()):
+            if now - touched > self.ref_ttl:
+                del owners[owner]
+        if not owners:
+            del self._refs[key]
+            return False
+        return True
+
+    def _evict(self):
+        """Evict LRU entries until under budget: unreferenced first, then referenced"""
+        if self._bytes <= self.max_bytes:
+            return
+        now = time.monotonic()
+        for key in [k for k in self._entries if not self._is_referenced(k, now)]:
+            if self._bytes <= self.max_bytes:
+                return
+            self._drop(key)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        data = self._entries.pop(key)
+        self._bytes -= len(data)
+        self._refs.pop(key, None)
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        """Cache statistics"""
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "referenced": len(self._refs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        if self.postprocessor is not None:
+            stats["postprocess"] = self.postprocessor.stats()
+        return stats
+
+
+def shared_audio_store() -> AudioStore:
+    """
+    AudioStore backed by the host-wide disk cache (BRIDGE_AUDIO_DISK_CACHE_MB, 0 = memory only)
+    that post-processes new clips (BRIDGE_AUDIO_POSTPROCESS=0 stores them as received)
+    """
+    disk_mb = float(os.getenv(DISK_CACHE_ENV) or DEFAULT_DISK_CACHE_MB)
+    disk = DiskCache("audio", int(disk_mb * 1024 * 1024)) if disk_mb > 0 else None
+    postprocessor = AudioPostProcessor() if AudioPostProcessor.enabled() else None
+    return AudioStore(disk=disk, postprocessor=postprocessor)
@@ -5,12 +5,19 @@ Updated for ElevenLabs SDK v1.x
 
 import os
 from typing import Optional
+import httpx
 from dotenv import load_dotenv
 from elevenlabs import ElevenLabs
 
+from metering import get_meter
+from tracing import traced
+
 # Ensure .env is loaded
 load_dotenv()
 
+ELEVENLABS_BASE_URL = "https://api.elevenlabs.io"
+DEFAULT_MODEL = "eleven_multilingual_v2"
+
 
 class ElevenLabsTTS:
     """Text-to-Speech using ElevenLabs API"""
@@ -20,7 +27,16 @@ class ElevenLabsTTS:
         if not self.api_key:
             raise ValueError("ELEVENLABS_API_KEY not set in environment")
 
-        self.client = ElevenLabs(api_key=self.api_key)
+        # Pooled client with a longer keep-alive than httpx's 5 s default,
+        # so the connection survives the gap between customer taps
+        self.http_client = httpx.Client(
+            timeout=240,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        )
+        # ELEVENLABS_BASE_URL points at a proxy or the local stand-in (benchmarks/standin_server.py)
+        self.base_url = os.getenv("ELEVENLABS_BASE_URL") or ELEVENLABS_BASE_URL
+        self.client = ElevenLabs(api_key=self.api_key, base_url=self.base_url, httpx_client=self.http_client)
 
         # Voice IDs for each character + user example (can be customized)
         self.voice_ids = {
@@ -31,12 +47,13 @@ class ElevenLabsTTS:
             "User": os.getenv("ELEVENLABS_VOICE_ID_USER", "scOwDtmlUjD3prqpp97I"),  # Sam (male) for example
         }
 
-        self.model = os.getenv("ELEVENLABS_MODEL", "eleven_multilingual_v2")
+        self.model = os.getenv("ELEVENLABS_MODEL", DEFAULT_MODEL)
 
         # Debug: Print all voice IDs on init
         print(f"[TTS INIT] Voice IDs loaded: {self.voice_ids}")
         print(f"[TTS INIT] Model: {self.model}")
 
+    @traced("tts.generate_speech")
     def generate_speech(
         self,
         text: str,
@@ -60,7 +77,10 @@ class ElevenLabsTTS:
             resolved_voice_id = voice_id
         else:
             resolved_voice_id = self.voice_ids.get(sister, self.voice_ids["Botan"])
-        print(f"[TTS] Sister: {sister}, Voice ID: {resolved_voice_id}")  # Debug
+
+        # Billed per character: refuse before spending if this table / today is over its limit
+        meter = get_meter()
+        meter.check("tts")
 
         # Generate audio using new SDK API
         audio_generator = self.client.text_to_speech.convert(
@@ -77,6 +97,7 @@ class ElevenLabsTTS:
 
         # Convert generator to bytes
         audio_bytes = b"".join(audio_generator)
+        meter.record("tts", "generate_speech", len(text))
 
         # Save to file if path provided
         if output_path:
@@ -85,6 +106,13 @@ class ElevenLabsTTS:
 
         return audio_bytes
 
+    def warm_up(self):
+        """Open a pooled TLS connection to the API ahead of the first request"""
+        try:
+            self.http_client.head(self.base_url, timeout=5)
+        except Exception as e:
+            print(f"[TTS] Warm-up failed: {e}")
+
     def get_available_voices(self) -> list:
         """Get list of available voices from ElevenLabs"""
         voices = self.client.voices.get_all()
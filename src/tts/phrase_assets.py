@@ -0,0 +1,96 @@
+"""
+Static phrase audio assets
+Phrase clips are published once as content-fingerprinted files under src/static/audio,
+served by Streamlit's static file server (/app/static/...). Because a file name never
+changes content, browsers and the CDN can cache them forever and replay locally on tap.
+Every replica on the host shares the same files and manifest.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from storage.shared_cache import single_flight
+
+# Streamlit serves <main script dir>/static at /app/static when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_DIR = Path(__file__).parent.parent / "static"
+AUDIO_DIR = STATIC_DIR / "audio"
+MANIFEST_PATH = AUDIO_DIR / "manifest.json"
+URL_PREFIX = "/app/static/audio"
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via temp file + rename so readers never see a partial file"""
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class PhraseAssets:
+    """Manifest of published phrase clips: synthesis key -> fingerprinted file name"""
+
+    def __init__(self, audio_dir: Path = AUDIO_DIR, url_prefix: str = URL_PREFIX):
+        self.audio_dir = Path(audio_dir)
+        self.manifest_path = self.audio_dir / MANIFEST_PATH.name
+        self.url_prefix = url_prefix
+        self._manifest = {}
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        # The generator script or another process may have published new clips
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime != self._manifest_mtime:
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                self._manifest_mtime = mtime
+            except (OSError, ValueError):
+                pass
+
+    def filename_for(self, key: str) -> Optional[str]:
+        """Published file name for a synthesis key (None if not published or file missing)"""
+        with self._lock:
+            self._reload_if_changed()
+            filename = self._manifest.get(key)
+        if filename and (self.audio_dir / filename).exists():
+            return filename
+        return None
+
+    def url_for(self, key: str) -> Optional[str]:
+        """Browser URL for a synthesis key (None if not published yet)"""
+        filename = self.filename_for(key)
+        return f"{self.url_prefix}/{filename}" if filename else None
+
+    def publish(self, key: str, audio_bytes: bytes, suffix: str = ".mp3") -> str:
+        """Write audio as a fingerprinted file, record it in the manifest and return its URL"""
+        fingerprint = hashlib.sha256(audio_bytes).hexdigest()[:16]
+        filename = f"{fingerprint}{suffix}"
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+
+        path = self.audio_dir / filename
+        if not path.exists():
+            _atomic_write(path, audio_bytes)
+
+        # Replicas publish into the same manifest: read-modify-write under the host-wide lock
+        with single_flight(f"manifest:{self.manifest_path}"), self._lock:
+            self._reload_if_changed()
+            if self._manifest.get(key) != filename:
+                self._manifest[key] = filename
+                _atomic_write(self.manifest_path,
+                              json.dumps(self._manifest, ensure_ascii=False, indent=1, sort_keys=True).encode("utf-8"))
+                self._manifest_mtime = self.manifest_path.stat().st_mtime_ns
+        return f"{self.url_prefix}/{filename}"
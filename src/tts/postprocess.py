@@ -0,0 +1,210 @@
+"""
+Generated speech post-processing
+Clips from the TTS API start with leading silence (perceived as delay on tap), vary in
+loudness from phrase to phrase and arrive as full-bitrate MP3. AudioPostProcessor trims
+the silence, normalizes integrated loudness (ITU-R BS.1770) to a target LUFS and
+re-encodes to VBR MP3, once when a clip enters the cache; playback only ever sees the
+processed bytes.
+"""
+
+import io
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+# Streaming services and podcasts sit around -16 LUFS; loud enough over restaurant noise
+DEFAULT_TARGET_LUFS = -16.0
+
+# Normalization never pushes a sample above this (dBFS sample peak)
+PEAK_CEILING_DB = -1.0
+
+# Trimming: 10 ms analysis frames; a frame is silence when it is this far below the
+# loudest frame (and in any case below the floor). Some padding is kept so consonant
+# onsets and the natural decay survive, with short fades at the new edges
+TRIM_FRAME_SECONDS = 0.010
+TRIM_RANGE_DB = 40.0
+TRIM_FLOOR_DB = -60.0
+TRIM_LEAD_SECONDS = 0.030
+TRIM_TAIL_SECONDS = 0.150
+FADE_SECONDS = 0.005
+
+# libsndfile / LAME VBR quality: 0.0 = largest and best, 1.0 = smallest. 0.5 keeps speech clean
+DEFAULT_MP3_QUALITY = 0.5
+
+POSTPROCESS_ENV = "BRIDGE_AUDIO_POSTPROCESS"
+TARGET_LUFS_ENV = "BRIDGE_AUDIO_TARGET_LUFS"
+MP3_QUALITY_ENV = "BRIDGE_AUDIO_MP3_QUALITY"
+
+
+def decode(data: bytes):
+    """Encoded audio -> (mono float32 samples, sample rate)"""
+    samples, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return samples.mean(axis=1), rate
+
+
+def encode_mp3(samples: np.ndarray, rate: int, quality: float = DEFAULT_MP3_QUALITY) -> bytes:
+    """Mono float samples -> VBR MP3 bytes"""
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, rate, format="MP3", subtype="MPEG_LAYER_III",
+             compression_level=quality, bitrate_mode="VARIABLE")
+    return buffer.getvalue()
+
+
+def trim_silence(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Cut leading / trailing silence, keeping a little padding (unchanged if all silent)"""
+    frame = max(int(rate * TRIM_FRAME_SECONDS), 1)
+    count = len(samples) // frame
+    if count == 0:
+        return samples
+    rms = np.sqrt(np.mean(samples[:count * frame].reshape(count, frame) ** 2, axis=1))
+    level = 20 * np.log10(rms + 1e-12)
+    threshold = max(level.max() - TRIM_RANGE_DB, TRIM_FLOOR_DB)
+    voiced = np.flatnonzero(level > threshold)
+    if len(voiced) == 0:
+        return samples
+
+    start = max(voiced[0] * frame - int(rate * TRIM_LEAD_SECONDS), 0)
+    end = min((voiced[-1] + 1) * frame + int(rate * TRIM_TAIL_SECONDS), len(samples))
+    trimmed = samples[start:end].copy()
+    fade = min(int(rate * FADE_SECONDS), len(trimmed) // 2)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, dtype=trimmed.dtype)
+        if start > 0:
+            trimmed[:fade] *= ramp
+        if end < len(samples):
+            trimmed[-fade:] *= ramp[::-1]
+    return trimmed
+
+
+def _biquad_response(b: tuple, a: tuple, rate: int, n: int) -> np.ndarray:
+    """Complex frequency response of a biquad at the rfft bins of an n-point FFT"""
+    z = np.exp(-1j * 2 * np.pi * np.fft.rfftfreq(n, 1 / rate) / rate)
+    return (b[0] + b[1] * z + b[2] * z ** 2) / (a[0] + a[1] * z + a[2] * z ** 2)
+
+
+def _k_weighting(rate: int, n: int) -> np.ndarray:
+    """BS.1770 K-weighting for any sample rate, as an FFT response (filter design as in libebur128)"""
+    # Stage 1: high shelf, about +4 dB above 1.7 kHz (head acoustics)
+    f0, gain, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    K = np.tan(np.pi * f0 / rate)
+    Vh = 10 ** (gain / 20)
+    Vb = Vh ** 0.4996667741545416
+    a0 = 1 + K / q + K * K
+    shelf = _biquad_response(
+        ((Vh + Vb * K / q + K * K) / a0, 2 * (K * K - Vh) / a0, (Vh - Vb * K / q + K * K) / a0),
+        (1.0, 2 * (K * K - 1) / a0, (1 - K / q + K * K) / a0),
+        rate, n)
+
+    # Stage 2: high pass at 38 Hz (RLB weighting)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    K = np.tan(np.pi * f0 / rate)
+    a0 = 1 + K / q + K * K
+    high_pass = _biquad_response(
+        (1.0, -2.0, 1.0),
+        (1.0, 2 * (K * K - 1) / a0, (1 - K / q + K * K) / a0),
+        rate, n)
+    return shelf * high_pass
+
+
+def integrated_loudness(samples: np.ndarray, rate: int) -> float:
+    """
+    Integrated loudness in LUFS (ITU-R BS.1770-4, mono).
+
+    Returns:
+        LUFS, or -inf for silence
+    """
+    if len(samples) == 0:
+        return float("-inf")
+    # Filter in the frequency domain (NumPy has no IIR filter); the padding absorbs the
+    # filters' decay so the circular convolution does not wrap around
+    n = 1 << int(np.ceil(np.log2(len(samples) + rate // 2)))
+    weighted = np.fft.irfft(np.fft.rfft(samples, n) * _k_weighting(rate, n), n)[:len(samples)]
+
+    # Mean square per 400 ms block, 75 % overlap (one block for shorter clips)
+    block, step = int(0.4 * rate), int(0.1 * rate)
+    energy = np.concatenate(([0.0], np.cumsum(weighted.astype(np.float64) ** 2)))
+    if len(samples) <= block:
+        power = np.array([energy[-1] / len(samples)])
+    else:
+        starts = np.arange(0, len(samples) - block + 1, step)
+        power = (energy[starts + block] - energy[starts]) / block
+
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > -70.0]  # Absolute gate
+    if len(gated) == 0:
+        return float("-inf")
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    with np.errstate(divide="ignore"):
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative_gate]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+class AudioPostProcessor:
+    """Trim, loudness-normalize and re-encode generated clips, keeping totals for reporting"""
+
+    def __init__(self, target_lufs: Optional[float] = None, mp3_quality: Optional[float] = None):
+        if target_lufs is None:
+            target_lufs = float(os.getenv(TARGET_LUFS_ENV) or DEFAULT_TARGET_LUFS)
+        if mp3_quality is None:
+            mp3_quality = float(os.getenv(MP3_QUALITY_ENV) or DEFAULT_MP3_QUALITY)
+        self.target_lufs = target_lufs
+        self.mp3_quality = mp3_quality
+        self._lock = threading.Lock()
+        self.clips = 0
+        self.failures = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.trimmed_seconds = 0.0
+
+    @staticmethod
+    def enabled() -> bool:
+        """Post-processing is on unless BRIDGE_AUDIO_POSTPROCESS=0"""
+        return os.getenv(POSTPROCESS_ENV, "1").strip().lower() not in ("0", "false", "off")
+
+    def process(self, data: bytes) -> bytes:
+        """
+        Post-process one clip.
+
+        Returns:
+            The processed MP3, or the original bytes if it could not be decoded or encoded
+        """
+        try:
+            samples, rate = decode(data)
+            trimmed = trim_silence(samples, rate)
+            loudness = integrated_loudness(trimmed, rate)
+            if np.isfinite(loudness):
+                gain = 10 ** ((self.target_lufs - loudness) / 20)
+                peak = float(np.abs(trimmed).max())
+                ceiling = 10 ** (PEAK_CEILING_DB / 20)
+                if peak * gain > ceiling:
+                    gain = ceiling / peak
+                trimmed = trimmed * np.float32(gain)
+            processed = encode_mp3(trimmed, rate, self.mp3_quality)
+        except Exception as e:
+            print(f"[TTS] Post-processing failed, keeping the original clip: {e}")
+            with self._lock:
+                self.failures += 1
+            return data
+
+        with self._lock:
+            self.clips += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(processed)
+            self.trimmed_seconds += (len(samples) - len(trimmed)) / rate
+        return processed
+
+    def stats(self) -> dict:
+        """Totals since start: clips processed, bytes before / after / saved, silence removed"""
+        with self._lock:
+            return {
+                "clips": self.clips,
+                "failures": self.failures,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "trimmed_seconds": round(self.trimmed_seconds, 3),
+            }
@@ -0,0 +1,37 @@
+"""
+Shared fixtures: src/ on sys.path (as the app and scripts set it up) and every
+database, archive and cache redirected into a per-test temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+# Module-level paths are read at import: point them somewhere harmless before any import
+_SESSION_DIR = Path(tempfile.mkdtemp(prefix="bridge-tests-"))
+os.environ["BRIDGE_DB_PATH"] = str(_SESSION_DIR / "bridge.db")
+os.environ["BRIDGE_CACHE_DIR"] = str(_SESSION_DIR / "cache")
+os.environ["BRIDGE_TRACING"] = "0"
+os.environ.pop("BRIDGE_STORES", None)
+
+
+@pytest.fixture
+def bridge_db(tmp_path, monkeypatch):
+    """Fresh default database (plus store shards, archives and caches) under tmp_path"""
+    from storage import archive, shared_cache, sqlite_store, stores
+
+    db_path = tmp_path / "bridge.db"
+    monkeypatch.setattr(sqlite_store, "DB_PATH", db_path)
+    monkeypatch.setattr(sqlite_store, "STORES_DIR", tmp_path / "stores")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(shared_cache, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(stores, "_ready", set())
+    monkeypatch.delenv("BRIDGE_STORES", raising=False)
+    sqlite_store.init_db()
+    return db_path
@@ -0,0 +1,93 @@
+"""Headless API (api.server): store routing and phrase endpoints"""
+
+import pytest
+from starlette.testclient import TestClient
+
+from catalog import get_catalog
+from catalog.phrase_catalog import pack_path
+
+
+@pytest.fixture
+def client(bridge_db, monkeypatch):
+    from api.server import create_app
+
+    monkeypatch.delenv("BRIDGE_API_TOKEN", raising=False)
+    monkeypatch.delenv("BRIDGE_PHRASE_PACK", raising=False)
+    monkeypatch.setenv("BRIDGE_STORES", "shibuya=example-izakaya,umeda")
+    return TestClient(create_app())  # No lifespan: the call watcher thread is not needed
+
+
+def phrase_ids(response):
+    assert response.status_code == 200
+    return [phrase["id"] for phrase in response.json()["phrases"]]
+
+
+def test_store_selects_its_pack(client):
+    assert phrase_ids(client.get("/v1/phrases")) == list(get_catalog().phrase_ids)
+    assert phrase_ids(client.get("/v1/phrases?store=shibuya")) == list(get_catalog("example-izakaya").phrase_ids)
+    assert client.get("/v1/phrases?store=nowhere").status_code == 404
+
+
+@pytest.mark.parametrize("pack", ["../data/default", "example-izakaya", "/etc/passwd"])
+def test_pack_cannot_be_chosen_by_the_request(client, pack):
+    assert phrase_ids(client.get("/v1/phrases", params={"store": "umeda", "pack": pack})) == \
+        list(get_catalog().phrase_ids)
+
+
+@pytest.mark.parametrize("name", ["../data/default", "a/b", "Example", "", "pack.json"])
+def test_pack_names_are_validated(name):
+    with pytest.raises(ValueError):
+        pack_path(name)
+    assert pack_path("example-izakaya").is_file()
+
+
+def test_search_limit_is_clamped(client):
+    from api.server import MAX_SEARCH_LIMIT
+
+    assert len(phrase_ids(client.get("/v1/phrases", params={"q": "a", "limit": 100000}))) <= MAX_SEARCH_LIMIT
+    assert len(phrase_ids(client.get("/v1/phrases", params={"q": "a", "limit": -5}))) == 1
+    assert client.get("/v1/phrases", params={"q": "a", "limit": "many"}).status_code == 400
+
+
+def test_phrase_audio_revalidates_before_synthesis(client, monkeypatch):
+    from api import server
+
+    phrase = get_catalog().phrases[0]
+    synthesized = []
+
+    def fake_audio(key, text, table_id=None, lang=None):
+        synthesized.append(text)
+        return None, b"ID3 clip"
+
+    monkeypatch.setattr(server, "_phrase_audio", fake_audio)
+    url = f"/v1/phrases/{phrase['phrase_id']}/audio"
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == b"ID3 clip"
+    # Not a content-addressed URL: caches must revalidate, the ETag is the content key
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+    assert etag == f'"{server._phrase_audio_key(phrase["ja"])}"'
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and synthesized == [phrase["ja"]]
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get("/v1/phrases/nope/audio").status_code == 404
+
+
+def test_translate_without_provider_degrades_per_item(client, monkeypatch):
+    from storage.sqlite_store import cache_translation
+
+    monkeypatch.delenv("KIMI_API_KEY", raising=False)
+    monkeypatch.setattr("api.server._providers", {})
+    cache_translation("en", "good evening", {"japanese": "こんばんは", "romaji": "konbanwa", "explanation": ""})
+
+    response = client.post("/v1/translate", json=[
+        {"text": "Good evening", "lang": "en"},
+        {"text": "water", "lang": "en"},
+        {"text": "zzzz qqqq", "lang": "en"},
+    ])
+    assert response.status_code == 200
+    cached, phrase, unanswerable = response.json()
+    assert cached["ok"] and cached["source"] == "cache" and cached["japanese"] == "こんばんは"
+    assert phrase["ok"] and phrase["source"] == "phrase"
+    assert not unanswerable["ok"] and unanswerable["status"] == 503
@@ -0,0 +1,106 @@
+"""Retention and archival (storage.archive): rows move, nothing is lost or counted twice"""
+
+from analytics import compute_response_times
+from analytics.export import count_rows
+from storage import archive_old_rows, call_staff, get_usage_stats, list_archives, log_usage, rebuild_usage_rollups, respond_to_call
+from storage.archive import archived_usage_counts
+from storage.sqlite_store import get_call_changes, get_call_cursor, get_connection
+
+
+def backdate(table: str, ids: list, created_at: str):
+    conn = get_connection()
+    conn.executemany(f"UPDATE {table} SET created_at = ? WHERE id = ?", [(created_at, i) for i in ids])
+    if table == "staff_calls":
+        conn.executemany("UPDATE staff_calls SET responded_at = datetime(created_at, '+2 minutes') "
+                         "WHERE id = ? AND responded_at IS NOT NULL", [(i,) for i in ids])
+    conn.commit()
+    conn.close()
+
+
+def seed():
+    for i in range(6):
+        log_usage("phrase_tap", f"フレーズ{i % 2}", "order", "en" if i % 3 else "zh", "A1")
+    backdate("usage_logs", [1, 2], "2025-01-15 12:00:00")
+    backdate("usage_logs", [3], "2025-02-03 08:00:00")
+
+    for table_id in ("A1", "B2", "C3", "D4"):
+        call_staff(table_id, "water")
+    for call_id in (1, 2, 4):
+        respond_to_call(call_id)
+    # 1, 2: answered long ago; 3: still pending; 4: answered, but holds the newest change_seq
+    backdate("staff_calls", [1, 2, 3, 4], "2025-01-20 19:00:00")
+
+
+def test_archive_round_trip_counts(bridge_db):
+    seed()
+    stats_before = get_usage_stats()
+    cursor_before = get_call_cursor()
+    assert count_rows("usage_logs") == 6 and count_rows("staff_calls") == 4
+
+    result = archive_old_rows(retention_days=90)
+    assert result["archived"] == {"usage_logs": 3, "staff_calls": 2}
+    assert result["months"] == ["2025-01", "2025-02"]
+    assert [path.name for path in list_archives()] == ["bridge-2025-01.db", "bridge-2025-02.db"]
+
+    # Live + archived = what there was before
+    conn = get_connection()
+    live = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("usage_logs", "staff_calls")}
+    conn.close()
+    assert live == {"usage_logs": 3, "staff_calls": 2}
+    assert count_rows("usage_logs") == 6 and count_rows("staff_calls") == 4
+    assert count_rows("usage_logs", end="2025-02-01 00:00:00") == 2
+
+    # Lifetime rollups keep counting archived rows, also after a rebuild
+    assert get_usage_stats() == stats_before
+    assert dict(archived_usage_counts()["action"]) == {"phrase_tap": 3}
+    assert rebuild_usage_rollups() == 6
+    assert get_usage_stats() == stats_before
+
+    # The change feed cursor never goes backwards, and response times still see the archives
+    assert get_call_cursor() == cursor_before
+    assert get_call_changes(cursor_before) == ([], cursor_before, False)
+    assert compute_response_times()["overall"]["count"] == 3
+
+
+def test_archive_is_idempotent(bridge_db):
+    seed()
+    archive_old_rows(retention_days=90, vacuum=False)
+    again = archive_old_rows(retention_days=90, vacuum=False)
+    assert again["archived"] == {"usage_logs": 0, "staff_calls": 0}
+    assert count_rows("usage_logs") == 6 and count_rows("staff_calls") == 4
+
+
+def test_nothing_to_archive(bridge_db):
+    log_usage("phrase_tap", "水")
+    result = archive_old_rows(retention_days=90)
+    assert result["archived"] == {"usage_logs": 0, "staff_calls": 0} and result["months"] == []
+    assert list_archives() == []
+
+
+def test_monthly_usage_matches_after_archiving(bridge_db):
+    from analytics import get_monthly_usage
+
+    seed()
+    # Rows around the cutoff: the same hour must not be counted live and archived
+    for i in range(6, 10):
+        log_usage("translate", "境界")
+    conn = get_connection()
+    for log_id, offset in zip(range(7, 11), ("-1 minute", "+1 minute", "-59 minutes", "+59 minutes")):
+        conn.execute("UPDATE usage_logs SET created_at = datetime('now', '-90 days', ?) WHERE id = ?", (offset, log_id))
+    conn.commit()
+    conn.close()
+    rebuild_usage_rollups()  # Buckets follow the backdated created_at
+
+    before = get_monthly_usage()
+    assert sum(count for month, action, count in before) == 10
+    result = archive_old_rows(retention_days=90)
+    assert result["archived"]["usage_logs"] >= 4
+    assert get_monthly_usage() == before
+
+    # Archive files change on the next run: cached archive counts must follow
+    log_usage("phrase_tap", "追加")
+    backdate("usage_logs", [11], "2025-01-31 23:00:00")
+    rebuild_usage_rollups()
+    archive_old_rows(retention_days=90)
+    after = dict(((month, action), count) for month, action, count in get_monthly_usage())
+    assert after[("2025-01", "phrase_tap")] == dict(((m, a), c) for m, a, c in before)[("2025-01", "phrase_tap")] + 1
@@ -0,0 +1,25 @@
+"""Staff-call change feed (storage.sqlite_store.get_call_changes): snapshot, deltas, paging"""
+
+from storage import call_staff, get_call_changes, respond_to_call
+
+
+def test_change_feed_snapshot_then_deltas(bridge_db):
+    call_staff("A1", "water")
+    call_staff("B2", "check")
+    call_staff("A1", "water")  # Coalesced into the pending A1 call
+
+    calls, cursor, is_snapshot = get_call_changes()
+    assert is_snapshot and sorted((call[1], call[7]) for call in calls) == [("A1", 2), ("B2", 1)]
+    assert get_call_changes(cursor) == ([], cursor, False)
+
+    a1 = next(call[0] for call in calls if call[1] == "A1")
+    respond_to_call(a1)
+    call_staff("C3", "menu")
+    changes, new_cursor, is_snapshot = get_call_changes(cursor)
+    assert not is_snapshot and new_cursor > cursor
+    assert [(call[1], call[4]) for call in changes] == [("A1", "responded"), ("C3", "pending")]
+
+    # Paging: limit rows per delta, the returned cursor picks up where it stopped
+    first, page_cursor, _ = get_call_changes(cursor, limit=1)
+    rest, last_cursor, _ = get_call_changes(page_cursor, limit=1)
+    assert [call[1] for call in first + rest] == ["A1", "C3"] and last_cursor == new_cursor
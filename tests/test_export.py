@@ -0,0 +1,91 @@
+"""BI export (analytics.export): full and incremental exports"""
+
+import csv
+
+import pytest
+
+from analytics.export import count_rows, export_table, parquet_available
+from storage import call_staff, get_pending_calls, log_usage, respond_to_call
+from storage.sqlite_store import get_export_watermark
+
+
+def read_csv(path) -> list:
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_full_export_streams_every_chunk(bridge_db, tmp_path):
+    for i in range(7):
+        log_usage("quick_phrase", f"フレーズ{i}", "order", "en", "A1")
+    result = export_table("usage_logs", tmp_path / "out" / "usage.csv", chunk_rows=3)
+    rows = read_csv(result["path"])
+    assert result["rows"] == len(rows) == count_rows("usage_logs") == 7
+    assert [row["phrase_ja"] for row in rows] == [f"フレーズ{i}" for i in range(7)]
+    assert result["watermark"] is None
+    assert not list((tmp_path / "out").glob("*.part"))
+
+
+def test_incremental_export_resumes_from_watermark(bridge_db, tmp_path):
+    for i in range(3):
+        log_usage("quick_phrase", f"フレーズ{i}")
+    first = export_table("usage_logs", tmp_path / "1.csv", incremental="bi")
+    assert first["rows"] == 3
+    assert get_export_watermark("bi", "usage_logs") == first["watermark"]
+
+    # Nothing new: empty file, watermark unchanged
+    assert count_rows("usage_logs", after=first["watermark"]) == 0
+    second = export_table("usage_logs", tmp_path / "2.csv", incremental="bi")
+    assert second["rows"] == 0 and read_csv(second["path"]) == []
+    assert get_export_watermark("bi", "usage_logs") == first["watermark"]
+
+    log_usage("translation", "追加")
+    log_usage("translation", "追加2")
+    assert count_rows("usage_logs", after=first["watermark"]) == 2
+    third = export_table("usage_logs", tmp_path / "3.csv", incremental="bi")
+    assert [row["phrase_ja"] for row in read_csv(third["path"])] == ["追加", "追加2"]
+
+    # Watermarks are per name: another consumer still gets everything
+    assert export_table("usage_logs", tmp_path / "4.csv", incremental="other")["rows"] == 5
+
+
+def test_incremental_export_picks_up_updated_calls(bridge_db, tmp_path):
+    call_staff("A1", "water")
+    call_staff("B2", "check")
+    first = export_table("staff_calls", tmp_path / "1.csv", incremental="bi")
+    assert first["rows"] == 2
+
+    # Responding rewrites the row (new change_seq): it is exported again with its new status
+    call_id = next(call_id for call_id, table_id, *rest in get_pending_calls() if table_id == "A1")
+    respond_to_call(call_id)
+    second = export_table("staff_calls", tmp_path / "2.csv", incremental="bi")
+    rows = read_csv(second["path"])
+    assert [(row["table_id"], row["status"]) for row in rows] == [("A1", "responded")]
+
+
+def test_failed_export_leaves_watermark(bridge_db, tmp_path, monkeypatch):
+    from analytics import export
+
+    log_usage("quick_phrase", "水")
+
+    def broken(*args, **kwargs):
+        yield [(None,)]
+        raise OSError("disk full")
+
+    monkeypatch.setattr(export, "iter_chunks", broken)
+    with pytest.raises(OSError):
+        export_table("usage_logs", tmp_path / "out.csv", incremental="bi")
+    assert get_export_watermark("bi", "usage_logs") is None
+    assert not list(tmp_path.glob("out.csv*"))
+
+
+@pytest.mark.skipif(not parquet_available(), reason="pyarrow not installed")
+def test_parquet_export_types(bridge_db, tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    log_usage("quick_phrase", "水", "drink", "en", "A1")
+    result = export_table("usage_logs", tmp_path / "usage.parquet", "parquet")
+    table = pq.read_table(result["path"])
+    assert table.num_rows == 1
+    created_at = table.schema.field("created_at").type
+    assert pa.types.is_timestamp(created_at) and created_at.tz == "UTC"
@@ -0,0 +1,47 @@
+"""Translation fallback (metering.fallback): cache, live call, closest phrase"""
+
+import pytest
+
+from catalog import compile_catalog
+from metering import LimitExceeded, translate_with_fallback
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return compile_catalog()
+
+
+class FakeKimi:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def translate_to_japanese(self, text, lang_name):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {"japanese": "お水をください", "romaji": "omizu wo kudasai", "explanation": text}
+
+
+def test_live_result_is_cached_for_identical_input(bridge_db, catalog):
+    kimi = FakeKimi()
+    assert translate_with_fallback(kimi, "Water please", "en", "English", catalog)[1] == "live"
+    result, source = translate_with_fallback(kimi, "  water   PLEASE ", "en", "English", catalog)
+    assert source == "cache" and result["japanese"] == "お水をください"
+    assert kimi.calls == 1
+
+
+def test_limit_falls_back_to_closest_phrase(bridge_db, catalog):
+    kimi = FakeKimi(LimitExceeded("llm", "quota"))
+    result, source = translate_with_fallback(kimi, "water", "en", "English", catalog)
+    assert source == "phrase" and result["japanese"] == catalog.search("water", "en", limit=1)[0]["ja"]
+    with pytest.raises(LimitExceeded):
+        translate_with_fallback(kimi, "zzzz qqqq", "en", "English", catalog)
+
+
+def test_missing_provider_uses_cache_then_phrases(bridge_db, catalog):
+    translate_with_fallback(FakeKimi(), "Something long to say", "en", "English", catalog)
+    assert translate_with_fallback(None, "something long to say", "en", "English", catalog)[1] == "cache"
+    assert translate_with_fallback(None, "water", "en", "English", catalog)[1] == "phrase"
+    with pytest.raises(RuntimeError):
+        translate_with_fallback(None, "zzzz qqqq", "en", "English", catalog)
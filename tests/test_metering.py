@@ -0,0 +1,71 @@
+"""Provider metering (metering.meter): quota days, quotas and table throttles"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from metering import LimitExceeded, Meter
+from metering import meter as meter_module
+from metering.meter import metering_day
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_quota_day_follows_restaurant_clock(monkeypatch):
+    monkeypatch.delenv("BRIDGE_UTC_OFFSET_HOURS", raising=False)
+    # Default JST: the day turns over at 15:00 UTC
+    assert metering_day(utc(2026, 3, 31, 14, 59, 59)) == "2026-03-31"
+    assert metering_day(utc(2026, 3, 31, 15, 0, 0)) == "2026-04-01"
+
+
+def test_utc_offset_is_read_at_call_time(monkeypatch):
+    # As when .env is loaded after the package was imported
+    monkeypatch.setenv("BRIDGE_UTC_OFFSET_HOURS", "-5")
+    assert metering_day(utc(2026, 1, 1, 4, 59)) == "2025-12-31"
+    assert metering_day(utc(2026, 1, 1, 5, 0)) == "2026-01-01"
+    monkeypatch.setenv("BRIDGE_UTC_OFFSET_HOURS", "0")
+    assert metering_day(utc(2026, 1, 1, 0, 0)) == "2026-01-01"
+
+
+def test_daily_quota_resets_at_day_boundary(bridge_db, monkeypatch):
+    day = {"value": "2026-04-01"}
+    monkeypatch.setattr(meter_module, "metering_day", lambda now=None: day["value"])
+    meter = Meter(quotas={"llm": 100}, table_rates={})
+
+    meter.check("llm")
+    meter.record("llm", "translate", 60, table_id="A1")
+    meter.check("llm")
+    meter.record("llm", "translate", 40, table_id="A2")
+    with pytest.raises(LimitExceeded) as excinfo:
+        meter.check("llm")
+    assert excinfo.value.reason == "quota"
+
+    day["value"] = "2026-04-02"
+    meter.check("llm")  # New day, fresh quota
+    assert meter.report()["providers"]["llm"]["units"] == 0
+
+    # Yesterday's spend is still on record
+    day["value"] = "2026-04-01"
+    assert meter.report()["providers"]["llm"]["units"] == 100
+
+
+def test_quota_is_shared_between_processes(bridge_db, monkeypatch):
+    monkeypatch.setattr(meter_module, "metering_day", lambda now=None: "2026-04-01")
+    monkeypatch.setattr(meter_module, "QUOTA_SYNC_SECONDS", 0)
+    app, api = Meter(quotas={"tts": 50}, table_rates={}), Meter(quotas={"tts": 50}, table_rates={})
+    app.check("tts")
+    app.record("tts", "speech", 50)
+    with pytest.raises(LimitExceeded):
+        api.check("tts")
+
+
+def test_table_throttle(bridge_db):
+    meter = Meter(quotas={}, table_rates={"stt": "2/60"})
+    meter.check("stt", "A1")
+    meter.check("stt", "A1")
+    with pytest.raises(LimitExceeded) as excinfo:
+        meter.check("stt", "A1")
+    assert excinfo.value.reason == "throttled" and excinfo.value.retry_after > 0
+    meter.check("stt", "B2")  # Other tables keep their own bucket
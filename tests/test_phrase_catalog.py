@@ -0,0 +1,25 @@
+"""Phrase catalog files (catalog.phrase_catalog): layout-preserving serialization"""
+
+import json
+
+import pytest
+
+from catalog.phrase_catalog import DEFAULT_CATALOG, PACKS_DIR, format_catalog_json, format_pack_json
+
+
+def test_default_catalog_round_trips():
+    text = DEFAULT_CATALOG.read_text(encoding="utf-8")
+    assert format_catalog_json(json.loads(text)) == text
+
+
+@pytest.mark.parametrize("path", sorted(PACKS_DIR.glob("*.json")), ids=lambda path: path.stem)
+def test_packs_round_trip(path):
+    text = path.read_text(encoding="utf-8")
+    assert format_pack_json(json.loads(text)) == text
+
+
+def test_pack_layout_with_ui_overrides():
+    pack = {"phrases": [], "ui_text": {"en": {"app_title": "Izakaya"}, "zh": {"app_title": "居酒屋"}}}
+    text = format_pack_json(pack)
+    assert text == '{\n "phrases": [],\n "ui_text": {\n  "en": {"app_title": "Izakaya"},\n  "zh": {"app_title": "居酒屋"}\n }\n}\n'
+    assert json.loads(text) == pack
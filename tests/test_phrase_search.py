@@ -0,0 +1,54 @@
+"""Type-ahead phrase search (catalog.phrase_search)"""
+
+import pytest
+
+from catalog import compile_catalog
+from catalog.phrase_catalog import CompiledCatalog
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return compile_catalog("example-izakaya")
+
+
+def ids(phrases):
+    return [phrase["phrase_id"] for phrase in phrases]
+
+
+@pytest.mark.parametrize("query, phrase_id", [
+    ("ビール", "nama-biru-kudasai"),       # ja, starts mid-phrase (生ビール)
+    ("生ビール", "nama-biru-kudasai"),
+    ("会計", "okaikei-onegaishimasu"),     # ja, kanji inside お会計
+    ("啤酒", "nama-biru-kudasai"),         # zh, inside 请给我生啤酒
+    ("结账", "okaikei-onegaishimasu"),
+])
+def test_cjk_substring_queries_match(catalog, query, phrase_id):
+    assert ids(catalog.search(query, "zh"))[0] == phrase_id
+
+
+def test_thai_substring_query_matches():
+    source = {
+        "languages": {"en": {"name": "English"}, "th": {"name": "ไทย"}},
+        "phrases": [
+            {"id": "mizu", "ja": "お水をください", "text": {"en": "Water, please", "th": "ขอน้ำเปล่าหน่อยครับ"}},
+            {"id": "okaikei", "ja": "お会計お願いします", "text": {"en": "Check, please", "th": "เช็คบิลด้วยครับ"}},
+        ],
+    }
+    catalog = CompiledCatalog(source)
+    assert ids(catalog.search("น้ำเปล่า", "th")) == ["mizu"]
+    assert ids(catalog.search("บิล", "th")) == ["okaikei"]
+
+
+def test_type_ahead_prefix_and_romaji(catalog):
+    assert "nama-biru-kudasai" in ids(catalog.search("bee", "en"))
+    assert ids(catalog.search("okaike", "en"))[0] == "okaikei-onegaishimasu"
+
+
+def test_diacritics_and_kana_are_folded(catalog):
+    assert ids(catalog.search("nuoc", "vi"))[0] == ids(catalog.search("nước", "vi"))[0]
+    assert ids(catalog.search("すみません", "en")) == ids(catalog.search("スミマセン", "en"))
+
+
+def test_no_match_and_empty_query(catalog):
+    assert catalog.search("zzzz", "en") == []
+    assert catalog.search("  ", "en") == []
@@ -0,0 +1,87 @@
+"""Generated speech post-processing (tts.postprocess): trim, loudness, re-encode"""
+
+import io
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+from tts.postprocess import AudioPostProcessor, PEAK_CEILING_DB, decode, integrated_loudness, trim_silence
+
+RATE = 44100
+
+
+def tone(seconds: float, amplitude: float, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def clip(lead: float = 0.5, voiced: float = 1.0, tail: float = 0.7, amplitude: float = 0.05) -> np.ndarray:
+    """A tone with silence before and after, like a TTS clip"""
+    return np.concatenate([np.zeros(int(RATE * lead), np.float32), tone(voiced, amplitude),
+                           np.zeros(int(RATE * tail), np.float32)])
+
+
+def wav_bytes(samples: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, RATE, format="WAV")
+    return buffer.getvalue()
+
+
+def test_reference_loudness():
+    # BS.1770: a full-scale 997 Hz sine reads -3.01 LUFS
+    assert integrated_loudness(tone(3.0, 1.0, 997.0), RATE) == pytest.approx(-3.01, abs=0.05)
+    assert integrated_loudness(tone(3.0, 0.1, 997.0), RATE) == pytest.approx(-23.01, abs=0.05)
+    assert integrated_loudness(np.zeros(RATE, np.float32), RATE) == float("-inf")
+
+
+def test_trim_keeps_padding_and_fades():
+    samples = clip()
+    trimmed = trim_silence(samples, RATE)
+    # 1 s voiced + 30 ms lead + 150 ms tail padding (10 ms frame resolution)
+    assert len(trimmed) / RATE == pytest.approx(1.0 + 0.030 + 0.150, abs=0.02)
+    assert trimmed[0] == 0.0 and trimmed[-1] == 0.0
+    assert np.array_equal(trim_silence(np.zeros(RATE, np.float32), RATE), np.zeros(RATE, np.float32))
+
+
+def test_process_trims_normalizes_and_reencodes():
+    processor = AudioPostProcessor(target_lufs=-16.0, mp3_quality=0.5)
+    source = wav_bytes(clip())
+    processed = processor.process(source)
+
+    assert processed[:3] == b"ID3" or processed[0] == 0xFF  # MP3 frame or tag
+    samples, rate = decode(processed)
+    assert rate == RATE
+    # 2.2 s in; about 1.2 s out (plus the encoder's priming / padding)
+    assert len(samples) / rate == pytest.approx(1.18, abs=0.1)
+    assert integrated_loudness(samples, rate) == pytest.approx(-16.0, abs=0.5)
+    assert np.abs(samples).max() <= 10 ** (PEAK_CEILING_DB / 20) * 1.05
+
+    stats = processor.stats()
+    assert stats["clips"] == 1 and stats["failures"] == 0
+    assert stats["bytes_in"] == len(source) and stats["bytes_out"] == len(processed)
+    assert stats["trimmed_seconds"] == pytest.approx(2.2 - 1.18, abs=0.02)
+
+
+def test_peak_ceiling_wins_over_target():
+    # A very quiet, very peaky clip: reaching the target would clip, so gain stops at the ceiling
+    samples = np.zeros(RATE * 2, np.float32)
+    samples[RATE // 2::RATE // 10] = 0.5
+    processed = AudioPostProcessor(target_lufs=-5.0).process(wav_bytes(samples))
+    out, rate = decode(processed)
+    assert np.abs(out).max() <= 10 ** (PEAK_CEILING_DB / 20) * 1.1
+
+
+def test_undecodable_clip_is_kept_unchanged():
+    processor = AudioPostProcessor()
+    data = b"not audio at all"
+    assert processor.process(data) is data
+    assert processor.stats()["failures"] == 1 and processor.stats()["clips"] == 0
+
+
+def test_enabled_switch(monkeypatch):
+    monkeypatch.delenv("BRIDGE_AUDIO_POSTPROCESS", raising=False)
+    assert AudioPostProcessor.enabled()
+    monkeypatch.setenv("BRIDGE_AUDIO_POSTPROCESS", "off")
+    assert not AudioPostProcessor.enabled()
@@ -0,0 +1,108 @@
+"""Host-wide cache (storage.shared_cache): DiskCache and single_flight"""
+
+import threading
+import time
+
+import pytest
+
+from storage.shared_cache import DiskCache, lock_stripe, single_flight
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache("test", max_bytes=100, root=tmp_path)
+
+
+def test_put_get_and_stats(cache):
+    assert cache.get("a") is None
+    assert cache.put("a", b"x" * 10)
+    assert cache.get("a") == b"x" * 10
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["hits"], stats["misses"]) == (1, 10, 1, 1)
+
+
+def test_other_processes_see_entries(cache, tmp_path):
+    cache.put("a", b"shared")
+    assert DiskCache("test", max_bytes=100, root=tmp_path).get("a") == b"shared"
+    assert DiskCache("other", max_bytes=100, root=tmp_path).get("a") is None
+
+
+def test_lru_eviction_keeps_recently_read(cache):
+    for key in "abc":
+        cache.put(key, b"x" * 40)
+        time.sleep(0.01)
+    # 120 bytes > 100: the least recently used entry went
+    assert cache.get("a") is None and cache.get("b") is not None
+    time.sleep(0.01)
+    cache.put("d", b"x" * 40)  # "b" was just read, so "c" goes now
+    assert cache.get("c") is None and cache.get("b") is not None and cache.get("d") is not None
+    assert cache.stats()["bytes"] <= 100 and cache.evictions == 2
+    assert not list(cache.dir.glob("*/.tmp-*"))
+
+
+def test_single_flight_runs_a_miss_once(cache):
+    calls = []
+
+    def fetch():
+        cached = cache.get("key")
+        if cached is not None:
+            return cached
+        with single_flight("test:key") as held:
+            assert held
+            cached = cache.get("key")  # Re-check: another thread may have filled it
+            if cached is not None:
+                return cached
+            calls.append(1)
+            time.sleep(0.05)
+            cache.put("key", b"value")
+            return b"value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [b"value"] * 8 and len(calls) == 1
+
+
+def name_on_stripe(stripe: int, same: bool) -> str:
+    """A lock name whose stripe is (or is not) the given one"""
+    return next(name for name in (f"test:{i}" for i in range(100_000)) if (lock_stripe(name) == stripe) == same)
+
+
+@pytest.fixture
+def held_lock():
+    """Hold single_flight("test:slow") in another thread for the duration of the test"""
+    entered = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with single_flight("test:slow"):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    entered.wait(5)
+    yield "test:slow"
+    release.set()
+    thread.join()
+
+
+def test_single_flight_times_out_instead_of_hanging(held_lock):
+    with single_flight(held_lock, timeout=0.1) as held:
+        assert not held
+    other = name_on_stripe(lock_stripe(held_lock), same=False)
+    with single_flight(other, timeout=0.1) as held:
+        assert held  # Names on other stripes don't wait
+
+
+def test_names_sharing_a_stripe_serialize(held_lock):
+    neighbour = name_on_stripe(lock_stripe(held_lock), same=True)
+    assert neighbour != held_lock
+    # Unrelated name, same lock file: it waits too (documented); a process-local lock does not
+    with single_flight(neighbour, timeout=0.1) as held:
+        assert not held
+    with single_flight(neighbour, timeout=0.1, shared=False) as held:
+        assert held
@@ -0,0 +1,68 @@
+"""Multi-restaurant routing (storage.stores): store registry and per-store shards"""
+
+import threading
+
+import pytest
+
+from storage import (
+    UnknownStore,
+    call_staff,
+    ensure_store_schema,
+    get_pending_calls,
+    list_stores,
+    resolve_store,
+    store_pack,
+    store_scope,
+)
+from storage.sqlite_store import get_db_path
+
+
+@pytest.fixture
+def stores(bridge_db, monkeypatch):
+    monkeypatch.setenv("BRIDGE_STORES", "shibuya=example-izakaya, umeda")
+    for store_id in (None, "shibuya", "umeda"):
+        ensure_store_schema(store_id)
+    return bridge_db
+
+
+def test_store_registry(stores, monkeypatch):
+    assert list_stores() == {"shibuya": "example-izakaya", "umeda": None}
+    assert store_pack("shibuya") == "example-izakaya" and store_pack(None) is None
+    assert resolve_store("umeda") == "umeda" and resolve_store("") is None
+    with pytest.raises(UnknownStore):
+        resolve_store("../shibuya")
+
+    monkeypatch.setenv("BRIDGE_STORES", "ok,../etc")
+    with pytest.raises(ValueError):
+        list_stores()
+
+
+def test_store_scope_routes_to_its_shard(stores):
+    with store_scope("shibuya"):
+        assert get_db_path() == stores.parent / "stores" / "shibuya" / stores.name
+        call_staff("A1", "water")
+    with store_scope("umeda"):
+        call_staff("B2", "check")
+        call_staff("B3", "check")
+
+    assert get_db_path() == stores and get_pending_calls() == []
+    with store_scope("shibuya"):
+        assert [call[1] for call in get_pending_calls()] == ["A1"]
+    with store_scope("umeda"):
+        assert sorted(call[1] for call in get_pending_calls()) == ["B2", "B3"]
+
+
+def test_store_scope_is_per_thread(stores):
+    seen = {}
+
+    def worker():
+        seen["thread"] = get_db_path()
+
+    with store_scope("shibuya"):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        seen["main"] = get_db_path()
+    # A new thread starts in the default context, not in the scope of its creator
+    assert seen == {"thread": stores, "main": stores.parent / "stores" / "shibuya" / stores.name}
+
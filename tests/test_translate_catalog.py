@@ -0,0 +1,74 @@
+"""Build-time catalog translation (scripts/translate_catalog.py)"""
+
+import importlib.util
+import shutil
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "translate_catalog.py"
+
+
+@pytest.fixture
+def translate_catalog():
+    spec = importlib.util.spec_from_file_location("translate_catalog", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def pack(tmp_path):
+    from catalog.phrase_catalog import pack_path
+
+    path = tmp_path / "example-izakaya.json"
+    shutil.copy(pack_path("example-izakaya"), path)
+    return path
+
+
+class FakeKimi:
+    model = "fake"
+    requests = 0
+
+    def translate_catalog(self, items: dict, target_lang: str, kind: str = "phrase") -> dict:
+        FakeKimi.requests += 1
+        return {item_id: f"한국어 {item_id}" for item_id in items}
+
+
+@pytest.fixture(autouse=True)
+def fake_kimi(monkeypatch):
+    import llm
+
+    FakeKimi.requests = 0
+    monkeypatch.setattr(llm, "KimiLLM", FakeKimi)
+
+
+def test_complete_pack_is_not_rewritten(bridge_db, translate_catalog, pack):
+    before = pack.read_bytes()
+    report = translate_catalog.fill_catalog(pack, {"en": "English", "zh": "中文"})
+    assert report["missing"] == 0 and FakeKimi.requests == 0
+    assert pack.read_bytes() == before
+
+
+def test_filled_pack_keeps_its_layout(bridge_db, translate_catalog, pack):
+    before = pack.read_text(encoding="utf-8").splitlines()
+    report = translate_catalog.fill_catalog(pack, {"ko": "한국어"})
+    assert report["translated"] == 2 and not report["rejected"]
+
+    after = pack.read_text(encoding="utf-8").splitlines()
+    # Only the two "text" lines change: ko is added in catalog language order
+    changed = [(old, new) for old, new in zip(before, after) if old != new]
+    assert len(before) == len(after) and len(changed) == 2
+    assert all('"ko": "한국어 ' in new and new.startswith('   "text": ') for old, new in changed)
+
+    # A second run finds nothing to do and leaves the file alone
+    filled = pack.read_bytes()
+    assert translate_catalog.fill_catalog(pack, {"ko": "한국어"})["missing"] == 0
+    assert pack.read_bytes() == filled
+
+
+def test_cached_translations_are_reused(bridge_db, translate_catalog, pack, tmp_path):
+    translate_catalog.fill_catalog(pack, {"ko": "한국어"}, dry_run=True)
+    assert FakeKimi.requests == 1
+    report = translate_catalog.fill_catalog(pack, {"ko": "한국어"})
+    assert report["cached"] == 2 and FakeKimi.requests == 1